@@ -34,4 +34,15 @@ CONTEXT = """
 - rating (0–5) is a simple integer score for quick assessment
 - Multiple candidates can exist for the same position
 - Hired candidates should trigger creating a StaffMember in the staff module (not automated)
+- List tools return at most 50 rows per call; use `summary` for counts and `next_cursor` to page
+- For any counting, average-rating or volume question ("how many candidates are in interview for
+  Backend?", "applications per week this month") call `candidate_stats` with the right filters and
+  `group_by` (stage, position, department, week) instead of listing candidates and counting them
+- To shortlist or triage ("who are the best fits for Backend?") call `rank_candidates`, which ranks
+  by how well resume notes match the position text; `rating` remains the recruiter's own score
+- To find past applicants like someone ("who else looks like our last Backend hire?") call
+  `find_similar_candidates` with that candidate's id
+- For changes to more than one record ("reject everyone below rating 2 for Backend") call
+  `preview_batch` with a `where` selection, tell the user the count, then call the matching batch
+  tool once with the same `where` and `expected_count` instead of one single-record tool per row
 """
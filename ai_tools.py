@@ -1,28 +1,124 @@
 """AI tools for the Recruitment module."""
-from assistant.tools import AssistantTool, register_tool
+from uuid import UUID
+
+from django.utils import timezone
+
+from assistant.tools import AssistantTool, register_tool as _register_tool
+
+from recruitment.instrumentation import instrument_tool
+from recruitment.routers import replica_tool
+
+# Every tool reads through the session hub's live rows and returns plain
+# values() projections, at most MAX_PAGE_SIZE rows per call. Longer lists
+# are walked with the opaque ``cursor`` returned as ``next_cursor``.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+MAX_STATS_GROUPS = 200
+
+POSITION_FIELDS = ("id", "title", "department", "status", "vacancies", "is_active")
+CANDIDATE_FIELDS = ("id", "name", "email", "stage", "rating", "position_id", "position__title")
+
+NO_HUB = {"error": "No active hub"}
+
+# Batch tools run on at most this many rows per call.
+MAX_BATCH_SIZE = 5000
+PREVIEW_SAMPLE = 10
+
+PAGE_PARAMETERS = {
+    "limit": {"type": "integer", "description": f"Rows per page, at most {MAX_PAGE_SIZE}"},
+    "cursor": {"type": "string", "description": "next_cursor from a previous call"},
+    "summary": {"type": "boolean", "description": "Return counts only, no rows"},
+}
+
+
+def register_tool(cls):
+    """Register ``cls`` with the assistant, recording its calls (see instrumentation.py).
+
+    Tools with ``reads_replica`` read from the replica when one is set up (see routers.py).
+    """
+    execute = replica_tool(cls.execute) if getattr(cls, 'reads_replica', False) else cls.execute
+    cls.execute = instrument_tool(execute, cls.name)
+    return _register_tool(cls)
+
+
+def _hub_id(request):
+    return request.session.get("hub_id")
+
+
+def _positions(request):
+    from recruitment.models import JobPosition
+    return JobPosition.objects.for_hub(_hub_id(request))
+
+
+def _candidates(request):
+    from recruitment.models import Candidate
+    return Candidate.objects.for_hub(_hub_id(request))
+
+
+def _plain(row):
+    return {key: str(value) if isinstance(value, UUID) else value for key, value in row.items()}
+
+
+def _uuid(value):
+    """``value`` as a UUID, or None when it isn't one."""
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _rounded(value):
+    return round(value, 2) if value is not None else None
+
+
+def _page_size(args):
+    try:
+        size = int(args.get("limit") or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def _page(qs, fields, sort_field, args):
+    """One bounded page of ``qs`` as plain dicts plus the cursor for the next."""
+    from recruitment.pagination import paginate_by_cursor
+    page = paginate_by_cursor(qs.values(*fields), sort_field, cursor=args.get("cursor"), per_page=_page_size(args))
+    return [_plain(row) for row in page], page.next_cursor
+
+
+def _counts(qs, field):
+    """``{"total": n, "by_<field>": {value: n}}`` from one grouped query."""
+    from django.db.models import Count
+    by_value = dict(qs.values_list(field).annotate(n=Count("id")).order_by())
+    return {"total": sum(by_value.values()), f"by_{field}": by_value}
 
 
 @register_tool
 class ListJobPositions(AssistantTool):
     name = "list_job_positions"
+    reads_replica = True
     description = "List job positions/openings."
     module_id = "recruitment"
     required_permission = "recruitment.view_jobposition"
     parameters = {
         "type": "object",
-        "properties": {"status": {"type": "string", "description": "draft, open, closed, on_hold"}, "department": {"type": "string"}},
+        "properties": {"status": {"type": "string", "description": "draft, open, closed, on_hold"}, "department": {"type": "string"}, **PAGE_PARAMETERS},
         "required": [],
         "additionalProperties": False,
     }
 
     def execute(self, args, request):
-        from recruitment.models import JobPosition
-        qs = JobPosition.objects.all()
+        if not _hub_id(request):
+            return NO_HUB
+        qs = _positions(request)
         if args.get('status'):
             qs = qs.filter(status=args['status'])
         if args.get('department'):
             qs = qs.filter(department__icontains=args['department'])
-        return {"positions": [{"id": str(p.id), "title": p.title, "department": p.department, "status": p.status, "vacancies": p.vacancies, "is_active": p.is_active} for p in qs]}
+        if args.get('summary'):
+            return _counts(qs, "status")
+        positions, next_cursor = _page(qs, POSITION_FIELDS, "title", args)
+        return {"positions": positions, "next_cursor": next_cursor}
 
 
 @register_tool
@@ -44,32 +140,210 @@ class CreateJobPosition(AssistantTool):
 
     def execute(self, args, request):
         from recruitment.models import JobPosition
-        p = JobPosition.objects.create(title=args['title'], department=args.get('department', ''), description=args.get('description', ''), vacancies=args.get('vacancies', 1))
+        if not _hub_id(request):
+            return NO_HUB
+        p = JobPosition.objects.create(hub_id=_hub_id(request), title=args['title'], department=args.get('department', ''), description=args.get('description', ''), vacancies=args.get('vacancies', 1))
         return {"id": str(p.id), "title": p.title, "created": True}
 
 
 @register_tool
 class ListCandidates(AssistantTool):
     name = "list_candidates"
+    reads_replica = True
     description = "List job candidates."
     module_id = "recruitment"
     required_permission = "recruitment.view_candidate"
     parameters = {
         "type": "object",
-        "properties": {"position_id": {"type": "string"}, "stage": {"type": "string", "description": "applied, screening, interview, offer, hired, rejected"}, "limit": {"type": "integer"}},
+        "properties": {"position_id": {"type": "string"}, "stage": {"type": "string", "description": "applied, screening, interview, offer, hired, rejected"}, **PAGE_PARAMETERS},
         "required": [],
         "additionalProperties": False,
     }
 
     def execute(self, args, request):
+        if not _hub_id(request):
+            return NO_HUB
+        qs = _candidates(request)
+        if args.get('position_id'):
+            qs = qs.filter(position_id=args['position_id'])
+        if args.get('stage'):
+            qs = qs.filter(stage=args['stage'])
+        if args.get('summary'):
+            return _counts(qs, "stage")
+        candidates, next_cursor = _page(qs, CANDIDATE_FIELDS, "name", args)
+        return {"candidates": candidates, "next_cursor": next_cursor}
+
+
+@register_tool
+class RankCandidates(AssistantTool):
+    name = "rank_candidates"
+    description = (
+        "Best-matching candidates for a job position, ranked by how well their resume notes match "
+        "the position's title and description (BM25 match_score, higher is better)."
+    )
+    module_id = "recruitment"
+    required_permission = "recruitment.view_candidate"
+    parameters = {
+        "type": "object",
+        "properties": {
+            "position_id": {"type": "string"},
+            "limit": {"type": "integer", "description": f"Candidates to return, at most {MAX_PAGE_SIZE}"},
+            "stage": {"type": "string", "description": "Only candidates in this stage"},
+        },
+        "required": ["position_id"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from recruitment.ranking import position_query, top_candidates
+        if not _hub_id(request):
+            return NO_HUB
+        position_id = _uuid(args['position_id'])
+        position = None
+        if position_id is not None:
+            position = _positions(request).filter(id=position_id).values("id", "title", "description").first()
+        if position is None:
+            return {"error": "Job position not found"}
+        qs = top_candidates(_hub_id(request), position["id"], limit=None)
+        if args.get('stage'):
+            qs = qs.filter(stage=args['stage'])
+        rows = qs.values(*CANDIDATE_FIELDS, "match_score", "term_vector__terms")[:_page_size(args)]
+        query = position_query(position["title"], position["description"])
+        candidates = []
+        for row in rows:
+            terms = row.pop("term_vector__terms") or {}
+            candidates.append({**_plain(row), "matched_terms": [term for term in query if term in terms][:10]})
+        return {"position": position["title"], "candidates": candidates}
+
+
+@register_tool
+class FindSimilarCandidates(AssistantTool):
+    name = "find_similar_candidates"
+    description = (
+        "Find candidates similar to a given candidate (e.g. past applicants like a strong hire), "
+        "by resume notes and position title/department. Returns cosine similarity from 0 to 1."
+    )
+    module_id = "recruitment"
+    required_permission = "recruitment.view_candidate"
+    parameters = {
+        "type": "object",
+        "properties": {
+            "candidate_id": {"type": "string"},
+            "limit": {"type": "integer", "description": f"Candidates to return, at most {MAX_PAGE_SIZE}"},
+            "exclude_same_position": {"type": "boolean", "description": "Only candidates of other positions"},
+        },
+        "required": ["candidate_id"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.core.exceptions import ValidationError
         from recruitment.models import Candidate
-        qs = Candidate.objects.select_related('position').all()
+        from recruitment.similarity import SimilarityUnavailable, similar_candidates
+        if not _hub_id(request):
+            return NO_HUB
+        try:
+            candidate = _candidates(request).select_related("position").get(id=args['candidate_id'])
+        except (Candidate.DoesNotExist, ValidationError, ValueError):
+            return {"error": "Candidate not found"}
+        try:
+            similar = similar_candidates(
+                candidate, limit=_page_size(args), exclude_position=bool(args.get('exclude_same_position')),
+            )
+        except SimilarityUnavailable as exc:
+            return {"error": str(exc)}
+        return {
+            "candidate": candidate.name,
+            "similar": [
+                {
+                    "id": str(c.id), "name": c.name, "stage": c.stage, "rating": c.rating,
+                    "position_id": str(c.position_id), "position__title": c.position.title,
+                    "similarity": score,
+                }
+                for c, score in similar
+            ],
+        }
+
+
+# values() keys renamed in candidate_stats output.
+STATS_LABELS = {"position__title": "position", "position__department": "department"}
+
+
+def _stats_group(row):
+    group = {}
+    for key, value in _plain(row).items():
+        if key == "week":
+            value = value.date().isoformat()
+        elif key == "avg_rating":
+            value = _rounded(value)
+        group[STATS_LABELS.get(key, key)] = value
+    return group
+
+
+@register_tool
+class CandidateStats(AssistantTool):
+    name = "candidate_stats"
+    reads_replica = True
+    description = (
+        "Count candidates and average their rating, grouped by stage, position, department and/or "
+        "application week. Use this instead of listing candidates to answer how-many questions."
+    )
+    module_id = "recruitment"
+    required_permission = "recruitment.view_candidate"
+    parameters = {
+        "type": "object",
+        "properties": {
+            "group_by": {"type": "array", "items": {"type": "string", "enum": ["stage", "position", "department", "week"]}},
+            "position_id": {"type": "string"}, "department": {"type": "string"},
+            "stage": {"type": "string", "description": "applied, screening, interview, offer, hired, rejected"},
+            "since": {"type": "string", "description": "Only candidates created on or after this date (YYYY-MM-DD)"},
+        },
+        "required": [],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.db.models import Avg, Count
+        from django.db.models.functions import TruncWeek
+        from django.utils.dateparse import parse_date
+        if not _hub_id(request):
+            return NO_HUB
+        qs = _candidates(request)
         if args.get('position_id'):
             qs = qs.filter(position_id=args['position_id'])
+        if args.get('department'):
+            qs = qs.filter(position__department__iexact=args['department'])
         if args.get('stage'):
             qs = qs.filter(stage=args['stage'])
-        limit = args.get('limit', 20)
-        return {"candidates": [{"id": str(c.id), "name": c.name, "email": c.email, "position": c.position.title if c.position else None, "stage": c.stage, "rating": c.rating} for c in qs[:limit]]}
+        if args.get('since'):
+            since = parse_date(args['since'])
+            if since is None:
+                return {"error": "since must be a date (YYYY-MM-DD)"}
+            qs = qs.filter(created_at__date__gte=since)
+
+        keys = []
+        for group in dict.fromkeys(args.get('group_by') or []):
+            if group == "stage":
+                keys.append("stage")
+            elif group == "position":
+                keys += ["position_id", "position__title"]
+            elif group == "department":
+                keys.append("position__department")
+            elif group == "week":
+                qs = qs.annotate(week=TruncWeek("created_at"))
+                keys.append("week")
+
+        overall = qs.aggregate(total=Count("id"), avg_rating=Avg("rating"))
+        result = {"total": overall["total"], "avg_rating": _rounded(overall["avg_rating"])}
+        if not keys:
+            return result
+        rows = list(
+            qs.values(*keys).annotate(count=Count("id"), avg_rating=Avg("rating"))
+            .order_by(*keys)[:MAX_STATS_GROUPS + 1]
+        )
+        result["groups"] = [_stats_group(row) for row in rows[:MAX_STATS_GROUPS]]
+        result["truncated"] = len(rows) > MAX_STATS_GROUPS
+        return result
 
 
 @register_tool
@@ -92,7 +366,11 @@ class CreateCandidate(AssistantTool):
 
     def execute(self, args, request):
         from recruitment.models import Candidate
-        c = Candidate.objects.create(position_id=args['position_id'], name=args['name'], email=args.get('email', ''), phone=args.get('phone', ''), resume_notes=args.get('resume_notes', ''))
+        if not _hub_id(request):
+            return NO_HUB
+        if not _positions(request).filter(id=args['position_id']).exists():
+            return {"error": "Job position not found"}
+        c = Candidate.objects.create(hub_id=_hub_id(request), position_id=args['position_id'], name=args['name'], email=args.get('email', ''), phone=args.get('phone', ''), resume_notes=args.get('resume_notes', ''))
         return {"id": str(c.id), "name": c.name, "created": True}
 
 
@@ -121,7 +399,7 @@ class UpdateJobPosting(AssistantTool):
     def execute(self, args, request):
         from recruitment.models import JobPosition
         try:
-            p = JobPosition.objects.get(id=args['position_id'])
+            p = _positions(request).get(id=args['position_id'])
         except JobPosition.DoesNotExist:
             return {"error": "Job position not found"}
         fields = []
@@ -150,13 +428,14 @@ class DeleteJobPosting(AssistantTool):
 
     def execute(self, args, request):
         from recruitment.models import JobPosition
+        from recruitment.stats import invalidate_pipeline_summary
         try:
-            p = JobPosition.objects.get(id=args['position_id'])
-            title = p.title
-            p.delete()
-            return {"deleted": True, "title": title}
+            p = _positions(request).get(id=args['position_id'])
         except JobPosition.DoesNotExist:
             return {"error": "Job position not found"}
+        _positions(request).filter(pk=p.pk).soft_delete()
+        invalidate_pipeline_summary(p.hub_id)
+        return {"deleted": True, "title": p.title}
 
 
 @register_tool
@@ -176,9 +455,359 @@ class DeleteApplication(AssistantTool):
     def execute(self, args, request):
         from recruitment.models import Candidate
         try:
-            c = Candidate.objects.get(id=args['candidate_id'])
-            name = c.name
-            c.delete()
-            return {"deleted": True, "name": name}
+            c = _candidates(request).get(id=args['candidate_id'])
         except Candidate.DoesNotExist:
             return {"error": "Candidate not found"}
+        c.is_deleted = True
+        c.deleted_at = timezone.now()
+        c.save(update_fields=['is_deleted', 'deleted_at', 'updated_at'])
+        return {"deleted": True, "name": c.name}
+
+
+# ======================================================================
+# Batch tools
+# ======================================================================
+#
+# A batch selects rows with ``where`` (a list of ids and/or filters),
+# can be previewed with preview_batch, and after one confirmation runs as
+# set-based UPDATEs in a single transaction. Passing the previewed count
+# as ``expected_count`` aborts the batch if the selection has changed.
+
+CANDIDATE_WHERE = {
+    "type": "object",
+    "properties": {
+        "ids": {"type": "array", "items": {"type": "string"}},
+        "position_id": {"type": "string"},
+        "stage": {"type": "string", "description": "applied, screening, interview, offer, hired, rejected"},
+        "min_rating": {"type": "integer"}, "max_rating": {"type": "integer"},
+    },
+    "additionalProperties": False,
+}
+
+POSITION_WHERE = {
+    "type": "object",
+    "properties": {
+        "ids": {"type": "array", "items": {"type": "string"}},
+        "status": {"type": "string", "description": "draft, open, closed, on_hold"},
+        "department": {"type": "string"},
+        "is_active": {"type": "boolean"},
+    },
+    "additionalProperties": False,
+}
+
+EXPECTED_COUNT = {"type": "integer", "description": "Row count shown by preview_batch; the batch aborts if it differs"}
+
+
+NOTHING_SELECTED = {"error": "Select rows with ids or at least one filter"}
+
+
+def _where_ids(where, filters):
+    """Add ``where['ids']`` to ``filters``; returns an error naming the first malformed id."""
+    if where.get('ids'):
+        ids = [_uuid(value) for value in where['ids']]
+        if None in ids:
+            return {"error": f"Invalid id: {where['ids'][ids.index(None)]}"}
+        filters['id__in'] = ids
+    return None
+
+
+def _select_candidates(request, where):
+    """``(qs, error)`` for the candidates a batch tool's ``where`` selects."""
+    filters = {}
+    error = _where_ids(where, filters)
+    if error:
+        return None, error
+    if where.get('position_id'):
+        filters['position_id'] = _uuid(where['position_id'])
+        if filters['position_id'] is None:
+            return None, {"error": f"Invalid position_id: {where['position_id']}"}
+    if where.get('stage'):
+        filters['stage'] = where['stage']
+    if where.get('min_rating') is not None:
+        filters['rating__gte'] = where['min_rating']
+    if where.get('max_rating') is not None:
+        filters['rating__lte'] = where['max_rating']
+    if not filters:
+        return None, NOTHING_SELECTED
+    return _candidates(request).filter(**filters), None
+
+
+def _select_positions(request, where):
+    """``(qs, error)`` for the job positions a batch tool's ``where`` selects."""
+    filters = {}
+    error = _where_ids(where, filters)
+    if error:
+        return None, error
+    if where.get('status'):
+        filters['status'] = where['status']
+    if where.get('department'):
+        filters['department__iexact'] = where['department']
+    if where.get('is_active') is not None:
+        filters['is_active'] = where['is_active']
+    if not filters:
+        return None, NOTHING_SELECTED
+    return _positions(request).filter(**filters), None
+
+
+BATCH_MODELS = {
+    # model: (selector, label field, count field)
+    "candidates": (_select_candidates, "name", "stage"),
+    "job_positions": (_select_positions, "title", "status"),
+}
+
+
+def _locked_ids(qs, args):
+    """
+    Lock and return the ids selected by ``qs`` inside the caller's
+    transaction, or an error dict when the batch must not run.
+    """
+    ids = list(qs.select_for_update().order_by().values_list('id', flat=True)[:MAX_BATCH_SIZE + 1])
+    if len(ids) > MAX_BATCH_SIZE:
+        return None, {"error": f"Selection exceeds {MAX_BATCH_SIZE} rows; narrow the filter"}
+    expected = args.get('expected_count')
+    if expected is not None and expected != len(ids):
+        return None, {"error": "Selection changed since the preview", "expected_count": expected, "count": len(ids)}
+    return ids, None
+
+
+@register_tool
+class PreviewBatch(AssistantTool):
+    name = "preview_batch"
+    description = (
+        "Preview which candidates or job positions a batch tool would change: count, breakdown and a sample. "
+        "Call this before a batch update or delete and pass the count on as expected_count."
+    )
+    module_id = "recruitment"
+    required_permission = "recruitment.view_candidate"
+    parameters = {
+        "type": "object",
+        "properties": {
+            "model": {"type": "string", "enum": list(BATCH_MODELS)},
+            "where": {"type": "object", "description": "Same selection as the batch tool"},
+        },
+        "required": ["model", "where"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        if not _hub_id(request):
+            return NO_HUB
+        select, label, group = BATCH_MODELS.get(args['model'], (None, None, None))
+        if select is None:
+            return {"error": "Unknown model"}
+        qs, error = select(request, args.get('where') or {})
+        if error:
+            return error
+        counts = _counts(qs, group)
+        sample = [_plain(row) for row in qs.order_by(label).values('id', label)[:PREVIEW_SAMPLE]]
+        return {"count": counts["total"], f"by_{group}": counts[f"by_{group}"], "sample": sample}
+
+
+@register_tool
+class CreateCandidatesBatch(AssistantTool):
+    name = "create_candidates_batch"
+    description = "Add several candidates at once. Rows with invalid data or an email already in the hub are skipped."
+    module_id = "recruitment"
+    required_permission = "recruitment.add_candidate"
+    requires_confirmation = True
+    parameters = {
+        "type": "object",
+        "properties": {
+            "candidates": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "position_id": {"type": "string"}, "name": {"type": "string"},
+                        "email": {"type": "string"}, "phone": {"type": "string"},
+                        "stage": {"type": "string"}, "rating": {"type": "integer"},
+                        "resume_notes": {"type": "string"},
+                    },
+                    "required": ["position_id", "name"],
+                },
+            },
+        },
+        "required": ["candidates"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from recruitment.imports import CandidateImporter
+        if not _hub_id(request):
+            return NO_HUB
+        rows = args.get('candidates') or []
+        if len(rows) > MAX_BATCH_SIZE:
+            return {"error": f"At most {MAX_BATCH_SIZE} candidates per call"}
+        rows = [{**row, "position": row.get("position_id")} for row in rows]
+        result = CandidateImporter(_hub_id(request)).run(rows)
+        return {
+            "created": result.created, "duplicates": result.duplicates, "failed": result.failed,
+            "errors": [{"row": number - 1, "error": message} for number, message in result.errors[:PREVIEW_SAMPLE]],
+        }
+
+
+@register_tool
+class UpdateCandidatesBatch(AssistantTool):
+    name = "update_candidates_batch"
+    description = (
+        "Move several candidates to a stage and/or set their rating in one step, e.g. reject everyone "
+        "below rating 2 for a position. Stage moves not allowed from a candidate's current stage are skipped."
+    )
+    module_id = "recruitment"
+    required_permission = "recruitment.change_candidate"
+    requires_confirmation = True
+    parameters = {
+        "type": "object",
+        "properties": {
+            "where": CANDIDATE_WHERE,
+            "stage": {"type": "string", "description": "applied, screening, interview, offer, hired, rejected"},
+            "rating": {"type": "integer"},
+            "expected_count": EXPECTED_COUNT,
+        },
+        "required": ["where"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.db import transaction
+        from recruitment import pipeline
+        from recruitment.models import Candidate
+        from recruitment.stats import invalidate_pipeline_summary
+        if not _hub_id(request):
+            return NO_HUB
+        if not args.get('stage') and args.get('rating') is None:
+            return {"error": "Nothing to update; pass stage and/or rating"}
+        if args.get('stage'):
+            try:
+                pipeline.stage_targets('set_stage', args['stage'])
+            except ValueError as exc:
+                return {"error": str(exc)}
+        qs, error = _select_candidates(request, args.get('where') or {})
+        if error:
+            return error
+        result = {}
+        with transaction.atomic():
+            ids, error = _locked_ids(qs, args)
+            if error:
+                return error
+            selected = Candidate.objects.filter(id__in=ids)
+            if args.get('rating') is not None:
+                result["rated"] = selected.update(rating=args['rating'], updated_at=timezone.now())
+            if args.get('stage'):
+                moved = pipeline.move_candidates(selected, 'set_stage', args['stage'])
+                result["moved"] = len(moved)
+                result["skipped"] = len(ids) - len(moved)
+        invalidate_pipeline_summary(_hub_id(request))
+        return {"count": len(ids), **result}
+
+
+@register_tool
+class DeleteCandidatesBatch(AssistantTool):
+    name = "delete_candidates_batch"
+    description = "Delete several candidate applications at once."
+    module_id = "recruitment"
+    required_permission = "recruitment.delete_candidate"
+    requires_confirmation = True
+    parameters = {
+        "type": "object",
+        "properties": {"where": CANDIDATE_WHERE, "expected_count": EXPECTED_COUNT},
+        "required": ["where"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.db import transaction
+        from recruitment.models import Candidate
+        from recruitment.stats import invalidate_pipeline_summary
+        if not _hub_id(request):
+            return NO_HUB
+        qs, error = _select_candidates(request, args.get('where') or {})
+        if error:
+            return error
+        with transaction.atomic():
+            ids, error = _locked_ids(qs, args)
+            if error:
+                return error
+            deleted = Candidate.objects.filter(id__in=ids).soft_delete()
+        invalidate_pipeline_summary(_hub_id(request))
+        return {"deleted": deleted}
+
+
+@register_tool
+class UpdateJobPostingsBatch(AssistantTool):
+    name = "update_job_postings_batch"
+    description = "Set the status, active flag or department of several job positions at once."
+    module_id = "recruitment"
+    required_permission = "recruitment.change_jobposition"
+    requires_confirmation = True
+    parameters = {
+        "type": "object",
+        "properties": {
+            "where": POSITION_WHERE,
+            "status": {"type": "string", "description": "draft, open, closed, on_hold"},
+            "is_active": {"type": "boolean"},
+            "department": {"type": "string"},
+            "expected_count": EXPECTED_COUNT,
+        },
+        "required": ["where"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.db import transaction
+        from recruitment import similarity
+        from recruitment.models import JOB_STATUS, JobPosition
+        from recruitment.stats import invalidate_pipeline_summary
+        if not _hub_id(request):
+            return NO_HUB
+        changes = {field: args[field] for field in ('status', 'is_active', 'department') if field in args}
+        if not changes:
+            return {"error": "Nothing to update; pass status, is_active and/or department"}
+        if 'status' in changes and changes['status'] not in dict(JOB_STATUS):
+            return {"error": f"Unknown status {changes['status']!r}"}
+        qs, error = _select_positions(request, args.get('where') or {})
+        if error:
+            return error
+        with transaction.atomic():
+            ids, error = _locked_ids(qs, args)
+            if error:
+                return error
+            updated = JobPosition.objects.filter(id__in=ids).update(**changes, updated_at=timezone.now())
+        if 'department' in changes:
+            # update() skips reindex_on_position_save; the department is
+            # part of every candidate's similarity document.
+            similarity.update_positions(_hub_id(request), ids)
+        invalidate_pipeline_summary(_hub_id(request))
+        return {"updated": updated}
+
+
+@register_tool
+class DeleteJobPostingsBatch(AssistantTool):
+    name = "delete_job_postings_batch"
+    description = "Delete several job positions at once."
+    module_id = "recruitment"
+    required_permission = "recruitment.delete_jobposition"
+    requires_confirmation = True
+    parameters = {
+        "type": "object",
+        "properties": {"where": POSITION_WHERE, "expected_count": EXPECTED_COUNT},
+        "required": ["where"],
+        "additionalProperties": False,
+    }
+
+    def execute(self, args, request):
+        from django.db import transaction
+        from recruitment.models import JobPosition
+        from recruitment.stats import invalidate_pipeline_summary
+        if not _hub_id(request):
+            return NO_HUB
+        qs, error = _select_positions(request, args.get('where') or {})
+        if error:
+            return error
+        with transaction.atomic():
+            ids, error = _locked_ids(qs, args)
+            if error:
+                return error
+            deleted = JobPosition.objects.filter(id__in=ids).soft_delete()
+        invalidate_pipeline_summary(_hub_id(request))
+        return {"deleted": deleted}
@@ -9,4 +9,4 @@ class RecruitmentConfig(AppConfig):
     verbose_name = _('Recruitment')
 
     def ready(self):
-        pass
+        from . import signals  # noqa: F401
@@ -0,0 +1,137 @@
+"""
+Native async variants of the dashboard and list views, for ASGI.
+
+urls.py routes to these instead of views.py when RECRUITMENT_ASYNC_VIEWS
+is set. Database reads go through the async ORM (``acount``, async
+iteration, ``aiterator`` for exports), so a worker can serve other
+requests while one waits on the database; CSV exports stream from an
+async generator.
+
+``login_required``, ``with_module_nav`` and ``htmx_view`` are sync, so
+they run in ``sync_to_async`` around the async part: the login check
+first, on its own, then the nav and htmx decorators around a function
+that returns the context (or renders the fragment) the async part built.
+Responses are the same as from the sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+
+from apps.accounts.decorators import login_required
+from apps.core.htmx import htmx_view
+from apps.modules_runtime.navigation import with_module_nav
+
+from . import facets
+from .exports import aexport_response
+from .instrumentation import instrumented, timed_render
+from .models import CAND_STAGE, Candidate, JobPosition
+from .pagination import apaginate_by_cursor
+from .routers import replica_reads
+from .search import get_backend
+from .stats import apipeline_summary
+from .views import (
+    CANDIDATE_EXPORT_COLUMNS, CANDIDATE_SORT_FIELDS, JOB_POSITION_EXPORT_COLUMNS, JOB_POSITION_SORT_FIELDS,
+    SCROLL_CHUNK, _is_scroll, _list_params, _list_partial, _sorted_list,
+)
+
+
+def _allowed(request):
+    return None
+
+
+# None when the request may proceed, else login_required's response.
+_login_gate = sync_to_async(login_required(_allowed))
+
+
+def _finish(nav, page, partial):
+    """The sync decorators of a page around the context built by its async view."""
+    @with_module_nav('recruitment', nav)
+    @htmx_view(page, partial)
+    def finish(request, context, template=None):
+        if template:
+            return timed_render(request, template, context)
+        return context
+    return sync_to_async(finish)
+
+
+_finish_dashboard = _finish(
+    'dashboard', 'recruitment/pages/index.html', 'recruitment/partials/dashboard_content.html',
+)
+_finish_job_positions = _finish(
+    'positions', 'recruitment/pages/job_positions.html', 'recruitment/partials/job_positions_content.html',
+)
+_finish_candidates = _finish(
+    'candidates', 'recruitment/pages/candidates.html', 'recruitment/partials/candidates_content.html',
+)
+
+
+async def _asorted_list(qs, params, sort_fields, default_sort):
+    if params['search_query']:
+        # Picking the backend may introspect the database the first time.
+        await sync_to_async(get_backend)(qs.db)
+    return _sorted_list(qs, params, sort_fields, default_sort)
+
+
+async def _alist_page(request, qs, order_field, params):
+    per_page = params['per_page']
+    if params['paginate_mode'] == 'cursor':
+        return await apaginate_by_cursor(
+            qs, order_field, params['sort_dir'] == 'desc',
+            cursor=request.GET.get('cursor'), per_page=per_page or SCROLL_CHUNK,
+        )
+    total = await qs.acount()
+    paginator = Paginator(qs, per_page or max(total, 1))
+    paginator.count = total
+    page = paginator.get_page(request.GET.get('page', 1) if per_page else 1)
+    page.object_list = [row async for row in page.object_list]
+    return page
+
+
+async def _alist(request, name, qs, sort_fields, default_sort, export_columns, finish, faceted=False, **extra):
+    denied = await _login_gate(request)
+    if denied is not None:
+        return denied
+    params = _list_params(request, default_sort)
+    base, order_field = await _asorted_list(qs(request.session.get('hub_id')), params, sort_fields, default_sort)
+    filters = facets.parse_filters(request.GET) if faceted else None
+    qs = facets.apply_filters(base, filters) if faceted else base
+
+    export_format = request.GET.get('export')
+    if export_format in ('csv', 'excel'):
+        return await aexport_response(qs, export_columns, export_format, name)
+
+    page_obj = await _alist_page(request, qs, order_field, params)
+    context = {name: page_obj, 'page_obj': page_obj, **extra, **params}
+    if faceted:
+        context.update(filters=filters, filtered=facets.is_filtered(filters))
+        if not _is_scroll(request):
+            context['facets'] = await facets.afacet_counts(base, filters)
+    return await finish(request, context, _list_partial(request, name))
+
+
+@instrumented
+@replica_reads
+async def dashboard(request):
+    denied = await _login_gate(request)
+    if denied is not None:
+        return denied
+    return await _finish_dashboard(request, await apipeline_summary(request.session.get('hub_id')))
+
+
+@instrumented
+@replica_reads
+async def job_positions_list(request):
+    return await _alist(
+        request, 'job_positions',
+        JobPosition.objects.for_list,
+        JOB_POSITION_SORT_FIELDS, 'title', JOB_POSITION_EXPORT_COLUMNS, _finish_job_positions,
+    )
+
+
+@instrumented
+@replica_reads
+async def candidates_list(request):
+    return await _alist(
+        request, 'candidates', Candidate.objects.for_list,
+        CANDIDATE_SORT_FIELDS, 'name', CANDIDATE_EXPORT_COLUMNS, _finish_candidates,
+        faceted=True, stage_choices=CAND_STAGE,
+    )
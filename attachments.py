@@ -0,0 +1,343 @@
+"""
+Candidate attachments: content-addressed storage, resumable chunked
+uploads and range downloads.
+
+Files live on a FileSystemStorage under RECRUITMENT_ATTACHMENT_ROOT
+(default ``MEDIA_ROOT/recruitment/attachments``):
+
+- ``blobs/ab/cd/<sha256>``: one file per distinct content, so a resume
+  attached to candidates for several positions is stored once;
+- ``uploads/<upload id>.part``: uploads in progress.
+
+An upload is started with its size and then sent in chunks, each written
+at the offset the client names. A chunk for any other offset than the
+one the upload is at is refused with that offset, so an interrupted
+upload resumes where the server stopped. When the last byte arrives the
+part file is hashed and moved into place, or dropped if the blob already
+exists. Chunks, hashing and downloads go through BUFFER_SIZE buffers, so
+memory use does not grow with the file.
+
+Blob rows count the attachments pointing at them. Taking a reference and
+deleting an unreferenced blob both start with an UPDATE of the blob row
+and touch its file while holding that lock, so a blob is never removed
+under an upload that is reusing it.
+"""
+import hashlib
+import logging
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F, ProtectedError, Sum
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from .models import ATTACHMENT_KIND, AttachmentBlob, AttachmentUpload, CandidateAttachment
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+# Unreferenced blobs and stray files younger than this are kept.
+DEFAULT_GRACE_SECONDS = 3600
+DEFAULT_UPLOAD_EXPIRY_SECONDS = 24 * 3600
+
+KIND_CODES = {code for code, _label in ATTACHMENT_KIND}
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(ValueError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    """A chunk sent for another offset than the one the upload is at."""
+
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+def storage():
+    root = getattr(settings, 'RECRUITMENT_ATTACHMENT_ROOT', None)
+    return FileSystemStorage(location=root or os.path.join(settings.MEDIA_ROOT, 'recruitment', 'attachments'))
+
+
+def chunk_size():
+    return getattr(settings, 'RECRUITMENT_ATTACHMENT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def max_size():
+    return getattr(settings, 'RECRUITMENT_ATTACHMENT_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+
+def blob_name(sha256):
+    return f'blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def _part_path(upload_id):
+    return storage().path(f'uploads/{upload_id}.part')
+
+
+def _hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while data := file.read(BUFFER_SIZE):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+# -- Uploads -----------------------------------------------------------------
+
+def start_upload(candidate, filename, size, content_type='', kind='resume'):
+    if not 0 <= size <= max_size():
+        raise UploadError(f'Attachments are limited to {max_size()} bytes')
+    if kind not in KIND_CODES:
+        raise UploadError(f'Unknown attachment kind {kind!r}')
+    upload = AttachmentUpload.objects.create(
+        hub_id=candidate.hub_id, candidate=candidate,
+        filename=os.path.basename(filename.replace('\\', '/'))[:255] or 'attachment',
+        content_type=content_type[:100], kind=kind, size=size,
+    )
+    path = _part_path(upload.pk)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length):
+    """Write ``length`` bytes read from ``stream`` at ``offset``; returns the new offset."""
+    if offset != upload.received:
+        raise OffsetMismatch(upload.received)
+    if not 0 <= length <= chunk_size() or offset + length > upload.size:
+        raise UploadError('Chunk is larger than allowed or runs past the end of the file')
+    remaining = length
+    with open(_part_path(upload.pk), 'r+b') as part:
+        part.seek(offset)
+        while remaining:
+            data = stream.read(min(BUFFER_SIZE, remaining))
+            if not data:
+                # Client went away; the next chunk resumes from here.
+                break
+            part.write(data)
+            remaining -= len(data)
+    end = offset + length - remaining
+    # Retries of a chunk write the same bytes; only the first one advances.
+    if not AttachmentUpload.objects.filter(pk=upload.pk, received=offset).update(
+        received=end, updated_at=timezone.now(),
+    ):
+        upload.refresh_from_db(fields=['received'])
+        raise OffsetMismatch(upload.received)
+    upload.received = end
+    return end
+
+
+def _reference(sha256, size):
+    now = timezone.now()
+    for _attempt in range(3):
+        if AttachmentBlob.objects.filter(pk=sha256).update(refcount=F('refcount') + 1, updated_at=now):
+            return
+        try:
+            with transaction.atomic():
+                AttachmentBlob.objects.create(sha256=sha256, size=size, refcount=1, updated_at=now)
+            return
+        except IntegrityError:
+            # Created by a concurrent upload of the same content; count on it.
+            continue
+    raise UploadError(f'Could not reference blob {sha256}')
+
+
+def _place(path, sha256):
+    target = storage().path(blob_name(sha256))
+    if os.path.exists(target):
+        os.remove(path)
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(path, target)
+
+
+def finish_upload(upload):
+    """Store a fully received upload as a blob and attach it to its candidate."""
+    if upload.received != upload.size:
+        raise UploadError('Upload is incomplete')
+    path = _part_path(upload.pk)
+    sha256 = _hash(path)
+    with transaction.atomic():
+        # Claims the upload, so it is attached once however many requests finish it.
+        if not AttachmentUpload.objects.filter(pk=upload.pk).delete()[0]:
+            raise UploadError('Upload already finished')
+        _reference(sha256, upload.size)
+        _place(path, sha256)
+        return CandidateAttachment.objects.create(
+            hub_id=upload.hub_id, candidate_id=upload.candidate_id, blob_id=sha256,
+            filename=upload.filename, content_type=upload.content_type, kind=upload.kind,
+        )
+
+
+def release(sha256):
+    """Drop one reference; called when an attachment row is deleted (signals.py)."""
+    AttachmentBlob.objects.filter(pk=sha256).update(refcount=F('refcount') - 1, updated_at=timezone.now())
+
+
+# -- Downloads ---------------------------------------------------------------
+
+def parse_range(header, size):
+    """
+    ``(start, end)``, inclusive, of a single ``bytes=`` range; None to send
+    the whole file (no header, several ranges or an invalid one); False
+    when the range starts past the end.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        return (max(size - suffix, 0), size - 1) if suffix and size else False
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _read(file, length):
+    with file:
+        while length > 0:
+            data = file.read(min(BUFFER_SIZE, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+
+def download_response(request, attachment):
+    """Stream ``attachment``, honouring a single ``Range`` (and ``If-Range``)."""
+    blob = attachment.blob
+    etag = f'"{blob.sha256}"'
+    byte_range = parse_range(request.headers.get('Range'), blob.size)
+    if request.headers.get('If-Range', etag) != etag:
+        byte_range = None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{blob.size}'
+        return response
+
+    start, end = byte_range or (0, blob.size - 1)
+    try:
+        file = storage().open(blob_name(blob.sha256), 'rb')
+    except FileNotFoundError:
+        logger.error('Attachment %s: blob %s is missing', attachment.pk, blob.sha256)
+        raise Http404
+    file.seek(start)
+    response = StreamingHttpResponse(
+        _read(file, end - start + 1), status=206 if byte_range else 200,
+        content_type=attachment.content_type or 'application/octet-stream',
+    )
+    response['Content-Length'] = str(end - start + 1)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{blob.size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = content_disposition_header(True, attachment.filename)
+    return response
+
+
+# -- Garbage collection ------------------------------------------------------
+
+def _delete_blob(sha256):
+    with transaction.atomic():
+        # Locks the row (the database, on SQLite) and re-checks the count:
+        # an upload taking a reference waits until the file is gone.
+        if not AttachmentBlob.objects.filter(pk=sha256, refcount__lte=0).update(refcount=0):
+            return False
+        AttachmentBlob.objects.filter(pk=sha256).delete()
+        storage().delete(blob_name(sha256))
+    return True
+
+
+def _old_files(directory, cutoff):
+    root = storage().path(directory)
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.getmtime(path) < cutoff.timestamp():
+                yield filename, path
+
+
+def _stray_blobs(cutoff, batch_size=1000):
+    """Blob files older than ``cutoff`` with no row, e.g. from an upload that failed mid-commit."""
+    batch = []
+    for item in _old_files('blobs', cutoff):
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield from _without_rows(batch)
+            batch = []
+    yield from _without_rows(batch)
+
+
+def _without_rows(batch):
+    known = set(AttachmentBlob.objects.filter(pk__in=[name for name, _path in batch]).values_list('pk', flat=True))
+    return [path for name, path in batch if name not in known]
+
+
+def collect_garbage(grace_seconds=DEFAULT_GRACE_SECONDS, dry_run=False):
+    """
+    Purge attachment tombstones older than the retention window, then
+    delete blobs unreferenced for ``grace_seconds``, stray blob files and
+    uploads untouched for RECRUITMENT_ATTACHMENT_UPLOAD_EXPIRY seconds.
+    Returns the counts and the bytes of blobs freed.
+    """
+    from .retention import DEFAULT_BATCH_SIZE, _purge, retention_days
+
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=grace_seconds)
+    expiry = now - timedelta(seconds=getattr(
+        settings, 'RECRUITMENT_ATTACHMENT_UPLOAD_EXPIRY', DEFAULT_UPLOAD_EXPIRY_SECONDS,
+    ))
+    tombstones = CandidateAttachment.all_objects.filter(
+        is_deleted=True, deleted_at__lt=now - timedelta(days=retention_days()),
+    )
+    orphans = AttachmentBlob.objects.filter(refcount__lte=0, updated_at__lt=cutoff)
+    expired = AttachmentUpload.objects.filter(updated_at__lt=expiry)
+    if dry_run:
+        return {
+            'attachments': tombstones.count(),
+            'blobs': orphans.count(),
+            'bytes': orphans.aggregate(total=Sum('size'))['total'] or 0,
+            'files': len(list(_stray_blobs(cutoff))),
+            'uploads': expired.count(),
+        }
+
+    counts = {'attachments': _purge(tombstones, DEFAULT_BATCH_SIZE, 0), 'blobs': 0, 'bytes': 0}
+    for sha256, size in list(orphans.values_list('sha256', 'size')):
+        try:
+            deleted = _delete_blob(sha256)
+        except ProtectedError:
+            # Attachments still point at it: the count drifted. Recount.
+            logger.warning('Blob %s has attachments but a zero refcount; recounting', sha256)
+            AttachmentBlob.objects.filter(pk=sha256).update(
+                refcount=CandidateAttachment.all_objects.filter(blob_id=sha256).count(),
+            )
+            continue
+        if deleted:
+            counts['blobs'] += 1
+            counts['bytes'] += size
+
+    counts['files'] = 0
+    for path in _stray_blobs(cutoff):
+        os.remove(path)
+        counts['files'] += 1
+
+    counts['uploads'] = expired.delete()[0]
+    live = {str(pk) for pk in AttachmentUpload.objects.values_list('pk', flat=True)}
+    for filename, path in _old_files('uploads', expiry):
+        if filename.removesuffix('.part') not in live:
+            os.remove(path)
+    return counts
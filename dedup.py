@@ -0,0 +1,233 @@
+"""
+Candidate de-duplication within a hub.
+
+The same person often applies to several positions and ends up as
+separate Candidate rows with slightly different spellings. The engine:
+
+1. streams the hub's live candidates once and normalises email (case,
+   ``+tags``, Gmail dots) and phone (E.164 where the country is known);
+2. blocks them by normalised email and phone, so only candidates sharing
+   a key are ever compared (no O(n²) pass over the hub);
+3. scores each pair in a block on fuzzy name similarity plus the
+   matching contact keys, and joins pairs above the threshold into
+   groups with a union-find.
+
+Groups are stored as DuplicateGroup rows for the merge review screen;
+``find_duplicates`` is the management command that refreshes them.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Candidate, DuplicateGroup
+
+# Pair score = name similarity * NAME_WEIGHT + the weights of the contact
+# keys the pair shares. A shared key alone never reaches the threshold.
+NAME_WEIGHT = 0.5
+EMAIL_WEIGHT = 0.35
+PHONE_WEIGHT = 0.25
+DEFAULT_THRESHOLD = 0.7
+# Blocks larger than this are shared placeholders (info@, 000000) rather
+# than one person, and are skipped.
+MAX_BLOCK_SIZE = 50
+CHUNK_SIZE = 5000
+
+GMAIL_DOMAINS = {'gmail.com', 'googlemail.com'}
+NON_DIGIT_RE = re.compile(r'\D')
+NAME_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalise_email(email):
+    email = (email or '').strip().lower()
+    local, at, domain = email.rpartition('@')
+    if not at or not local or not domain:
+        return ''
+    local = local.split('+', 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local, domain = local.replace('.', ''), 'gmail.com'
+    return f'{local}@{domain}'
+
+
+def normalise_phone(phone, calling_code=None):
+    """
+    E.164 (``+<country><number>``) when the number carries its country or
+    a default ``calling_code`` is given; otherwise the bare national digits.
+    """
+    phone = (phone or '').strip()
+    digits = NON_DIGIT_RE.sub('', phone)
+    if len(digits) < 6:
+        return ''
+    if phone.startswith('+'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]
+    elif calling_code:
+        number = f'{calling_code}{digits.lstrip("0")}'
+    else:
+        return digits
+    return f'+{number}' if 8 <= len(number) <= 15 else ''
+
+
+def normalise_name(name):
+    """Accent-free, lowercase tokens in sorted order ("García, Ana" == "ana garcia")."""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    return ' '.join(sorted(NAME_TOKEN_RE.findall(name.lower())))
+
+
+def _add_to_block(blocks, key, index):
+    # Most keys are unique: keep a bare index until a second row shares it.
+    existing = blocks.get(key)
+    if existing is None:
+        blocks[key] = index
+    elif isinstance(existing, int):
+        blocks[key] = [existing, index]
+    else:
+        existing.append(index)
+
+
+class DuplicateFinder:
+
+    def __init__(self, hub_id, threshold=DEFAULT_THRESHOLD, max_block_size=MAX_BLOCK_SIZE, calling_code=None):
+        self.hub_id = hub_id
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        if calling_code is None:
+            calling_code = getattr(settings, 'RECRUITMENT_DEFAULT_CALLING_CODE', None)
+        self.calling_code = calling_code
+
+    def _load(self):
+        self.ids, self.names, self.emails, self.phones = [], [], [], []
+        self.email_blocks, self.phone_blocks = {}, {}
+        rows = (
+            Candidate.objects.for_hub(self.hub_id).order_by()
+            .values_list('id', 'name', 'email', 'phone').iterator(chunk_size=CHUNK_SIZE)
+        )
+        for index, (pk, name, email, phone) in enumerate(rows):
+            email = normalise_email(email)
+            phone = normalise_phone(phone, self.calling_code)
+            self.ids.append(pk)
+            self.names.append(normalise_name(name))
+            self.emails.append(email)
+            self.phones.append(phone)
+            if email:
+                _add_to_block(self.email_blocks, email, index)
+            if phone:
+                _add_to_block(self.phone_blocks, phone, index)
+
+    def _blocks(self):
+        for blocks in (self.email_blocks, self.phone_blocks):
+            for block in blocks.values():
+                if isinstance(block, list) and len(block) <= self.max_block_size:
+                    yield block
+
+    def score(self, a, b):
+        contact = 0.0
+        if self.emails[a] and self.emails[a] == self.emails[b]:
+            contact += EMAIL_WEIGHT
+        if self.phones[a] and self.phones[a] == self.phones[b]:
+            contact += PHONE_WEIGHT
+        needed = (self.threshold - contact) / NAME_WEIGHT
+        matcher = SequenceMatcher(None, self.names[a], self.names[b])
+        # quick_ratio() is a cheap upper bound; skip the full diff when it can't reach the threshold.
+        if needed > 0 and matcher.quick_ratio() < needed:
+            return 0.0
+        return min(contact + NAME_WEIGHT * matcher.ratio(), 1.0)
+
+    def run(self):
+        """Return ``[(score, [candidate_id, ...])]``, best groups first."""
+        self._load()
+        parent = {}
+
+        def find(index):
+            root = parent.setdefault(index, index)
+            while root != parent[root]:
+                root = parent[root]
+            parent[index] = root
+            return root
+
+        best = defaultdict(float)
+        compared = set()
+        for block in self._blocks():
+            for a, b in combinations(sorted(block), 2):
+                if (a, b) in compared:
+                    continue
+                compared.add((a, b))
+                score = self.score(a, b)
+                if score >= self.threshold:
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+                    best[(a, b)] = score
+
+        groups = defaultdict(list)
+        for index in parent:
+            groups[find(index)].append(index)
+        group_scores = defaultdict(float)
+        for (a, _b), score in best.items():
+            root = find(a)
+            group_scores[root] = max(group_scores[root], score)
+        return sorted(
+            ((round(group_scores[root], 3), [self.ids[i] for i in sorted(members)])
+             for root, members in groups.items() if len(members) > 1),
+            key=lambda group: -group[0],
+        )
+
+
+def signature(candidate_ids):
+    return hashlib.sha1(','.join(sorted(str(pk) for pk in candidate_ids)).encode()).hexdigest()
+
+
+def refresh_duplicate_groups(hub_id, **options):
+    """
+    Replace the hub's pending DuplicateGroups with a fresh scan. Groups a
+    recruiter dismissed are remembered by their member signature and not
+    raised again. Returns the number of pending groups.
+    """
+    found = DuplicateFinder(hub_id, **options).run()
+    with transaction.atomic():
+        DuplicateGroup.objects.filter(hub_id=hub_id, status='pending').delete()
+        dismissed = set(
+            DuplicateGroup.objects.filter(hub_id=hub_id, status='dismissed').values_list('signature', flat=True)
+        )
+        pending = [
+            (DuplicateGroup(hub_id=hub_id, score=score, signature=signature(ids)), ids)
+            for score, ids in found if signature(ids) not in dismissed
+        ]
+        DuplicateGroup.objects.bulk_create([group for group, _ids in pending], batch_size=CHUNK_SIZE)
+        Member = DuplicateGroup.candidates.through
+        Member.objects.bulk_create(
+            [Member(duplicategroup_id=group.pk, candidate_id=pk) for group, ids in pending for pk in ids],
+            batch_size=CHUNK_SIZE,
+        )
+    return len(pending)
+
+
+def merge_group(group, primary_id):
+    """
+    Fold the group's other live candidates into ``primary_id``: blank
+    contact fields are filled in, notes are appended, the best rating is
+    kept, and the others are soft-deleted. Returns the primary candidate.
+    """
+    with transaction.atomic():
+        members = list(group.candidates.filter(is_deleted=False).select_for_update().order_by('created_at'))
+        primary = next((c for c in members if str(c.pk) == str(primary_id)), None)
+        if primary is None:
+            raise Candidate.DoesNotExist(primary_id)
+        others = [c for c in members if c.pk != primary.pk]
+        for field in ('email', 'phone'):
+            if not getattr(primary, field):
+                setattr(primary, field, next((getattr(c, field) for c in others if getattr(c, field)), ''))
+        notes = [primary.resume_notes] + [c.resume_notes for c in others]
+        primary.resume_notes = '\n\n'.join(dict.fromkeys(note.strip() for note in notes if note.strip()))
+        primary.rating = max(c.rating for c in members)
+        primary.save()
+        Candidate.objects.filter(pk__in=[c.pk for c in others]).soft_delete()
+        group.delete()
+    return primary
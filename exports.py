@@ -0,0 +1,117 @@
+"""
+Streaming exports for the recruitment lists.
+
+Rows come from ``values_list(...).iterator()`` so neither the queryset
+nor the file is held in memory: CSV is written line by line into a
+StreamingHttpResponse and Excel goes through a write-only workbook that
+openpyxl spools to a temporary file. The ``a``-prefixed variants do the
+same through the async ORM for the ASGI views (async_views.py).
+"""
+import csv
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(qs, fields, chunk_size=CHUNK_SIZE):
+    """Iterate ``fields`` of ``qs`` as tuples, following relations in SQL."""
+    return qs.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+async def aexport_rows(qs, fields, chunk_size=CHUNK_SIZE):
+    # values_list()'s iterable runs its query as soon as aiterator() creates
+    # it, on the event loop; values() defers it to the worker thread.
+    async for row in qs.values(*fields).aiterator(chunk_size=chunk_size):
+        yield tuple(row[field] for field in fields)
+
+
+def _csv_response(content, filename):
+    response = StreamingHttpResponse(content, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_csv(rows, headers, filename):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    return _csv_response(lines(), filename)
+
+
+def astream_csv(rows, headers, filename):
+    """CSV from an async iterator of rows, streamed by the ASGI handler."""
+    writer = csv.writer(_Echo())
+
+    async def lines():
+        yield writer.writerow(headers)
+        async for row in rows:
+            yield writer.writerow(row)
+
+    return _csv_response(lines(), filename)
+
+
+def _workbook(headers):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    return workbook, sheet
+
+
+def _save(workbook, filename):
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def stream_excel(rows, headers, filename):
+    workbook, sheet = _workbook(headers)
+    for row in rows:
+        sheet.append(row)
+    return _save(workbook, filename)
+
+
+async def astream_excel(rows, headers, filename):
+    workbook, sheet = _workbook(headers)
+    async for row in rows:
+        sheet.append(row)
+    # Writing the zip is blocking file I/O; keep it off the event loop.
+    return await sync_to_async(_save, thread_sensitive=False)(workbook, filename)
+
+
+def export_response(qs, columns, export_format, basename):
+    """Stream ``qs`` as CSV or Excel; ``columns`` is ``[(lookup, header), ...]``."""
+    fields = [field for field, _header in columns]
+    headers = [header for _field, header in columns]
+    # Streaming runs after the view returns; keep the database it routed to.
+    rows = export_rows(qs.using(qs.db), fields)
+    if export_format == 'csv':
+        return stream_csv(rows, headers, f'{basename}.csv')
+    return stream_excel(rows, headers, f'{basename}.xlsx')
+
+
+async def aexport_response(qs, columns, export_format, basename):
+    """``export_response`` reading through the async ORM."""
+    fields = [field for field, _header in columns]
+    headers = [header for _field, header in columns]
+    rows = aexport_rows(qs.using(qs.db), fields)
+    if export_format == 'csv':
+        return astream_csv(rows, headers, f'{basename}.csv')
+    return await astream_excel(rows, headers, f'{basename}.xlsx')
@@ -0,0 +1,149 @@
+"""
+Structured filters and facet counts for the candidates list.
+
+Filters come from the query string, repeated for several values:
+``positions`` (ids), ``departments``, ``stages`` and a ``min_rating`` /
+``max_rating`` range. Values within a filter are OR-ed, filters are
+AND-ed.
+
+Facet counts are computed from the list's base queryset (hub, live rows
+and search, before these filters) with one query grouped on
+``(position, stage, rating)``, which the ``rec_cand_hub_facet_idx``
+index answers without reading the table. Each facet then counts the
+groups that pass every *other* filter, so each option shows how many
+rows the list would hold with it selected. Departments are looked up per position.
+"""
+from collections import Counter
+from uuid import UUID
+
+from django.db.models import Count
+
+from .models import CAND_STAGE, JobPosition
+
+STAGE_CODES = {code for code, _label in CAND_STAGE}
+
+
+def _values(params, name):
+    return [value.strip() for value in params.getlist(name) if value.strip()]
+
+
+def _rating(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _uuids(values):
+    valid = []
+    for value in values:
+        try:
+            valid.append(str(UUID(value)))
+        except ValueError:
+            pass
+    return valid
+
+
+def parse_filters(params):
+    """Filters from a QueryDict; unknown or malformed values are dropped."""
+    return {
+        'positions': _uuids(_values(params, 'positions')),
+        'departments': _values(params, 'departments'),
+        'stages': [stage for stage in _values(params, 'stages') if stage in STAGE_CODES],
+        'min_rating': _rating(params.get('min_rating')),
+        'max_rating': _rating(params.get('max_rating')),
+    }
+
+
+def is_filtered(filters):
+    return any(value not in (None, []) for value in filters.values())
+
+
+def apply_filters(qs, filters):
+    if filters['positions']:
+        qs = qs.filter(position_id__in=filters['positions'])
+    if filters['departments']:
+        qs = qs.filter(position__department__in=filters['departments'])
+    if filters['stages']:
+        qs = qs.filter(stage__in=filters['stages'])
+    if filters['min_rating'] is not None:
+        qs = qs.filter(rating__gte=filters['min_rating'])
+    if filters['max_rating'] is not None:
+        qs = qs.filter(rating__lte=filters['max_rating'])
+    return qs
+
+
+# -- Counts ------------------------------------------------------------------
+
+def _groups(qs):
+    return qs.order_by().values_list('position_id', 'stage', 'rating').annotate(n=Count('*'))
+
+
+def _labels(position_ids):
+    return JobPosition.objects.filter(id__in=position_ids).values_list('id', 'title', 'department')
+
+
+def _label_ids(groups, filters):
+    return {position_id for position_id, *_rest in groups} | {UUID(pk) for pk in filters['positions']}
+
+
+def facet_counts(qs, filters):
+    """Options with counts for every filter; ``qs`` is the unfiltered base queryset."""
+    groups = list(_groups(qs))
+    return _build(groups, list(_labels(_label_ids(groups, filters))), filters)
+
+
+async def afacet_counts(qs, filters):
+    groups = [row async for row in _groups(qs)]
+    labels = [row async for row in _labels(_label_ids(groups, filters))]
+    return _build(groups, labels, filters)
+
+
+def _passes(values, filters, skip):
+    for name in ('positions', 'departments', 'stages'):
+        if name != skip and filters[name] and values[name] not in filters[name]:
+            return False
+    if skip != 'rating':
+        if filters['min_rating'] is not None and values['rating'] < filters['min_rating']:
+            return False
+        if filters['max_rating'] is not None and values['rating'] > filters['max_rating']:
+            return False
+    return True
+
+
+def _option(value, label, count, selected):
+    return {'value': value, 'label': label, 'count': count, 'selected': selected}
+
+
+def _build(groups, labels, filters):
+    titles = {str(pk): title for pk, title, _department in labels}
+    departments = {str(pk): department for pk, _title, department in labels}
+    counts = {name: Counter() for name in ('positions', 'departments', 'stages', 'rating')}
+    for position_id, stage, rating, n in groups:
+        values = {
+            'positions': str(position_id),
+            'departments': departments.get(str(position_id), ''),
+            'stages': stage,
+            'rating': rating,
+        }
+        for name, counter in counts.items():
+            if _passes(values, filters, skip=name):
+                counter[values[name]] += n
+
+    position_options = sorted(
+        (_option(pk, title, counts['positions'][pk], pk in filters['positions']) for pk, title in titles.items()),
+        key=lambda option: option['label'].lower(),
+    )
+    department_names = sorted({name for name in departments.values() if name} | set(filters['departments']))
+    return {
+        'positions': position_options,
+        'departments': [
+            _option(name, name, counts['departments'][name], name in filters['departments'])
+            for name in department_names
+        ],
+        'stages': [
+            _option(code, label, counts['stages'][code], code in filters['stages'])
+            for code, label in CAND_STAGE
+        ],
+        'rating': [_option(value, str(value), n, False) for value, n in sorted(counts['rating'].items())],
+    }
@@ -30,3 +30,9 @@ class CandidateForm(forms.ModelForm):
             'rating': forms.TextInput(attrs={'class': 'input input-sm w-full', 'type': 'number'}),
         }
 
+
+class CandidateImportForm(CandidateForm):
+    """CandidateForm rules for one imported row; the position is resolved separately."""
+
+    class Meta(CandidateForm.Meta):
+        fields = ['name', 'email', 'phone', 'stage', 'resume_notes', 'rating']
@@ -0,0 +1,264 @@
+"""
+Stage history and funnel metrics.
+
+Every stage change appends a CandidateStageEvent: single saves through
+the post_save signal, set-based moves through ``pipeline.move_candidates``
+and imports through ``record_created``. The event carries how long the
+candidate spent in the stage it left, taken from
+``Candidate.stage_changed_at``, so no later query has to pair events up.
+
+``rollup_stage_metrics`` (run periodically via the management command of
+the same name) folds the events written since its last run into
+PositionStageMetrics: per position and stage, how many candidates
+entered, where they went next and a fixed-bucket histogram of time in
+stage. Histograms add up, so median and p90 for a hub come from summing
+its positions' rows; the dashboard never reads the event log.
+"""
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CAND_STAGE, Candidate, CandidateStageEvent, PositionStageMetrics, StageMetricsCursor
+
+HOUR = 3600
+DAY = 24 * HOUR
+# Upper bounds (seconds) of the time-in-stage histogram buckets; the last
+# bucket is open ended. Changing these requires ``rollup_stage_metrics --rebuild``.
+DURATION_BUCKETS = (
+    HOUR, 4 * HOUR, 12 * HOUR, DAY, 2 * DAY, 3 * DAY, 5 * DAY, 7 * DAY, 10 * DAY,
+    14 * DAY, 21 * DAY, 30 * DAY, 45 * DAY, 60 * DAY, 90 * DAY, 180 * DAY, None,
+)
+_BOUNDS = DURATION_BUCKETS[:-1]
+
+DEFAULT_BATCH_SIZE = 5000
+# Events younger than this are left for the next run, so rows from
+# transactions still in flight (holding lower ids) are not skipped.
+DEFAULT_SETTLE_SECONDS = 60
+CURSOR_NAME = 'stage_metrics'
+
+STAGE_ORDER = {code: index for index, (code, _label) in enumerate(CAND_STAGE)}
+
+
+def settle_seconds():
+    return getattr(settings, 'RECRUITMENT_STAGE_METRICS_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+
+
+def _seconds_since(then, now):
+    return max(int((now - then).total_seconds()), 0) if then else None
+
+
+# -- Writing events ----------------------------------------------------------
+
+def record_created(candidates, now=None, batch_size=None):
+    """Log the initial stage of newly created ``candidates``."""
+    now = now or timezone.now()
+    CandidateStageEvent.objects.bulk_create([
+        CandidateStageEvent(
+            hub_id=c.hub_id, candidate_id=c.pk, position_id=c.position_id,
+            from_stage='', to_stage=c.stage, created_at=now,
+        )
+        for c in candidates
+    ], batch_size=batch_size)
+
+
+def record_stage_change(candidate, from_stage, now=None):
+    """Log a single candidate's move out of ``from_stage`` and restart its clock."""
+    now = now or timezone.now()
+    CandidateStageEvent.objects.create(
+        hub_id=candidate.hub_id, candidate_id=candidate.pk, position_id=candidate.position_id,
+        from_stage=from_stage, to_stage=candidate.stage,
+        seconds_in_stage=_seconds_since(candidate.stage_changed_at, now), created_at=now,
+    )
+    Candidate.all_objects.filter(pk=candidate.pk).update(stage_changed_at=now)
+    candidate.stage_changed_at = now
+
+
+def record_moves(rows, targets, now):
+    """
+    Log a set-based move. ``rows`` are ``(id, hub_id, position_id, stage,
+    stage_changed_at)`` as read before the UPDATE and ``targets`` maps
+    each source stage to its destination.
+    """
+    CandidateStageEvent.objects.bulk_create([
+        CandidateStageEvent(
+            hub_id=hub_id, candidate_id=pk, position_id=position_id,
+            from_stage=stage, to_stage=targets[stage],
+            seconds_in_stage=_seconds_since(changed_at, now), created_at=now,
+        )
+        for pk, hub_id, position_id, stage, changed_at in rows
+    ])
+
+
+# -- Histograms --------------------------------------------------------------
+
+def bucket_index(seconds):
+    return bisect_left(_BOUNDS, seconds)
+
+
+def _padded(histogram):
+    return list(histogram) + [0] * (len(DURATION_BUCKETS) - len(histogram))
+
+
+def quantile(histogram, q):
+    """Estimate the ``q`` quantile (seconds) by interpolating inside its bucket."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    lower = 0
+    for upper, count in zip(DURATION_BUCKETS, histogram):
+        if count and seen + count >= rank:
+            if upper is None:
+                return float(lower)
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        lower = upper
+    return float(lower)
+
+
+# -- Rollup ------------------------------------------------------------------
+
+def _fold(events):
+    """Add ``events`` to the PositionStageMetrics rows they touch."""
+    entered = Counter()
+    exits = defaultdict(Counter)
+    durations = defaultdict(Counter)
+    hubs = {}
+    for _pk, hub_id, position_id, from_stage, to_stage, seconds, _created_at in events:
+        hubs[position_id] = hub_id
+        entered[(position_id, to_stage)] += 1
+        if from_stage:
+            exits[(position_id, from_stage)][to_stage] += 1
+            if seconds is not None:
+                durations[(position_id, from_stage)][bucket_index(seconds)] += 1
+
+    keys = set(entered) | set(exits)
+    existing = {
+        (row.position_id, row.stage): row
+        for row in PositionStageMetrics.objects.select_for_update().filter(position_id__in=hubs)
+    }
+    changed, created = [], []
+    for key in keys:
+        position_id, stage = key
+        row = existing.get(key)
+        if row is None:
+            row = PositionStageMetrics(hub_id=hubs[position_id], position_id=position_id, stage=stage)
+            created.append(row)
+        else:
+            changed.append(row)
+        row.entered += entered[key]
+        row.exits = dict(Counter(row.exits) + exits[key])
+        histogram = _padded(row.histogram)
+        for index, n in durations[key].items():
+            histogram[index] += n
+        row.histogram = histogram
+        row.median_seconds = quantile(histogram, 0.5)
+        row.p90_seconds = quantile(histogram, 0.9)
+        row.updated_at = timezone.now()
+    PositionStageMetrics.objects.bulk_create(created)
+    PositionStageMetrics.objects.bulk_update(
+        changed, ['entered', 'exits', 'histogram', 'median_seconds', 'p90_seconds', 'updated_at'],
+    )
+    return set(hubs.values())
+
+
+def rollup_stage_metrics(batch_size=DEFAULT_BATCH_SIZE, settle=None, rebuild=False):
+    """
+    Fold stage events written since the last run into PositionStageMetrics,
+    ``batch_size`` events per transaction. ``rebuild`` starts over from the
+    first event. Returns the number of events processed.
+    """
+    from .stats import invalidate_pipeline_summary
+
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds() if settle is None else settle)
+    if rebuild:
+        with transaction.atomic():
+            PositionStageMetrics.objects.all().delete()
+            StageMetricsCursor.objects.filter(name=CURSOR_NAME).delete()
+
+    processed = 0
+    hubs = set()
+    while True:
+        with transaction.atomic():
+            cursor, _created = StageMetricsCursor.objects.select_for_update().get_or_create(name=CURSOR_NAME)
+            events = list(
+                CandidateStageEvent.objects.filter(id__gt=cursor.last_event_id).order_by('id').values_list(
+                    'id', 'hub_id', 'position_id', 'from_stage', 'to_stage', 'seconds_in_stage', 'created_at',
+                )[:batch_size]
+            )
+            settled = list(takewhile(lambda event: event[-1] <= cutoff, events))
+            if not settled:
+                break
+            hubs |= _fold(settled)
+            cursor.last_event_id = settled[-1][0]
+            cursor.save(update_fields=['last_event_id', 'updated_at'])
+        processed += len(settled)
+        if len(settled) < batch_size:
+            break
+    for hub_id in hubs:
+        invalidate_pipeline_summary(hub_id)
+    return processed
+
+
+# -- Reading -----------------------------------------------------------------
+
+def _days(seconds):
+    return round(seconds / DAY, 1) if seconds is not None else None
+
+
+def hub_funnel(hub_id):
+    """
+    Funnel rows for the dashboard, one per stage, summed over the hub's
+    live positions from PositionStageMetrics.
+
+    ``conversion`` is the share of candidates who entered the stage and
+    later moved to a later, non-rejected stage.
+    """
+    return _build_funnel(_funnel_rows(hub_id))
+
+
+async def ahub_funnel(hub_id):
+    """``hub_funnel`` reading through the async ORM."""
+    return _build_funnel([row async for row in _funnel_rows(hub_id)])
+
+
+def _funnel_rows(hub_id):
+    return PositionStageMetrics.objects.filter(hub_id=hub_id, position__is_deleted=False).values_list(
+        'stage', 'entered', 'exits', 'histogram',
+    )
+
+
+def _build_funnel(rows):
+    entered = Counter()
+    exits = defaultdict(Counter)
+    histograms = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+    for stage, n, stage_exits, histogram in rows:
+        entered[stage] += n
+        exits[stage].update(stage_exits)
+        for index, count in enumerate(histogram):
+            histograms[stage][index] += count
+
+    funnel = []
+    for code, label in CAND_STAGE:
+        advanced = sum(
+            n for target, n in exits[code].items()
+            if target != 'rejected' and STAGE_ORDER.get(target, -1) > STAGE_ORDER[code]
+        )
+        final = code in ('hired', 'rejected')
+        funnel.append({
+            'stage': code,
+            'label': label,
+            'entered': entered[code],
+            'advanced': advanced,
+            'rejected': exits[code]['rejected'],
+            'conversion': round(100 * advanced / entered[code], 1) if entered[code] and not final else None,
+            'median_days': _days(quantile(histograms[code], 0.5)),
+            'p90_days': _days(quantile(histograms[code], 0.9)),
+        })
+    return funnel
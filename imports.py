@@ -0,0 +1,177 @@
+"""
+Bulk candidate import from CSV or XLSX files.
+
+Rows are read one at a time from the upload, validated with
+CandidateImportForm, matched to positions through a single lookup map,
+de-duplicated by email within the hub and written with ``bulk_create``
+in batches, each batch in its own transaction.
+"""
+import codecs
+import csv
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from . import funnel, pipeline, ranking, similarity
+from .forms import CandidateImportForm
+from .models import Candidate, JobPosition
+from .stats import invalidate_pipeline_summary
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Header spellings accepted for each column (after lowercasing).
+COLUMN_ALIASES = {
+    'name': 'name', 'full_name': 'name',
+    'email': 'email', 'e-mail': 'email',
+    'phone': 'phone', 'telephone': 'phone', 'mobile': 'phone',
+    'stage': 'stage',
+    'rating': 'rating',
+    'resume_notes': 'resume_notes', 'notes': 'resume_notes', 'resume': 'resume_notes',
+    'position': 'position', 'jobposition': 'position', 'position_id': 'position',
+    'position_title': 'position', 'job': 'position',
+}
+
+# Form defaults for optional columns left empty in the file.
+ROW_DEFAULTS = {'stage': 'applied', 'rating': '0'}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def processed(self):
+        return self.created + self.duplicates + self.failed
+
+    def add_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def _normalise_header(header):
+    key = str(header or '').strip().lower().replace(' ', '_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+def iter_csv_rows(fileobj, encoding='utf-8-sig'):
+    reader = csv.reader(codecs.iterdecode(fileobj, encoding))
+    headers = [_normalise_header(h) for h in next(reader, [])]
+    for values in reader:
+        if any(values):
+            yield dict(zip(headers, values))
+
+
+def iter_xlsx_rows(fileobj):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalise_header(h) for h in next(rows, ())]
+        for values in rows:
+            if any(v not in (None, '') for v in values):
+                yield {h: '' if v is None else str(v) for h, v in zip(headers, values)}
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx_rows(fileobj)
+    return iter_csv_rows(fileobj)
+
+
+class CandidateImporter:
+
+    def __init__(self, hub_id, default_position=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+        self.hub_id = hub_id
+        self.batch_size = max(int(batch_size), 1)
+        self.dry_run = dry_run
+        self.positions = {}
+        for pk, title in JobPosition.objects.for_hub(hub_id).values_list('id', 'title').iterator():
+            self.positions[str(pk)] = pk
+            self.positions.setdefault(title.strip().lower(), pk)
+        self.default_position = self._resolve_position(default_position) if default_position else None
+        self.seen_emails = set()
+
+    def _resolve_position(self, value):
+        value = str(value or '').strip()
+        return self.positions.get(value) or self.positions.get(value.lower())
+
+    def _build(self, row):
+        """Return an unsaved Candidate or a validation message for ``row``."""
+        data = {name: str(row.get(name) or '').strip() for name in CandidateImportForm.Meta.fields}
+        for name, default in ROW_DEFAULTS.items():
+            data[name] = data[name] or default
+        form = CandidateImportForm(data=data)
+        if not form.is_valid():
+            return None, '; '.join(f'{name}: {" ".join(errors)}' for name, errors in form.errors.items())
+        position_id = self._resolve_position(row.get('position')) if row.get('position') else self.default_position
+        if position_id is None:
+            return None, f'position: unknown position {row.get("position", "")!r}'
+        candidate = form.save(commit=False)
+        candidate.hub_id = self.hub_id
+        candidate.position_id = position_id
+        return candidate, None
+
+    def _existing_emails(self, emails):
+        """The subset of ``emails`` (lowercased) already used in the hub, whatever their stored case."""
+        return set(
+            Candidate.objects.for_hub(self.hub_id)
+            .annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails)
+            .values_list('email_lower', flat=True)
+        )
+
+    def _flush(self, batch, result):
+        emails = {c.email.lower() for _n, c in batch if c.email}
+        existing = self._existing_emails(emails) if emails else set()
+        fresh = []
+        for _row_number, candidate in batch:
+            if candidate.email and candidate.email.lower() in existing:
+                result.duplicates += 1
+            else:
+                fresh.append(candidate)
+        if fresh and not self.dry_run:
+            with transaction.atomic():
+                Candidate.objects.bulk_create(fresh, batch_size=self.batch_size)
+                pipeline.apply_deltas(Counter((c.position_id, c.stage) for c in fresh))
+                funnel.record_created(fresh, batch_size=self.batch_size)
+                ranking.index_candidates(fresh)
+                similarity.update_candidates(self.hub_id, [c.pk for c in fresh])
+        result.created += len(fresh)
+
+    def run(self, rows):
+        result = ImportResult()
+        batch = []
+        for row_number, row in enumerate(rows, start=2):
+            candidate, error = self._build(row)
+            if error:
+                result.add_error(row_number, error)
+                continue
+            email = candidate.email.lower()
+            if email and email in self.seen_emails:
+                result.duplicates += 1
+                continue
+            if email:
+                self.seen_emails.add(email)
+            batch.append((row_number, candidate))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, result)
+                batch = []
+        if batch:
+            self._flush(batch, result)
+        if result.created and not self.dry_run:
+            invalidate_pipeline_summary(self.hub_id)
+        return result
+
+
+def import_candidates(fileobj, filename, hub_id, **options):
+    return CandidateImporter(hub_id, **options).run(iter_rows(fileobj, filename))
@@ -0,0 +1,345 @@
+"""
+Per-call latency and query instrumentation for the recruitment views and
+AI tools.
+
+Every view in views.py and async_views.py is wrapped with
+``instrumented`` and every tool's ``execute`` with ``instrument_tool``
+(through ai_tools.register_tool).
+A sampled call records:
+
+- ``seconds``: wall time of the call;
+- ``queries`` / ``db_seconds``: statements run and time spent in them,
+  counted by an execute wrapper every connection gets when it opens
+  (``count_queries``; no SQL is kept, so this is cheap enough outside
+  DEBUG). The wrapper finds the call through a context variable, which
+  ``sync_to_async`` carries into its worker threads, so the async views'
+  queries count too;
+- ``rows``: rows reported by the database driver (``cursor.rowcount``;
+  drivers that don't report it for SELECT, like sqlite3, count 0);
+- ``render_seconds``: time spent in ``timed_render`` and in rendering
+  lazy TemplateResponses. Pages rendered eagerly by ``htmx_view`` count
+  towards ``seconds`` only;
+
+tagged with the endpoint name and the session hub. Streaming responses
+(exports) are timed up to the first byte.
+
+Records go to the sinks named in RECRUITMENT_INSTRUMENTATION_SINKS:
+``LogSink`` (one log line per call), ``PrometheusSink`` (histograms in
+the Prometheus text format, served by the ``metrics`` view) and
+``RingBufferSink`` (the last calls, summarised on the settings page).
+Sinks are per process. RECRUITMENT_INSTRUMENTATION_SAMPLE_RATE (0-1)
+sets the share of calls recorded; unsampled calls cost one random().
+"""
+import bisect
+import functools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import SynchronousOnlyOperation
+from django.shortcuts import render as django_render
+from django.template.response import SimpleTemplateResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINKS = ['recruitment.instrumentation.RingBufferSink']
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_BUFFER_SIZE = 1000
+
+# Histogram upper bounds; a final +Inf bucket is implied.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_current = ContextVar('recruitment_instrumentation_call', default=None)
+
+
+@dataclass
+class Call:
+    kind: str
+    endpoint: str
+    hub_id: str = ''
+    status: str = ''
+    seconds: float = 0.0
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    render_seconds: float = 0.0
+    started_at: float = field(default_factory=time.time)
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` hook counting the call's statements."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+            rowcount = getattr(context.get('cursor'), 'rowcount', -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+
+
+# -- Sinks -------------------------------------------------------------------
+
+class Sink:
+    """Receives every sampled ``Call``; ``emit`` must not raise."""
+
+    def emit(self, call):
+        raise NotImplementedError
+
+
+class LogSink(Sink):
+    """One INFO line per call on the ``recruitment.instrumentation`` logger."""
+
+    def emit(self, call):
+        logger.info(
+            'recruitment %s endpoint=%s hub=%s status=%s ms=%.1f queries=%d db_ms=%.1f rows=%d render_ms=%.1f',
+            call.kind, call.endpoint, call.hub_id, call.status, call.seconds * 1000, call.queries,
+            call.db_seconds * 1000, call.rows, call.render_seconds * 1000,
+        )
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, Prometheus style."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, (None, None))
+        if counts is None:
+            counts, total = [0] * (len(self.buckets) + 1), [0.0]
+            self.series[labels] = (counts, total)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+            running = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                running += count
+                yield f'{self.name}_bucket{{{label_text},le="{bound}"}} {running}'
+            yield f'{self.name}_sum{{{label_text}}} {total[0]:.6g}'
+            yield f'{self.name}_count{{{label_text}}} {running}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PrometheusSink(Sink):
+    """Histograms by kind, endpoint and hub, rendered in the text exposition format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {
+            'seconds': Histogram('recruitment_call_seconds', 'Wall time per call.', SECONDS_BUCKETS),
+            'queries': Histogram('recruitment_call_queries', 'Database queries per call.', COUNT_BUCKETS),
+            'db_seconds': Histogram('recruitment_call_db_seconds', 'Database time per call.', SECONDS_BUCKETS),
+            'rows': Histogram('recruitment_call_rows', 'Rows reported by the database per call.', ROWS_BUCKETS),
+            'render_seconds': Histogram(
+                'recruitment_call_render_seconds', 'Template render time per call.', SECONDS_BUCKETS,
+            ),
+        }
+
+    def emit(self, call):
+        labels = (('kind', call.kind), ('endpoint', call.endpoint), ('hub', call.hub_id))
+        with self.lock:
+            for attr, histogram in self.histograms.items():
+                histogram.observe(labels, getattr(call, attr))
+
+    def render(self):
+        with self.lock:
+            return '\n'.join(line for h in self.histograms.values() for line in h.lines()) + '\n'
+
+
+class RingBufferSink(Sink):
+    """The last RECRUITMENT_INSTRUMENTATION_BUFFER_SIZE calls, summarised per endpoint."""
+
+    def __init__(self, size=None):
+        self.calls = deque(maxlen=size or getattr(
+            settings, 'RECRUITMENT_INSTRUMENTATION_BUFFER_SIZE', DEFAULT_BUFFER_SIZE,
+        ))
+
+    def emit(self, call):
+        # deque.append is atomic; no lock needed.
+        self.calls.append(call)
+
+    def summary(self, hub_id=None):
+        """Per-endpoint latency percentiles and averages, slowest p95 first."""
+        grouped = {}
+        for call in list(self.calls):
+            if hub_id is None or call.hub_id == str(hub_id):
+                grouped.setdefault((call.kind, call.endpoint), []).append(call)
+        rows = []
+        for (kind, endpoint), calls in grouped.items():
+            seconds = sorted(call.seconds for call in calls)
+            count = len(calls)
+            rows.append({
+                'kind': kind,
+                'endpoint': endpoint,
+                'calls': count,
+                'p50_ms': round(_percentile(seconds, 50) * 1000, 1),
+                'p95_ms': round(_percentile(seconds, 95) * 1000, 1),
+                'max_ms': round(seconds[-1] * 1000, 1),
+                'queries': round(sum(call.queries for call in calls) / count, 1),
+                'db_ms': round(sum(call.db_seconds for call in calls) / count * 1000, 1),
+                'rows': round(sum(call.rows for call in calls) / count, 1),
+                'render_ms': round(sum(call.render_seconds for call in calls) / count * 1000, 1),
+            })
+        rows.sort(key=lambda row: -row['p95_ms'])
+        return rows
+
+
+def _percentile(ordered, q):
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+
+@functools.lru_cache(maxsize=None)
+def sinks():
+    """Configured sink instances, created once per process."""
+    paths = getattr(settings, 'RECRUITMENT_INSTRUMENTATION_SINKS', DEFAULT_SINKS)
+    return tuple(import_string(path)() for path in paths)
+
+
+def get_sink(cls):
+    """The configured sink of type ``cls``, or None."""
+    return next((sink for sink in sinks() if isinstance(sink, cls)), None)
+
+
+# -- Recording ---------------------------------------------------------------
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper counting the statement towards the current call, if any."""
+    call = _current.get()
+    if call is None:
+        return execute(sql, params, many, context)
+    return call(execute, sql, params, many, context)
+
+
+def install(connection):
+    """Add ``count_queries`` to ``connection`` once (signals.py, on connection_created)."""
+    if count_queries not in connection.execute_wrappers:
+        # First, so the pop() of a temporary execute_wrapper() can't remove it.
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+def _sampled():
+    rate = getattr(settings, 'RECRUITMENT_INSTRUMENTATION_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def _emit(call):
+    for sink in sinks():
+        try:
+            sink.emit(call)
+        except Exception:
+            logger.exception('Instrumentation sink %r failed', sink)
+
+
+@contextmanager
+def _recording(kind, endpoint, request):
+    """Yield the current ``Call``, or None when unsampled or already inside one."""
+    if _current.get() is not None or not _sampled():
+        yield None
+        return
+    call = Call(kind=kind, endpoint=endpoint)
+    token = _current.set(call)
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call.status = 'exception'
+        raise
+    finally:
+        call.seconds = time.perf_counter() - start
+        # Read last: async views load the session themselves.
+        call.hub_id = _hub(request)
+        _current.reset(token)
+        _emit(call)
+
+
+def _finish(call, result):
+    if call is not None:
+        if isinstance(result, SimpleTemplateResponse) and not result.is_rendered:
+            render_start = time.perf_counter()
+            result.render()
+            call.render_seconds += time.perf_counter() - render_start
+        call.status = _status(result)
+    return result
+
+
+def _record(kind, endpoint, request, fn, *args, **kwargs):
+    with _recording(kind, endpoint, request) as call:
+        return _finish(call, fn(*args, **kwargs))
+
+
+async def _arecord(kind, endpoint, request, fn, *args, **kwargs):
+    with _recording(kind, endpoint, request) as call:
+        return _finish(call, await fn(*args, **kwargs))
+
+
+def _hub(request):
+    session = getattr(request, 'session', None)
+    if session is None:
+        return ''
+    try:
+        return str(session.get('hub_id') or '')
+    except SynchronousOnlyOperation:
+        # An async view that returned before loading the session.
+        return ''
+
+
+def _status(result):
+    if isinstance(result, dict):
+        return 'error' if 'error' in result else 'ok'
+    return str(getattr(result, 'status_code', 'ok'))
+
+
+def instrumented(view):
+    """Record every (sampled) call of ``view``, sync or async, under its function name."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            return await _arecord('view', view.__name__, request, view, request, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return _record('view', view.__name__, request, view, request, *args, **kwargs)
+    return wrapper
+
+
+def instrument_tool(execute, name):
+    """Wrap an ``AssistantTool.execute`` so its calls are recorded as ``name``."""
+    @functools.wraps(execute)
+    def wrapper(self, args, request):
+        return _record('tool', name, request, execute, self, args, request)
+    return wrapper
+
+
+def timed_render(request, template_name, context=None, **kwargs):
+    """``django.shortcuts.render`` that adds its time to the current call."""
+    call = _current.get()
+    if call is None:
+        return django_render(request, template_name, context, **kwargs)
+    start = time.perf_counter()
+    try:
+        return django_render(request, template_name, context, **kwargs)
+    finally:
+        call.render_seconds += time.perf_counter() - start
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recruitment.pipeline import check_pipeline_stats, rebuild_pipeline_stats
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-position pipeline counters with the candidates table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hub', dest='hub_id', help='Only check this hub.')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the counters if they drifted.')
+
+    def handle(self, *args, hub_id=None, fix=False, **options):
+        mismatches = check_pipeline_stats(hub_id=hub_id)
+        for position_id, expected, actual in mismatches:
+            self.stdout.write(f'{position_id}: expected {expected}, found {actual}')
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Pipeline counters are consistent.'))
+            return
+        if fix:
+            rebuild_pipeline_stats(hub_id=hub_id)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt counters after {len(mismatches)} mismatches.'))
+            return
+        raise CommandError(f'{len(mismatches)} positions have drifted pipeline counters.')
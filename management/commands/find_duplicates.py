@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.dedup import DEFAULT_THRESHOLD, refresh_duplicate_groups
+
+
+class Command(BaseCommand):
+    help = 'Scan a hub for duplicate candidates and refresh the merge review queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hub', dest='hub_id', required=True)
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+        parser.add_argument('--calling-code', help='Country calling code for phones without one, e.g. 34.')
+
+    def handle(self, *args, hub_id, threshold=DEFAULT_THRESHOLD, calling_code=None, **options):
+        count = refresh_duplicate_groups(hub_id, threshold=threshold, calling_code=calling_code)
+        self.stdout.write(self.style.SUCCESS(f'{count} duplicate groups pending review.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.attachments import DEFAULT_GRACE_SECONDS, collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Delete attachment blobs no attachment refers to, stray blob files and abandoned uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-seconds', type=int, default=DEFAULT_GRACE_SECONDS,
+            help='Keep blobs and files unreferenced for less than this.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted.')
+
+    def handle(self, *args, grace_seconds=DEFAULT_GRACE_SECONDS, dry_run=False, **options):
+        counts = collect_garbage(grace_seconds=grace_seconds, dry_run=dry_run)
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {counts['blobs']} blobs ({counts['bytes']} bytes), {counts['files']} stray files, "
+            f"{counts['uploads']} abandoned uploads and {counts['attachments']} attachment tombstones."
+        ))
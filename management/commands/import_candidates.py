@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recruitment.imports import DEFAULT_BATCH_SIZE, import_candidates
+
+
+class Command(BaseCommand):
+    help = 'Import candidates into a hub from a CSV or XLSX file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--hub', dest='hub_id', required=True)
+        parser.add_argument('--position', help='Position title or id for rows without one.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without writing.')
+
+    def handle(self, path, hub_id, position=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, **options):
+        try:
+            fileobj = open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with fileobj:
+            result = import_candidates(
+                fileobj, path, hub_id,
+                default_position=position, batch_size=batch_size, dry_run=dry_run,
+            )
+        for row_number, message in result.errors:
+            self.stderr.write(f'row {row_number}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} imported, {result.duplicates} duplicates skipped, {result.failed} rows with errors.'
+        ))
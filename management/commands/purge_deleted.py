@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.retention import DEFAULT_BATCH_SIZE, purge_deleted, retention_days
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete recruitment rows soft-deleted longer ago than the retention window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention window (default: RECRUITMENT_DELETED_RETENTION_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be purged.')
+
+    def handle(self, *args, days=None, batch_size=DEFAULT_BATCH_SIZE, pause=0, dry_run=False, **options):
+        days = retention_days() if days is None else days
+        counts = purge_deleted(days=days, batch_size=batch_size, pause=pause, dry_run=dry_run)
+        verb = 'Would purge' if dry_run else 'Purged'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {counts['candidates']} candidates and {counts['positions']} positions "
+            f'deleted more than {days} days ago.'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.pipeline import rebuild_pipeline_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-position pipeline counters from the candidates table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hub', dest='hub_id', help='Only rebuild this hub.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, hub_id=None, batch_size=1000, **options):
+        count = rebuild_pipeline_stats(hub_id=hub_id, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt pipeline counters for {count} positions.'))
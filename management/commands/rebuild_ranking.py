@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.ranking import DEFAULT_BATCH_SIZE, rebuild_ranking
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the candidate ranking index and match scores from the live candidates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hub', dest='hub_id', help='Only rebuild this hub.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, hub_id=None, batch_size=DEFAULT_BATCH_SIZE, **options):
+        hubs = rebuild_ranking(hub_id=hub_id, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the ranking index for {hubs} hubs.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.models import Candidate
+from recruitment.similarity import DEFAULT_BATCH_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the memory-mapped candidate similarity index of each hub.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hub', dest='hub_id', help='Only rebuild this hub.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, hub_id=None, batch_size=DEFAULT_BATCH_SIZE, **options):
+        if hub_id is not None:
+            hub_ids = [hub_id]
+        else:
+            hub_ids = Candidate.objects.order_by().values_list('hub_id', flat=True).distinct()
+        rows = sum(rebuild_index(hub, batch_size=batch_size) for hub in hub_ids)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {rows} candidates.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.funnel import DEFAULT_BATCH_SIZE, rollup_stage_metrics
+
+
+class Command(BaseCommand):
+    help = 'Fold new candidate stage events into the per-position funnel metrics. Run periodically.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--settle', type=int, help='Skip events younger than this many seconds.')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute the metrics from the whole event log.')
+
+    def handle(self, *args, batch_size=DEFAULT_BATCH_SIZE, settle=None, rebuild=False, **options):
+        processed = rollup_stage_metrics(batch_size=batch_size, settle=settle, rebuild=rebuild)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {processed} stage events.'))
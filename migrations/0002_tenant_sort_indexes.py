@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'title'], name='rec_pos_hub_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'status'], name='rec_pos_hub_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'is_active'], name='rec_pos_hub_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'vacancies'], name='rec_pos_hub_vacancies_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'department'], name='rec_pos_hub_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'created_at'], name='rec_pos_hub_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'name'], name='rec_cand_hub_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'position', 'stage'], name='rec_cand_hub_pos_stage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'stage'], name='rec_cand_hub_stage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'rating'], name='rec_cand_hub_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'email'], name='rec_cand_hub_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'phone'], name='rec_cand_hub_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'created_at'], name='rec_cand_hub_created_idx'),
+        ),
+    ]
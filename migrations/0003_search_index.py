@@ -0,0 +1,150 @@
+"""
+Full-text search structures for the recruitment lists (see search.py).
+
+PostgreSQL gets a generated, weighted tsvector column with a partial GIN
+index plus trigram indexes; SQLite gets FTS5 tables maintained by triggers.
+Other backends are left alone and fall back to icontains.
+"""
+from django.db import migrations
+
+SEARCH_COLUMNS = {
+    # table: ((column, weight), ...)
+    'recruitment_jobposition': (
+        ('title', 'A'), ('department', 'B'), ('status', 'B'), ('description', 'C'),
+    ),
+    'recruitment_candidate': (
+        ('name', 'A'), ('email', 'A'), ('phone', 'A'), ('stage', 'B'), ('resume_notes', 'C'),
+    ),
+}
+
+TRIGRAM_COLUMNS = {
+    'recruitment_jobposition': ('title',),
+    'recruitment_candidate': ('name', 'email', 'phone'),
+}
+
+
+def _postgres_forwards(schema_editor):
+    execute = schema_editor.execute
+    execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, columns in SEARCH_COLUMNS.items():
+        document = ' || '.join(
+            f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+            for column, weight in columns
+        )
+        execute(f'ALTER TABLE {table} ADD COLUMN search_document tsvector GENERATED ALWAYS AS ({document}) STORED')
+        execute(f'CREATE INDEX {table}_search_idx ON {table} USING GIN (search_document) WHERE NOT is_deleted')
+        for column in TRIGRAM_COLUMNS[table]:
+            execute(
+                f'CREATE INDEX {table}_{column}_trgm_idx ON {table} '
+                f'USING GIN ({column} gin_trgm_ops) WHERE NOT is_deleted'
+            )
+
+
+def _postgres_backwards(schema_editor):
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in TRIGRAM_COLUMNS[table]:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm_idx')
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_document')
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def _sqlite_index(schema_editor, table):
+    """(Re)create the FTS triggers of ``table`` and rebuild its index from the live rows."""
+    execute = schema_editor.execute
+    names = [column for column, _weight in SEARCH_COLUMNS[table]]
+    cols = ', '.join(names)
+    new_values = ', '.join(f'new.{column}' for column in names)
+    fts, fts_map = f'{table}_fts', f'{table}_fts_map'
+    unindex = (
+        f'DELETE FROM {fts} WHERE rowid = (SELECT fts_rowid FROM {fts_map} WHERE object_id = old.id); '
+        f'DELETE FROM {fts_map} WHERE object_id = old.id;'
+    )
+    index = (
+        f'INSERT INTO {fts}({cols}) SELECT {new_values} WHERE NOT new.is_deleted; '
+        f'INSERT INTO {fts_map}(object_id, fts_rowid) SELECT new.id, last_insert_rowid() WHERE NOT new.is_deleted;'
+    )
+    for suffix in ('ai', 'ad', 'au'):
+        execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    execute(f'DELETE FROM {fts}')
+    execute(f'DELETE FROM {fts_map}')
+    execute(f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {index} END')
+    execute(f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {unindex} END')
+    execute(
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols}, is_deleted ON {table} '
+        f'BEGIN {unindex} {index} END'
+    )
+    # Backfill existing live rows.
+    execute(f'UPDATE {table} SET is_deleted = is_deleted WHERE NOT is_deleted')
+
+
+def _sqlite_forwards(schema_editor):
+    if not _sqlite_has_fts5(schema_editor):
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        cols = ', '.join(column for column, _weight in columns)
+        fts, fts_map = f'{table}_fts', f'{table}_fts_map'
+        # Django tables have no stable integer rowid (VACUUM may renumber
+        # it), so FTS rows are tied to the UUID primary key through a map.
+        schema_editor.execute(
+            f'CREATE TABLE {fts_map} (object_id char(32) NOT NULL PRIMARY KEY, fts_rowid integer NOT NULL)'
+        )
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, tokenize = 'unicode61 remove_diacritics 2')")
+        _sqlite_index(schema_editor, table)
+
+
+def restore_sqlite_index(table):
+    """A RunPython callable putting back ``table``'s FTS triggers after SQLite rebuilt it.
+
+    SQLite's schema editor adds NOT NULL columns by copying the table into
+    a new one, which drops the triggers created here; migrations doing
+    that to a searched table run this after the rebuild.
+    """
+    def restore(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            tables = schema_editor.connection.introspection.table_names(cursor)
+        if f'{table}_fts' in tables:
+            _sqlite_index(schema_editor, table)
+    return restore
+
+
+def _sqlite_backwards(schema_editor):
+    for table in SEARCH_COLUMNS:
+        fts = f'{table}_fts'
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}_map')
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _postgres_forwards(schema_editor)
+    elif vendor == 'sqlite':
+        _sqlite_forwards(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _postgres_backwards(schema_editor)
+    elif vendor == 'sqlite':
+        _sqlite_backwards(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0002_tenant_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,58 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+STAGES = ('applied', 'screening', 'interview', 'offer', 'hired', 'rejected')
+
+
+def backfill(apps, schema_editor):
+    JobPosition = apps.get_model('recruitment', 'JobPosition')
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    PositionPipelineStats = apps.get_model('recruitment', 'PositionPipelineStats')
+
+    counts = {}
+    rows = (
+        Candidate.objects.filter(is_deleted=False)
+        .values('position_id', 'stage').annotate(n=models.Count('id')).order_by()
+    )
+    for row in rows:
+        counters = counts.setdefault(row['position_id'], dict.fromkeys(('total',) + STAGES, 0))
+        counters['total'] += row['n']
+        if row['stage'] in STAGES:
+            counters[row['stage']] += row['n']
+
+    PositionPipelineStats.objects.bulk_create(
+        [
+            PositionPipelineStats(position_id=position_id, hub_id=hub_id, **counts.get(position_id, {}))
+            for position_id, hub_id in JobPosition.objects.values_list('id', 'hub_id').iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionPipelineStats',
+            fields=[
+                ('position', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='pipeline_stats', serialize=False, to='recruitment.jobposition')),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('total', models.IntegerField(default=0, verbose_name='Candidates')),
+                ('applied', models.IntegerField(default=0, verbose_name='Applied')),
+                ('screening', models.IntegerField(default=0, verbose_name='Screening')),
+                ('interview', models.IntegerField(default=0, verbose_name='Interview')),
+                ('offer', models.IntegerField(default=0, verbose_name='Offer')),
+                ('hired', models.IntegerField(default=0, verbose_name='Hired')),
+                ('rejected', models.IntegerField(default=0, verbose_name='Rejected')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'recruitment_positionpipelinestats',
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+COUNTERS = ('total', 'applied', 'screening', 'interview', 'offer', 'hired', 'rejected')
+
+
+def cascade_existing(apps, schema_editor):
+    """Soft-delete live candidates left behind under already-deleted positions."""
+    JobPosition = apps.get_model('recruitment', 'JobPosition')
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    PositionPipelineStats = apps.get_model('recruitment', 'PositionPipelineStats')
+
+    deleted_positions = JobPosition.objects.filter(is_deleted=True).values('id')
+    Candidate.objects.filter(is_deleted=False, position_id__in=deleted_positions).update(
+        is_deleted=True,
+        deleted_at=Subquery(JobPosition.objects.filter(id=OuterRef('position_id')).values('deleted_at')[:1]),
+    )
+    PositionPipelineStats.objects.filter(position_id__in=deleted_positions).update(**dict.fromkeys(COUNTERS, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0004_positionpipelinestats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['deleted_at'], name='rec_pos_tombstone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['deleted_at'], name='rec_cand_tombstone_idx'),
+        ),
+        migrations.RunPython(cascade_existing, migrations.RunPython.noop),
+    ]
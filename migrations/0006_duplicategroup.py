@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0005_soft_delete_cascade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateGroup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('score', models.FloatField(default=0, verbose_name='Score')),
+                ('signature', models.CharField(editable=False, max_length=40)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('dismissed', 'Dismissed')], default='pending', max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('candidates', models.ManyToManyField(related_name='duplicate_groups', to='recruitment.candidate')),
+            ],
+            options={
+                'db_table': 'recruitment_duplicategroup',
+                'indexes': [models.Index(fields=['hub_id', 'status', '-score'], name='rec_dup_hub_status_idx')],
+            },
+        ),
+    ]
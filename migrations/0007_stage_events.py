@@ -0,0 +1,85 @@
+from importlib import import_module
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+search_index = import_module('recruitment.migrations.0003_search_index')
+
+STAGES = [
+    ('applied', 'Applied'), ('screening', 'Screening'), ('interview', 'Interview'),
+    ('offer', 'Offer'), ('hired', 'Hired'), ('rejected', 'Rejected'),
+]
+
+
+def backfill_stage_changed_at(apps, schema_editor):
+    """The last update is the best guess we have for when the stage last changed."""
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    Candidate.objects.update(stage_changed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0006_duplicategroup'),
+    ]
+
+    operations = [
+        # Adding the column rebuilds the table on SQLite, dropping its search triggers.
+        migrations.RunPython(migrations.RunPython.noop, search_index.restore_sqlite_index('recruitment_candidate')),
+        migrations.AddField(
+            model_name='candidate',
+            name='stage_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(search_index.restore_sqlite_index('recruitment_candidate'), migrations.RunPython.noop),
+        migrations.RunPython(backfill_stage_changed_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='CandidateStageEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('from_stage', models.CharField(blank=True, choices=STAGES, max_length=20, verbose_name='From')),
+                ('to_stage', models.CharField(choices=STAGES, max_length=20, verbose_name='To')),
+                ('seconds_in_stage', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Time in stage')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_events', to='recruitment.candidate')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recruitment.jobposition')),
+            ],
+            options={
+                'db_table': 'recruitment_candidatestageevent',
+                'indexes': [models.Index(fields=['candidate', 'created_at'], name='rec_event_cand_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PositionStageMetrics',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('stage', models.CharField(choices=STAGES, max_length=20, verbose_name='Stage')),
+                ('entered', models.IntegerField(default=0, verbose_name='Entered')),
+                ('exits', models.JSONField(default=dict, verbose_name='Exits')),
+                ('histogram', models.JSONField(default=list)),
+                ('median_seconds', models.FloatField(blank=True, null=True, verbose_name='Median time in stage')),
+                ('p90_seconds', models.FloatField(blank=True, null=True, verbose_name='P90 time in stage')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_metrics', to='recruitment.jobposition')),
+            ],
+            options={
+                'db_table': 'recruitment_positionstagemetrics',
+                'constraints': [models.UniqueConstraint(fields=('position', 'stage'), name='rec_stage_metrics_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StageMetricsCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'recruitment_stagemetricscursor',
+            },
+        ),
+    ]
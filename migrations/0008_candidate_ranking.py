@@ -0,0 +1,69 @@
+from importlib import import_module
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+search_index = import_module('recruitment.migrations.0003_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0007_stage_events'),
+    ]
+
+    operations = [
+        # Adding the column rebuilds the table on SQLite, dropping its search triggers.
+        migrations.RunPython(migrations.RunPython.noop, search_index.restore_sqlite_index('recruitment_candidate')),
+        migrations.AddField(
+            model_name='candidate',
+            name='match_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Match'),
+        ),
+        migrations.RunPython(search_index.restore_sqlite_index('recruitment_candidate'), migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'match_score'], name='rec_cand_hub_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['position', '-match_score'], name='rec_cand_pos_match_idx'),
+        ),
+        migrations.CreateModel(
+            name='RankingCorpus',
+            fields=[
+                ('hub_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('documents', models.IntegerField(default=0)),
+                ('total_length', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'recruitment_rankingcorpus',
+            },
+        ),
+        migrations.CreateModel(
+            name='RankingTerm',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(editable=False)),
+                ('term', models.CharField(max_length=64)),
+                ('df', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'recruitment_rankingterm',
+                'constraints': [models.UniqueConstraint(fields=('hub_id', 'term'), name='rec_rank_term_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CandidateTermVector',
+            fields=[
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='recruitment.candidate')),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('length', models.IntegerField(default=0)),
+                ('terms', models.JSONField(default=dict)),
+            ],
+            options={
+                'db_table': 'recruitment_candidatetermvector',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0008_candidate_ranking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='rec_cand_hub_pos_stage_idx',
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['hub_id', 'position', 'stage', 'rating'], name='rec_cand_hub_facet_idx'),
+        ),
+    ]
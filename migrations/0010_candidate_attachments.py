@@ -0,0 +1,74 @@
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0009_candidate_facet_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'recruitment_attachmentblob',
+                'indexes': [models.Index(condition=models.Q(('refcount__lte', 0)), fields=['updated_at'], name='rec_blob_orphan_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CandidateAttachment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, help_text='Hub this record belongs to (for multi-tenancy)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.UUIDField(blank=True, help_text='UUID of the user who created this record', null=True)),
+                ('updated_by', models.UUIDField(blank=True, help_text='UUID of the user who last updated this record', null=True)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False, help_text='Soft delete flag - record is hidden but not removed')),
+                ('deleted_at', models.DateTimeField(blank=True, help_text='Timestamp when record was soft deleted', null=True)),
+                ('filename', models.CharField(max_length=255, verbose_name='File name')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='Content type')),
+                ('kind', models.CharField(choices=[('resume', 'Resume'), ('document', 'Document')], default='resume', max_length=20, verbose_name='Kind')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='recruitment.attachmentblob')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='recruitment.candidate')),
+            ],
+            options={
+                'db_table': 'recruitment_candidateattachment',
+                'abstract': False,
+                'indexes': [
+                    models.Index(condition=models.Q(('is_deleted', False)), fields=['candidate', 'created_at'], name='rec_attach_cand_idx'),
+                    models.Index(condition=models.Q(('is_deleted', True)), fields=['deleted_at'], name='rec_attach_tombstone_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('hub_id', models.UUIDField(blank=True, db_index=True, editable=False, null=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('kind', models.CharField(choices=[('resume', 'Resume'), ('document', 'Document')], default='resume', max_length=20)),
+                ('size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recruitment.candidate')),
+            ],
+            options={
+                'db_table': 'recruitment_attachmentupload',
+                'indexes': [models.Index(fields=['updated_at'], name='rec_upload_updated_idx')],
+            },
+        ),
+    ]
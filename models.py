@@ -1,7 +1,11 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.models.base import HubBaseModel
+from apps.core.models.base import HubBaseModel, HubManager
 
 JOB_STATUS = [
     ('draft', _('Draft')),
@@ -10,6 +14,11 @@ JOB_STATUS = [
     ('on_hold', _('On Hold')),
 ]
 
+ATTACHMENT_KIND = [
+    ('resume', _('Resume')),
+    ('document', _('Document')),
+]
+
 CAND_STAGE = [
     ('applied', _('Applied')),
     ('screening', _('Screening')),
@@ -19,6 +28,82 @@ CAND_STAGE = [
     ('rejected', _('Rejected')),
 ]
 
+# Every list, sort and dashboard query is scoped to one hub's live rows, so
+# the composite indexes below are partial on this condition.
+LIVE = models.Q(is_deleted=False)
+
+# Columns rendered by the candidates datatable and its exports.
+CANDIDATE_LIST_FIELDS = (
+    'id', 'hub_id', 'name', 'email', 'phone', 'stage', 'rating', 'match_score', 'is_deleted',
+    'created_at', 'updated_at', 'position__id', 'position__title',
+)
+
+
+# Soft-deleted rows waiting for the purge job (see retention.py).
+TOMBSTONE = models.Q(is_deleted=True)
+
+
+class JobPositionQuerySet(models.QuerySet):
+
+    def for_hub(self, hub_id):
+        return self.filter(hub_id=hub_id, is_deleted=False)
+
+    def for_list(self, hub_id):
+        # Positions bulk-created without a stats row count as 0, so the
+        # counters can be sorted and paged on like any non-null column.
+        return self.for_hub(hub_id).select_related('pipeline_stats').annotate(
+            candidate_count=Coalesce('pipeline_stats__total', 0),
+            hired_count=Coalesce('pipeline_stats__hired', 0),
+        )
+
+    def soft_delete(self):
+        """
+        Soft-delete these positions and, in one UPDATE, their live
+        candidates. Returns the number of positions deleted.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            ids = list(self.filter(is_deleted=False).values_list('id', flat=True))
+            if not ids:
+                return 0
+            Candidate.all_objects.filter(position_id__in=ids).soft_delete(now)
+            return JobPosition.all_objects.filter(id__in=ids).update(
+                is_deleted=True, deleted_at=now, updated_at=now,
+            )
+
+
+class CandidateQuerySet(models.QuerySet):
+
+    def for_hub(self, hub_id):
+        return self.filter(hub_id=hub_id, is_deleted=False)
+
+    def soft_delete(self, now=None):
+        """Soft-delete these candidates, keeping the pipeline counters in step."""
+        from .pipeline import remove_candidates
+
+        now = now or timezone.now()
+        live = self.filter(is_deleted=False)
+        # No savepoint of its own: nested in a position cascade, that
+        # transaction is the one to roll back.
+        with transaction.atomic(using=self.db, savepoint=False):
+            remove_candidates(live)
+            return live.update(is_deleted=True, deleted_at=now, updated_at=now)
+
+    def with_position(self):
+        """Join the position and load only the columns the list shows."""
+        return self.select_related('position').only(*CANDIDATE_LIST_FIELDS)
+
+    def for_list(self, hub_id):
+        return self.for_hub(hub_id).with_position()
+
+
+JobPositionManager = HubManager.from_queryset(JobPositionQuerySet)
+CandidateManager = HubManager.from_queryset(CandidateQuerySet)
+# Replace HubBaseModel's all_objects so it keeps the queryset methods.
+AllJobPositionManager = models.Manager.from_queryset(JobPositionQuerySet)
+AllCandidateManager = models.Manager.from_queryset(CandidateQuerySet)
+
+
 class JobPosition(HubBaseModel):
     title = models.CharField(max_length=255, verbose_name=_('Title'))
     department = models.CharField(max_length=100, blank=True, verbose_name=_('Department'))
@@ -27,12 +112,36 @@ class JobPosition(HubBaseModel):
     vacancies = models.PositiveIntegerField(default=1, verbose_name=_('Vacancies'))
     is_active = models.BooleanField(default=True, verbose_name=_('Is Active'))
 
+    objects = JobPositionManager()
+    all_objects = AllJobPositionManager()
+
     class Meta(HubBaseModel.Meta):
         db_table = 'recruitment_jobposition'
+        indexes = [
+            models.Index(fields=['hub_id', 'title'], condition=LIVE, name='rec_pos_hub_title_idx'),
+            models.Index(fields=['hub_id', 'status'], condition=LIVE, name='rec_pos_hub_status_idx'),
+            models.Index(fields=['hub_id', 'is_active'], condition=LIVE, name='rec_pos_hub_active_idx'),
+            models.Index(fields=['hub_id', 'vacancies'], condition=LIVE, name='rec_pos_hub_vacancies_idx'),
+            models.Index(fields=['hub_id', 'department'], condition=LIVE, name='rec_pos_hub_dept_idx'),
+            models.Index(fields=['hub_id', 'created_at'], condition=LIVE, name='rec_pos_hub_created_idx'),
+            models.Index(fields=['deleted_at'], condition=TOMBSTONE, name='rec_pos_tombstone_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the indexed text so saves that don't change it skip reindexing.
+        if not instance.get_deferred_fields() & {'title', 'description', 'department'}:
+            instance._indexed_state = instance.indexed_state()
+        return instance
+
+    def indexed_state(self):
+        """Text the ranking (title, description) and similarity (title, department) indexes use."""
+        return (self.title, self.description, self.department)
+
 
 class Candidate(HubBaseModel):
     position = models.ForeignKey('JobPosition', on_delete=models.CASCADE, related_name='candidates')
@@ -42,10 +151,288 @@ class Candidate(HubBaseModel):
     stage = models.CharField(max_length=20, default='applied', choices=CAND_STAGE, verbose_name=_('Stage'))
     resume_notes = models.TextField(blank=True, verbose_name=_('Resume Notes'))
     rating = models.PositiveIntegerField(default=0, verbose_name=_('Rating'))
+    stage_changed_at = models.DateTimeField(default=timezone.now, editable=False)
+    # BM25 score of resume_notes against the position (see ranking.py).
+    match_score = models.FloatField(default=0, editable=False, verbose_name=_('Match'))
+
+    objects = CandidateManager()
+    all_objects = AllCandidateManager()
 
     class Meta(HubBaseModel.Meta):
         db_table = 'recruitment_candidate'
+        indexes = [
+            models.Index(fields=['hub_id', 'name'], condition=LIVE, name='rec_cand_hub_name_idx'),
+            # Also covers the facet counts' GROUP BY (see facets.py).
+            models.Index(fields=['hub_id', 'position', 'stage', 'rating'], condition=LIVE, name='rec_cand_hub_facet_idx'),
+            models.Index(fields=['hub_id', 'stage'], condition=LIVE, name='rec_cand_hub_stage_idx'),
+            models.Index(fields=['hub_id', 'rating'], condition=LIVE, name='rec_cand_hub_rating_idx'),
+            models.Index(fields=['hub_id', 'email'], condition=LIVE, name='rec_cand_hub_email_idx'),
+            models.Index(fields=['hub_id', 'phone'], condition=LIVE, name='rec_cand_hub_phone_idx'),
+            models.Index(fields=['hub_id', 'created_at'], condition=LIVE, name='rec_cand_hub_created_idx'),
+            models.Index(fields=['hub_id', 'match_score'], condition=LIVE, name='rec_cand_hub_match_idx'),
+            models.Index(fields=['position', '-match_score'], condition=LIVE, name='rec_cand_pos_match_idx'),
+            models.Index(fields=['deleted_at'], condition=TOMBSTONE, name='rec_cand_tombstone_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the pipeline counters last saw for this row.
+        if not instance.get_deferred_fields() & {'position_id', 'stage', 'is_deleted'}:
+            instance._pipeline_state = instance.pipeline_state()
+        if not instance.get_deferred_fields() & {'position_id', 'resume_notes'}:
+            instance._indexed_state = instance.indexed_state()
+        return instance
+
+    def pipeline_state(self):
+        return (self.position_id, self.stage, self.is_deleted)
+
+    def indexed_state(self):
+        return (self.position_id, self.resume_notes)
+
+
+class PositionPipelineStats(models.Model):
+    """
+    Denormalised candidate counts per position and stage.
+
+    Maintained incrementally by pipeline.py; rebuild with the
+    ``rebuild_pipeline_stats`` management command.
+    """
+    position = models.OneToOneField(
+        'JobPosition', on_delete=models.CASCADE, primary_key=True, related_name='pipeline_stats',
+    )
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    total = models.IntegerField(default=0, verbose_name=_('Candidates'))
+    applied = models.IntegerField(default=0, verbose_name=_('Applied'))
+    screening = models.IntegerField(default=0, verbose_name=_('Screening'))
+    interview = models.IntegerField(default=0, verbose_name=_('Interview'))
+    offer = models.IntegerField(default=0, verbose_name=_('Offer'))
+    hired = models.IntegerField(default=0, verbose_name=_('Hired'))
+    rejected = models.IntegerField(default=0, verbose_name=_('Rejected'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recruitment_positionpipelinestats'
+
+    def __str__(self):
+        return f'{self.position_id}: {self.total}'
+
+
+DUPLICATE_STATUS = [
+    ('pending', _('Pending')),
+    ('dismissed', _('Dismissed')),
+]
+
+
+class DuplicateGroup(models.Model):
+    """
+    Candidates in one hub that the dedup engine (dedup.py) believes are
+    the same person, awaiting a recruiter's merge or dismissal.
+    """
+    id = models.BigAutoField(primary_key=True)
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    score = models.FloatField(default=0, verbose_name=_('Score'))
+    signature = models.CharField(max_length=40, editable=False)
+    status = models.CharField(max_length=20, default='pending', choices=DUPLICATE_STATUS, verbose_name=_('Status'))
+    candidates = models.ManyToManyField('Candidate', related_name='duplicate_groups')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'recruitment_duplicategroup'
+        indexes = [
+            models.Index(fields=['hub_id', 'status', '-score'], name='rec_dup_hub_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.hub_id}: {self.signature}'
+
+
+class CandidateStageEvent(models.Model):
+    """
+    Append-only log of stage changes. ``from_stage`` is empty for the
+    event written when a candidate is created.
+
+    Never read by the dashboard; funnel.py rolls new events up into
+    PositionStageMetrics.
+    """
+    id = models.BigAutoField(primary_key=True)
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    candidate = models.ForeignKey('Candidate', on_delete=models.CASCADE, related_name='stage_events')
+    position = models.ForeignKey('JobPosition', on_delete=models.CASCADE, related_name='+')
+    from_stage = models.CharField(max_length=20, blank=True, choices=CAND_STAGE, verbose_name=_('From'))
+    to_stage = models.CharField(max_length=20, choices=CAND_STAGE, verbose_name=_('To'))
+    seconds_in_stage = models.PositiveBigIntegerField(null=True, blank=True, verbose_name=_('Time in stage'))
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        db_table = 'recruitment_candidatestageevent'
+        indexes = [
+            models.Index(fields=['candidate', 'created_at'], name='rec_event_cand_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.candidate_id}: {self.from_stage or "-"} -> {self.to_stage}'
+
+
+class PositionStageMetrics(models.Model):
+    """
+    Funnel metrics per position and stage: how many candidates entered
+    the stage, where they went next and a histogram of the time they
+    spent in it (see funnel.DURATION_BUCKETS).
+
+    Maintained by ``rollup_stage_metrics``; rebuild with ``--rebuild``.
+    """
+    id = models.BigAutoField(primary_key=True)
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    position = models.ForeignKey('JobPosition', on_delete=models.CASCADE, related_name='stage_metrics')
+    stage = models.CharField(max_length=20, choices=CAND_STAGE, verbose_name=_('Stage'))
+    entered = models.IntegerField(default=0, verbose_name=_('Entered'))
+    exits = models.JSONField(default=dict, verbose_name=_('Exits'))
+    histogram = models.JSONField(default=list)
+    median_seconds = models.FloatField(null=True, blank=True, verbose_name=_('Median time in stage'))
+    p90_seconds = models.FloatField(null=True, blank=True, verbose_name=_('P90 time in stage'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recruitment_positionstagemetrics'
+        constraints = [
+            models.UniqueConstraint(fields=['position', 'stage'], name='rec_stage_metrics_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.position_id}/{self.stage}: {self.entered}'
+
+
+class StageMetricsCursor(models.Model):
+    """Id of the last CandidateStageEvent folded into PositionStageMetrics."""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recruitment_stagemetricscursor'
+
+    def __str__(self):
+        return f'{self.name}: {self.last_event_id}'
+
+
+class RankingCorpus(models.Model):
+    """Document count and total length of a hub's indexed resume notes."""
+    hub_id = models.UUIDField(primary_key=True, editable=False)
+    documents = models.IntegerField(default=0)
+    total_length = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recruitment_rankingcorpus'
+
+    def __str__(self):
+        return f'{self.hub_id}: {self.documents}'
+
+
+class RankingTerm(models.Model):
+    """Document frequency of one term among a hub's resume notes."""
+    id = models.BigAutoField(primary_key=True)
+    hub_id = models.UUIDField(editable=False)
+    term = models.CharField(max_length=64)
+    df = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'recruitment_rankingterm'
+        constraints = [
+            models.UniqueConstraint(fields=['hub_id', 'term'], name='rec_rank_term_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.term}: {self.df}'
+
+
+class CandidateTermVector(models.Model):
+    """Sparse term-frequency vector of a candidate's resume notes."""
+    candidate = models.OneToOneField(
+        'Candidate', on_delete=models.CASCADE, primary_key=True, related_name='term_vector',
+    )
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    length = models.IntegerField(default=0)
+    terms = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = 'recruitment_candidatetermvector'
+
+    def __str__(self):
+        return f'{self.candidate_id}: {self.length}'
+
+
+class AttachmentBlob(models.Model):
+    """
+    One stored file, addressed by the SHA-256 of its content and shared by
+    every attachment with that content (see attachments.py).
+
+    ``refcount`` is the number of CandidateAttachment rows, live or
+    soft-deleted, pointing at it: raised when an upload completes, lowered
+    when an attachment is hard-deleted. ``gc_attachment_blobs`` removes
+    blobs that have stayed at zero for the grace period.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set with every refcount change; the GC grace period counts from it.
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'recruitment_attachmentblob'
+        indexes = [
+            models.Index(fields=['updated_at'], condition=models.Q(refcount__lte=0), name='rec_blob_orphan_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.sha256[:12]}: {self.refcount}'
+
+
+class CandidateAttachment(HubBaseModel):
+    candidate = models.ForeignKey('Candidate', on_delete=models.CASCADE, related_name='attachments')
+    blob = models.ForeignKey('AttachmentBlob', on_delete=models.PROTECT, related_name='attachments')
+    filename = models.CharField(max_length=255, verbose_name=_('File name'))
+    content_type = models.CharField(max_length=100, blank=True, verbose_name=_('Content type'))
+    kind = models.CharField(max_length=20, default='resume', choices=ATTACHMENT_KIND, verbose_name=_('Kind'))
+
+    class Meta(HubBaseModel.Meta):
+        db_table = 'recruitment_candidateattachment'
+        indexes = [
+            models.Index(fields=['candidate', 'created_at'], condition=LIVE, name='rec_attach_cand_idx'),
+            models.Index(fields=['deleted_at'], condition=TOMBSTONE, name='rec_attach_tombstone_idx'),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+
+class AttachmentUpload(models.Model):
+    """
+    A chunked upload in progress: ``received`` bytes of ``size`` are in its
+    part file. Deleted when the upload completes; abandoned ones expire
+    (see attachments.collect_garbage).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    hub_id = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    candidate = models.ForeignKey('Candidate', on_delete=models.CASCADE, related_name='+')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    kind = models.CharField(max_length=20, default='resume', choices=ATTACHMENT_KIND)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recruitment_attachmentupload'
+        indexes = [
+            models.Index(fields=['updated_at'], name='rec_upload_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.filename}: {self.received}/{self.size}'
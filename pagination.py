@@ -0,0 +1,164 @@
+"""
+Keyset (cursor) pagination for the recruitment datatables.
+
+Pages are addressed by the last row seen instead of an OFFSET, ordered on
+the active sort field with ``id`` as a tiebreaker, so deep pages cost the
+same as the first one and no COUNT(*) is needed.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q
+
+NEXT = 'n'
+PREV = 'p'
+# Key of the object a datetime cursor value is wrapped in.
+DATETIME = 'dt'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps datetimes to the microsecond; DjangoJSONEncoder cuts them to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return {DATETIME: o.isoformat()}
+        return super().default(o)
+
+
+def encode_cursor(value, pk, direction=NEXT):
+    payload = json.dumps([direction, value, str(pk)], cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, dict):
+            value = datetime.datetime.fromisoformat(value[DATETIME])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise InvalidCursor(token)
+    if direction not in (NEXT, PREV):
+        raise InvalidCursor(token)
+    return direction, value, pk
+
+
+def keyset_field(model, field):
+    """Compare foreign keys on their column, not the related model's ordering."""
+    try:
+        model_field = model._meta.get_field(field)
+    except FieldDoesNotExist:
+        # Lookups across relations and annotations such as search_rank.
+        return field
+    return model_field.attname if model_field.is_relation else field
+
+
+def _resolve(obj, field):
+    if isinstance(obj, dict):
+        # Rows from values() querysets.
+        return obj[field]
+    value = obj
+    for part in field.split('__'):
+        value = getattr(value, part, None) if value is not None else None
+    return value.pk if isinstance(value, Model) else value
+
+
+def _pk(obj):
+    return obj['id'] if isinstance(obj, dict) else obj.pk
+
+
+class CursorPage:
+    """Page of rows plus the cursors that address its neighbours."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, per_page=0):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.per_page = per_page
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def _cursor_query(qs, sort_field, descending, cursor):
+    """``(qs, field, cursor, backwards)``: ``qs`` ordered and filtered past ``cursor``."""
+    field = keyset_field(qs.model, sort_field)
+    direction, value, pk = NEXT, None, None
+    if cursor:
+        try:
+            direction, value, pk = decode_cursor(cursor)
+        except InvalidCursor:
+            cursor = None
+
+    backwards = direction == PREV
+    # Walking backwards flips the comparison and the order, then the rows
+    # are reversed back into display order.
+    reverse = descending != backwards
+    prefix = '-' if reverse else ''
+    qs = qs.order_by(f'{prefix}{field}', f'{prefix}id')
+    if cursor:
+        op = 'lt' if reverse else 'gt'
+        qs = qs.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}))
+    return qs, field, cursor, backwards
+
+
+def _cursor_page(rows, field, cursor, backwards, per_page):
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    if backwards:
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    next_cursor = previous_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_next:
+            next_cursor = encode_cursor(_resolve(last, field), _pk(last), NEXT)
+        if has_previous:
+            previous_cursor = encode_cursor(_resolve(first, field), _pk(first), PREV)
+    return CursorPage(rows, next_cursor, previous_cursor, per_page)
+
+
+def paginate_by_cursor(qs, sort_field, descending=False, cursor=None, per_page=24):
+    """
+    Return a CursorPage of ``qs`` ordered by ``sort_field`` then ``id``.
+
+    ``cursor`` is a token from a previous page; invalid tokens restart
+    from the first page. ``values()`` querysets must include ``id`` and
+    the sort field.
+    """
+    qs, field, cursor, backwards = _cursor_query(qs, sort_field, descending, cursor)
+    return _cursor_page(list(qs[:per_page + 1]), field, cursor, backwards, per_page)
+
+
+async def apaginate_by_cursor(qs, sort_field, descending=False, cursor=None, per_page=24):
+    """``paginate_by_cursor`` fetching the rows with the async ORM."""
+    qs, field, cursor, backwards = _cursor_query(qs, sort_field, descending, cursor)
+    rows = [row async for row in qs[:per_page + 1]]
+    return _cursor_page(rows, field, cursor, backwards, per_page)
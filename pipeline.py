@@ -0,0 +1,208 @@
+"""
+Per-position pipeline counters (PositionPipelineStats).
+
+Single-row saves are tracked by signals; set-based paths that go through
+``QuerySet.update()`` compute their deltas here before updating. The
+counters can always be rebuilt from the candidates table.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from . import funnel
+from .models import CAND_STAGE, Candidate, JobPosition, PositionPipelineStats
+
+STAGE_CODES = [code for code, _label in CAND_STAGE]
+COUNTER_FIELDS = ['total'] + STAGE_CODES
+
+# Stages a candidate may be moved to from each stage. Hired is final and a
+# rejection can only be reopened back into the early stages.
+STAGE_TRANSITIONS = {
+    'applied': {'screening', 'interview', 'rejected'},
+    'screening': {'applied', 'interview', 'rejected'},
+    'interview': {'screening', 'offer', 'rejected'},
+    'offer': {'interview', 'hired', 'rejected'},
+    'hired': set(),
+    'rejected': {'applied', 'screening'},
+}
+# "Advance" follows CAND_STAGE order up to hired.
+NEXT_STAGE = dict(zip(STAGE_CODES[:STAGE_CODES.index('hired')], STAGE_CODES[1:]))
+
+
+def _counters(stage_counts):
+    """Turn ``{stage: n}`` into counter column values."""
+    counters = Counter()
+    for stage, count in stage_counts.items():
+        counters['total'] += count
+        if stage in STAGE_CODES:
+            counters[stage] += count
+    return counters
+
+
+def apply_deltas(deltas):
+    """
+    Apply ``{(position_id, stage): delta}`` to the counters in one UPDATE.
+    Positions without a stats row are left for the rebuild.
+    """
+    per_position = defaultdict(Counter)
+    for (position_id, stage), delta in deltas.items():
+        if delta and position_id is not None:
+            per_position[position_id][stage] += delta
+    per_field = defaultdict(dict)
+    for position_id, stage_counts in per_position.items():
+        for field, n in _counters(stage_counts).items():
+            if n:
+                per_field[field][position_id] = n
+    if not per_field:
+        return
+    changes = {}
+    for field, by_position in per_field.items():
+        if len(per_position) == 1:
+            (n,) = by_position.values()
+        else:
+            n = Case(
+                *[When(position_id=position_id, then=Value(n)) for position_id, n in by_position.items()],
+                default=Value(0), output_field=IntegerField(),
+            )
+        changes[field] = F(field) + n
+    PositionPipelineStats.objects.filter(position_id__in=list(per_position)).update(**changes)
+
+
+def transition(old, new):
+    """Apply one candidate moving from pipeline state ``old`` to ``new``."""
+    deltas = Counter()
+    if old is not None and not old[2]:
+        deltas[(old[0], old[1])] -= 1
+    if new is not None and not new[2]:
+        deltas[(new[0], new[1])] += 1
+    apply_deltas(deltas)
+
+
+def live_counts(qs):
+    """``{(position_id, stage): n}`` for the live candidates in ``qs``."""
+    rows = qs.filter(is_deleted=False).values('position_id', 'stage').annotate(n=Count('id')).order_by()
+    return {(row['position_id'], row['stage']): row['n'] for row in rows}
+
+
+def remove_candidates(qs):
+    """Decrement the counters for live candidates in ``qs`` about to leave."""
+    apply_deltas({key: -n for key, n in live_counts(qs).items()})
+
+
+def stage_targets(action, stage=None):
+    """
+    ``{from_stage: to_stage}`` for a bulk ``action`` ('advance', 'set_stage'
+    or 'reject'), limited to allowed transitions. Raises ValueError for an
+    unknown action or stage.
+    """
+    if action == 'advance':
+        return dict(NEXT_STAGE)
+    if action == 'reject':
+        stage = 'rejected'
+    elif action != 'set_stage':
+        raise ValueError(f'Unknown stage action {action!r}')
+    if stage not in STAGE_CODES:
+        raise ValueError(f'Unknown stage {stage!r}')
+    return {source: stage for source, targets in STAGE_TRANSITIONS.items() if stage in targets}
+
+
+def move_candidates(qs, action, stage=None):
+    """
+    Move the live candidates in ``qs`` along the pipeline in one UPDATE.
+
+    Rows whose current stage does not allow the move are left alone. The
+    counters are adjusted and the stage events written in the same
+    transaction. Returns the ids of the rows that changed.
+    """
+    targets = stage_targets(action, stage)
+    if not targets:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            qs.filter(is_deleted=False, stage__in=list(targets))
+            .select_for_update().order_by()
+            .values_list('id', 'hub_id', 'position_id', 'stage', 'stage_changed_at')
+        )
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        Candidate.all_objects.filter(id__in=ids).update(
+            stage=Case(
+                *[When(stage=source, then=Value(target)) for source, target in targets.items()],
+                default=F('stage'),
+            ),
+            stage_changed_at=now,
+            updated_at=now,
+        )
+        deltas = Counter()
+        for _pk, _hub_id, position_id, source, _changed_at in rows:
+            deltas[(position_id, source)] -= 1
+            deltas[(position_id, targets[source])] += 1
+        apply_deltas(deltas)
+        funnel.record_moves(rows, targets, now)
+    return ids
+
+
+def rebuild_position(position_id):
+    """Recount a single position's counters."""
+    stage_counts = {
+        stage: n for (_position_id, stage), n
+        in live_counts(Candidate.all_objects.filter(position_id=position_id)).items()
+    }
+    counters = {field: 0 for field in COUNTER_FIELDS}
+    counters.update(_counters(stage_counts))
+    PositionPipelineStats.objects.filter(position_id=position_id).update(**counters)
+
+
+def rebuild_pipeline_stats(hub_id=None, batch_size=1000):
+    """Recount every position (optionally one hub) from scratch."""
+    positions = JobPosition.all_objects.all()
+    candidates = Candidate.all_objects.all()
+    if hub_id is not None:
+        positions = positions.filter(hub_id=hub_id)
+        candidates = candidates.filter(hub_id=hub_id)
+
+    per_position = defaultdict(dict)
+    for (position_id, stage), n in live_counts(candidates).items():
+        per_position[position_id][stage] = n
+
+    with transaction.atomic():
+        stats = PositionPipelineStats.objects.all()
+        if hub_id is not None:
+            stats = stats.filter(position__hub_id=hub_id)
+        stats.delete()
+        rows = [
+            PositionPipelineStats(position_id=position_id, hub_id=position_hub, **_counters(per_position.get(position_id, {})))
+            for position_id, position_hub in positions.values_list('id', 'hub_id').iterator()
+        ]
+        PositionPipelineStats.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def check_pipeline_stats(hub_id=None):
+    """Return ``[(position_id, expected, actual)]`` for drifted counters."""
+    positions = JobPosition.all_objects.all()
+    candidates = Candidate.all_objects.all()
+    if hub_id is not None:
+        positions = positions.filter(hub_id=hub_id)
+        candidates = candidates.filter(hub_id=hub_id)
+
+    expected = defaultdict(Counter)
+    for (position_id, stage), n in live_counts(candidates).items():
+        expected[position_id].update(_counters({stage: n}))
+    actual = {
+        row['position_id']: row
+        for row in PositionPipelineStats.objects.filter(position__in=positions).values('position_id', *COUNTER_FIELDS)
+    }
+
+    mismatches = []
+    for position_id in positions.values_list('id', flat=True).iterator():
+        want = {field: expected[position_id][field] for field in COUNTER_FIELDS}
+        row = actual.get(position_id)
+        have = {field: row[field] for field in COUNTER_FIELDS} if row else None
+        if have != want:
+            mismatches.append((position_id, want, have))
+    return mismatches
@@ -0,0 +1,224 @@
+"""
+Candidate ranking against the position they applied to.
+
+Each candidate's ``resume_notes`` are tokenised into a sparse
+term-frequency vector (CandidateTermVector) and the hub's document
+frequencies and average length are kept in RankingTerm / RankingCorpus.
+``Candidate.match_score`` is the Okapi BM25 score of the notes against
+the position's title and description, so "top N for position X" and the
+``match_score`` sort are plain indexed queries.
+
+Everything is maintained incrementally: single saves through signals,
+imports through ``index_candidates``, and a position whose title or
+description changes has just its own candidates rescored. Scores of
+untouched candidates use the term statistics of their last rescoring;
+``rebuild_ranking`` (run periodically) recomputes the whole hub and drops
+soft-deleted candidates from the statistics.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Candidate, CandidateTermVector, JobPosition, RankingCorpus, RankingTerm
+
+TOKEN_RE = re.compile(r'[^\W\d_]{2,}|\d{2,}')
+MAX_TERM_LENGTH = 64
+# Position text is short; longer queries mostly add noise.
+MAX_QUERY_TERMS = 64
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset('''
+    a an and are as at be been but by for from has have he her his i in is it its of on or our she
+    that the their them they this to was we were will with you your
+    al con de del el en es la las lo los para por que se su sus un una y
+'''.split())
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if token not in STOPWORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def term_vector(text):
+    """Return ``({term: tf}, length)`` for ``text``."""
+    counts = Counter(tokenize(text))
+    return dict(counts), sum(counts.values())
+
+
+def position_query(title, description):
+    counts = Counter(tokenize(f'{title}\n{description}'))
+    return [term for term, _n in counts.most_common(MAX_QUERY_TERMS)]
+
+
+class Corpus:
+    """A hub's term statistics, loaded for a fixed set of query terms."""
+
+    def __init__(self, hub_id, terms):
+        stats = RankingCorpus.objects.filter(hub_id=hub_id).values_list('documents', 'total_length').first()
+        self.documents, total_length = stats or (0, 0)
+        self.average_length = total_length / self.documents if self.documents else 1.0
+        self.df = dict(RankingTerm.objects.filter(hub_id=hub_id, term__in=terms).values_list('term', 'df'))
+
+    def idf(self, term):
+        df = self.df.get(term, 0)
+        return math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+
+    def score(self, query, terms, length):
+        """BM25 of a document (``terms`` ``{term: tf}``, ``length``) for ``query``."""
+        if not terms:
+            return 0.0
+        norm = K1 * (1 - B + B * length / (self.average_length or 1.0))
+        score = 0.0
+        for term in query:
+            tf = terms.get(term)
+            if tf:
+                score += self.idf(term) * tf * (K1 + 1) / (tf + norm)
+        return round(score, 4)
+
+
+# -- Term statistics ---------------------------------------------------------
+
+def _apply_df(hub_id, deltas):
+    """Add ``{term: delta}`` to a hub's document frequencies."""
+    deltas = {term: n for term, n in deltas.items() if n}
+    if not deltas:
+        return
+    RankingTerm.objects.bulk_create(
+        [RankingTerm(hub_id=hub_id, term=term, df=0) for term in deltas], ignore_conflicts=True,
+    )
+    by_delta = defaultdict(list)
+    for term, n in deltas.items():
+        by_delta[n].append(term)
+    for n, terms in by_delta.items():
+        RankingTerm.objects.filter(hub_id=hub_id, term__in=terms).update(df=F('df') + n)
+
+
+def _apply_corpus(hub_id, documents, length):
+    if not documents and not length:
+        return
+    RankingCorpus.objects.bulk_create([RankingCorpus(hub_id=hub_id)], ignore_conflicts=True)
+    RankingCorpus.objects.filter(hub_id=hub_id).update(
+        documents=F('documents') + documents, total_length=F('total_length') + length,
+    )
+
+
+def index_candidates(candidates):
+    """
+    (Re)index the notes of ``candidates`` (saved instances) and rescore
+    them. Per hub this is a constant number of queries whatever the count.
+    """
+    candidates = [c for c in candidates if not c.is_deleted]
+    if not candidates:
+        return
+    with transaction.atomic():
+        previous = {
+            row.candidate_id: row
+            for row in CandidateTermVector.objects.select_for_update().filter(candidate__in=candidates)
+        }
+        df = defaultdict(Counter)
+        corpus = defaultdict(lambda: [0, 0])
+        vectors = []
+        for candidate in candidates:
+            terms, length = term_vector(candidate.resume_notes)
+            old = previous.get(candidate.pk)
+            if old is not None:
+                df[candidate.hub_id].subtract(old.terms.keys())
+                corpus[candidate.hub_id][0] -= 1
+                corpus[candidate.hub_id][1] -= old.length
+            df[candidate.hub_id].update(terms.keys())
+            corpus[candidate.hub_id][0] += 1
+            corpus[candidate.hub_id][1] += length
+            vectors.append(CandidateTermVector(
+                candidate_id=candidate.pk, hub_id=candidate.hub_id, length=length, terms=terms,
+            ))
+        CandidateTermVector.objects.filter(candidate_id__in=list(previous)).delete()
+        CandidateTermVector.objects.bulk_create(vectors, batch_size=DEFAULT_BATCH_SIZE)
+        for hub_id, deltas in df.items():
+            _apply_df(hub_id, deltas)
+        for hub_id, (documents, length) in corpus.items():
+            _apply_corpus(hub_id, documents, length)
+    for hub_id in {c.hub_id for c in candidates}:
+        score_candidates(hub_id, candidate_ids=[c.pk for c in candidates if c.hub_id == hub_id])
+
+
+def score_candidates(hub_id, position_ids=None, candidate_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recompute ``match_score`` for a hub's live candidates, optionally only
+    those of ``position_ids`` or with ``candidate_ids``. Returns the count.
+    """
+    candidates = Candidate.objects.for_hub(hub_id)
+    positions = JobPosition.all_objects.filter(hub_id=hub_id)
+    if position_ids is not None:
+        candidates = candidates.filter(position_id__in=position_ids)
+        positions = positions.filter(id__in=position_ids)
+    if candidate_ids is not None:
+        candidates = candidates.filter(id__in=candidate_ids)
+        positions = positions.filter(id__in=candidates.values('position_id'))
+
+    queries = {
+        pk: position_query(title, description)
+        for pk, title, description in positions.values_list('id', 'title', 'description')
+    }
+    corpus = Corpus(hub_id, {term for query in queries.values() for term in query})
+    rows = candidates.order_by().values_list('id', 'position_id', 'term_vector__terms', 'term_vector__length')
+    count = 0
+    scored = []
+    with transaction.atomic():
+        for pk, position_id, terms, length in rows.iterator(chunk_size=batch_size):
+            score = corpus.score(queries.get(position_id, ()), terms or {}, length or 0)
+            scored.append(Candidate(pk=pk, match_score=score))
+            if len(scored) >= batch_size:
+                Candidate.all_objects.bulk_update(scored, ['match_score'])
+                count += len(scored)
+                scored = []
+        Candidate.all_objects.bulk_update(scored, ['match_score'])
+    return count + len(scored)
+
+
+def rebuild_ranking(hub_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Rebuild vectors, statistics and scores from the live candidates."""
+    if hub_id is not None:
+        hub_ids = [hub_id]
+    else:
+        hub_ids = list(Candidate.objects.order_by().values_list('hub_id', flat=True).distinct())
+
+    for hub in hub_ids:
+        df = Counter()
+        documents = total_length = 0
+        with transaction.atomic():
+            CandidateTermVector.objects.filter(hub_id=hub).delete()
+            RankingTerm.objects.filter(hub_id=hub).delete()
+            vectors = []
+            notes = Candidate.objects.for_hub(hub).values_list('id', 'resume_notes')
+            for pk, text in notes.iterator(chunk_size=batch_size):
+                terms, length = term_vector(text)
+                df.update(terms.keys())
+                documents += 1
+                total_length += length
+                vectors.append(CandidateTermVector(candidate_id=pk, hub_id=hub, length=length, terms=terms))
+                if len(vectors) >= batch_size:
+                    CandidateTermVector.objects.bulk_create(vectors)
+                    vectors = []
+            CandidateTermVector.objects.bulk_create(vectors)
+            RankingTerm.objects.bulk_create(
+                [RankingTerm(hub_id=hub, term=term, df=n) for term, n in df.items()], batch_size=batch_size,
+            )
+            RankingCorpus.objects.update_or_create(
+                hub_id=hub, defaults={'documents': documents, 'total_length': total_length},
+            )
+        score_candidates(hub, batch_size=batch_size)
+    return len(hub_ids)
+
+
+def top_candidates(hub_id, position_id, limit=10):
+    """The best-matching live candidates of a position, best first."""
+    qs = Candidate.objects.for_hub(hub_id).filter(position_id=position_id).order_by('-match_score', 'name')
+    return qs[:limit] if limit is not None else qs
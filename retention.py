@@ -0,0 +1,59 @@
+"""
+Purging of soft-deleted recruitment rows.
+
+Soft deletes leave tombstones behind so deletions can be audited and
+undone; ``purge_deleted`` hard-deletes the ones older than the retention
+window. Each batch is its own short transaction over at most
+``batch_size`` primary keys, so the purge never holds long locks or
+produces one huge transaction, and can be interrupted and resumed.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Candidate, JobPosition
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_BATCH_SIZE = 1000
+
+
+def retention_days():
+    return getattr(settings, 'RECRUITMENT_DELETED_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def _purge(qs, batch_size, pause):
+    model = qs.model
+    purged = 0
+    while True:
+        ids = list(qs.order_by('deleted_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return purged
+        with transaction.atomic():
+            # Positions cascade to their PositionPipelineStats row.
+            _total, per_model = model.all_objects.filter(id__in=ids).delete()
+        purged += per_model.get(model._meta.label, 0)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_deleted(days=None, batch_size=DEFAULT_BATCH_SIZE, pause=0, dry_run=False):
+    """
+    Hard-delete candidates and positions soft-deleted more than ``days``
+    ago. Positions that still have candidates (of any kind) are kept until
+    those are purged. Returns ``{'candidates': n, 'positions': n}``.
+    """
+    days = retention_days() if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = Candidate.all_objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+    positions = JobPosition.all_objects.filter(is_deleted=True, deleted_at__lt=cutoff).exclude(
+        Exists(Candidate.all_objects.filter(position_id=OuterRef('pk'))),
+    )
+    if dry_run:
+        return {'candidates': candidates.count(), 'positions': positions.count()}
+    # Candidates first so their positions become purgeable in the same run.
+    purged_candidates = _purge(candidates, batch_size, pause)
+    return {'candidates': purged_candidates, 'positions': _purge(positions, batch_size, pause)}
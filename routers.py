@@ -0,0 +1,213 @@
+"""
+Read-replica routing for the recruitment read paths.
+
+With RECRUITMENT_REPLICA_DB set to a database alias, reads of recruitment
+models made inside ``use_replica()`` go to that alias; everything else,
+and every write, goes where it went before. Read paths opt in with
+``replica_reads`` (views) or ``replica_tool`` (AI tools): the dashboard,
+the job position and candidate lists with their exports, and the
+read-only AI tools.
+
+A session that writes recruitment rows is pinned to the primary for
+RECRUITMENT_REPLICA_PIN_SECONDS (default 15), longer than the replica is
+expected to lag, so users see their own edits; the rest of the request
+that wrote reads the primary too. Writes are noticed by ``db_for_write``
+and the pin is stored in the session by ``ReplicaPinMiddleware``.
+
+Settings::
+
+    DATABASE_ROUTERS = ['recruitment.routers.RecruitmentRouter']
+    MIDDLEWARE = [
+        ...,
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        ...,
+        'recruitment.routers.ReplicaPinMiddleware',
+    ]
+    RECRUITMENT_REPLICA_DB = 'replica'
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.template.response import SimpleTemplateResponse
+
+APP_LABEL = 'recruitment'
+PIN_SESSION_KEY = 'recruitment_primary_until'
+DEFAULT_PIN_SECONDS = 15
+
+
+class _State:
+    """Routing state of one request (or ``use_replica`` block outside a request)."""
+
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self):
+        self.replica = False
+        self.wrote = False
+
+
+# A mutable object rather than two ContextVars, so flags set in
+# sync_to_async threads are seen by the coroutine that started them.
+_state = ContextVar('recruitment_routing_state', default=None)
+
+
+def replica_alias():
+    return getattr(settings, 'RECRUITMENT_REPLICA_DB', None)
+
+
+def pin_seconds():
+    return getattr(settings, 'RECRUITMENT_REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+@contextmanager
+def _scope():
+    state = _state.get()
+    if state is not None:
+        yield state
+        return
+    state = _State()
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """Send recruitment reads in the block to the replica, until something writes."""
+    with _scope() as state:
+        previous, state.replica = state.replica, True
+        try:
+            yield
+        finally:
+            state.replica = previous
+
+
+def reading_replica():
+    """Whether a recruitment read made now would go to the replica."""
+    state = _state.get()
+    return bool(replica_alias() and state is not None and state.replica and not state.wrote)
+
+
+def cache_timeout(timeout):
+    """``timeout`` for a value computed now, capped at the pin window if it came from the replica.
+
+    A lagging replica can refill a cache entry a write just invalidated;
+    the short timeout bounds how long that stale entry lives.
+    """
+    return min(timeout, pin_seconds()) if reading_replica() else timeout
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def _pin(request, state):
+    session = getattr(request, 'session', None)
+    if state.wrote and session is not None:
+        session[PIN_SESSION_KEY] = time.time() + pin_seconds()
+
+
+class RecruitmentRouter:
+    """Routes recruitment reads to RECRUITMENT_REPLICA_DB inside ``use_replica``."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == APP_LABEL and reading_replica():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == APP_LABEL:
+            state = _state.get()
+            if state is not None:
+                state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows read from the replica may be attached to rows from the primary.
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if (
+            APP_LABEL in (obj1._meta.app_label, obj2._meta.app_label)
+            and obj1._state.db in aliases and obj2._state.db in aliases
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema from the primary.
+        if app_label == APP_LABEL and db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """Pins the session to the primary after a request that wrote recruitment rows."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with _scope() as state:
+            response = self.get_response(request)
+        _pin(request, state)
+        return response
+
+    async def __acall__(self, request):
+        with _scope() as state:
+            response = await self.get_response(request)
+        if state.wrote:
+            await sync_to_async(_pin)(request, state)
+        return response
+
+
+def _lazy(response):
+    # Unrendered responses would otherwise query from the template after the block.
+    return isinstance(response, SimpleTemplateResponse) and not response.is_rendered
+
+
+def replica_reads(view):
+    """Run ``view``, sync or async, with ``use_replica`` unless the session is pinned."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not replica_alias() or await sync_to_async(is_pinned)(request):
+                return await view(request, *args, **kwargs)
+            with use_replica():
+                response = await view(request, *args, **kwargs)
+                if _lazy(response):
+                    await sync_to_async(response.render)()
+                return response
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_alias() or is_pinned(request):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            response = view(request, *args, **kwargs)
+            return response.render() if _lazy(response) else response
+    return wrapper
+
+
+def replica_tool(execute):
+    """Wrap an ``AssistantTool.execute`` like ``replica_reads`` wraps a view."""
+    @functools.wraps(execute)
+    def wrapper(self, args, request):
+        if not replica_alias() or is_pinned(request):
+            return execute(self, args, request)
+        with use_replica():
+            return execute(self, args, request)
+    return wrapper
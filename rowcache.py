@@ -0,0 +1,126 @@
+"""
+Rendered-row fragment cache for the datatable partials.
+
+``{% rowcache %}`` (templatetags/recruitment_cache.py) stores the HTML of
+a block under a key built from the values passed to it plus the active
+language and the user's role, so a row is re-rendered only when one of
+its inputs changed. Rows pass their id and ``updated_at`` and the few
+displayed values that set-based writes change without touching
+``updated_at`` (match scores, pipeline counters, the position title).
+Entries are never invalidated explicitly: a changed row gets a new key
+and the old one ages out.
+
+The backend is RECRUITMENT_ROW_CACHE:
+
+- ``recruitment.rowcache.LocalRowCache`` (default): per-process LRU of at
+  most RECRUITMENT_ROW_CACHE_SIZE rows.
+- ``recruitment.rowcache.SharedRowCache``: the Django cache named by
+  RECRUITMENT_ROW_CACHE_ALIAS, shared between workers.
+- ``recruitment.rowcache.NullRowCache``: disabled.
+
+Markup with no inputs at all, like icons, is rendered once per process by
+``static_fragment``.
+"""
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template import engines
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+DEFAULT_BACKEND = 'recruitment.rowcache.LocalRowCache'
+DEFAULT_SIZE = 5000
+DEFAULT_TIMEOUT = 24 * 3600
+
+
+class NullRowCache:
+
+    def get(self, key):
+        return None
+
+    def set(self, key, html):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LocalRowCache(NullRowCache):
+    """Bounded LRU shared by the threads of one process."""
+
+    def __init__(self, size=None):
+        self.size = size or getattr(settings, 'RECRUITMENT_ROW_CACHE_SIZE', DEFAULT_SIZE)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        with self.lock:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SharedRowCache(NullRowCache):
+    """Rows in a Django cache; its own eviction policy bounds the size."""
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'RECRUITMENT_ROW_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _key(key):
+        return 'recruitment:row:' + hashlib.md5(repr(key).encode()).hexdigest()
+
+    def get(self, key):
+        return self.cache.get(self._key(key))
+
+    def set(self, key, html):
+        self.cache.set(self._key(key), str(html), DEFAULT_TIMEOUT)
+
+    def clear(self):
+        # Keys can't be listed in a shared cache; entries expire on their own.
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def backend():
+    """The configured row cache, created once per process."""
+    return import_string(getattr(settings, 'RECRUITMENT_ROW_CACHE', DEFAULT_BACKEND))()
+
+
+def row_key(parts, request=None):
+    """Cache key of a fragment rendered from ``parts`` for this language and role."""
+    session = getattr(request, 'session', None)
+    role = session.get('user_role', '') if session is not None else ''
+    return (get_language(), role, *(str(part) for part in parts))
+
+
+@functools.lru_cache(maxsize=256)
+def static_fragment(source):
+    """Render template ``source`` with an empty context, once per process."""
+    return mark_safe(engines['django'].from_string(source).render())
+
+
+def icon(name):
+    """Memoised ``{% icon name %}`` markup."""
+    return static_fragment('{% load djicons %}{% icon "' + name + '" %}')
@@ -0,0 +1,132 @@
+"""
+Full-text search for the recruitment lists.
+
+Backends take a queryset and a free-text query and return the queryset
+filtered to matches and annotated with ``search_rank`` (higher is better).
+
+- PostgreSQL: weighted ``search_document`` tsvector column (generated, GIN
+  indexed) with prefix matching, plus trigram-indexed ILIKE on the short
+  identifying columns so partial emails and phone numbers still match.
+- SQLite: FTS5 tables kept in sync by triggers, ranked with bm25().
+- Anything else: the original multi-column icontains filter, unranked.
+
+The index structures are created by migration 0003 and maintained by the
+database itself, so saves, soft deletes and bulk updates stay in sync.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Columns searched by the icontains fallback (the historical behaviour).
+ICONTAINS_FIELDS = {
+    'recruitment_jobposition': ('title', 'department', 'description', 'status'),
+    'recruitment_candidate': ('name', 'email', 'phone', 'stage'),
+}
+
+# Columns matched by substring through trigram indexes on PostgreSQL.
+TRIGRAM_FIELDS = {
+    'recruitment_jobposition': ('title',),
+    'recruitment_candidate': ('name', 'email', 'phone'),
+}
+
+
+def _tokens(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class IContainsSearchBackend:
+    ranked = False
+
+    def search(self, qs, query):
+        condition = Q()
+        for field in ICONTAINS_FIELDS[qs.model._meta.db_table]:
+            condition |= Q(**{f'{field}__icontains': query})
+        return qs.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    ranked = True
+
+    def search(self, qs, query):
+        tokens = _tokens(query)
+        if not tokens:
+            return super().search(qs, query)
+        table = qs.model._meta.db_table
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        like = f'%{_escape_like(query)}%'
+        trigram = TRIGRAM_FIELDS[table]
+        match_sql = '("{t}"."search_document" @@ to_tsquery(\'simple\', %s){ilike})'.format(
+            t=table, ilike=''.join(f' OR "{table}"."{field}" ILIKE %s' for field in trigram),
+        )
+        rank_sql = (
+            f'ts_rank("{table}"."search_document", to_tsquery(\'simple\', %s))'
+            f' + similarity("{table}"."{trigram[0]}", %s)'
+        )
+        return qs.alias(
+            search_match=RawSQL(match_sql, (tsquery, *[like] * len(trigram)), output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(rank_sql, (tsquery, query), output_field=FloatField()),
+        )
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    ranked = True
+
+    def search(self, qs, query):
+        tokens = _tokens(query)
+        if not tokens:
+            return super().search(qs, query)
+        table = qs.model._meta.db_table
+        fts, fts_map = f'{table}_fts', f'{table}_fts_map'
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        ids_sql = (
+            f'SELECT m.object_id FROM {fts_map} m JOIN {fts} ON {fts}.rowid = m.fts_rowid '
+            f'WHERE {fts} MATCH %s'
+        )
+        rank_sql = (
+            f'(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = '
+            f'(SELECT fts_rowid FROM {fts_map} WHERE object_id = "{table}"."id"))'
+        )
+        return qs.filter(pk__in=RawSQL(ids_sql, (match,))).annotate(
+            search_rank=RawSQL(rank_sql, (match,), output_field=FloatField()),
+        )
+
+
+_backends = {}
+
+
+def _has_fts_tables(connection):
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+    return all(f'{table}_fts' in tables for table in ICONTAINS_FIELDS)
+
+
+def get_backend(using='default'):
+    if using not in _backends:
+        connection = connections[using]
+        path = getattr(settings, 'RECRUITMENT_SEARCH_BACKEND', None)
+        if path:
+            backend = import_string(path)()
+        elif connection.vendor == 'postgresql':
+            backend = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite' and _has_fts_tables(connection):
+            backend = SQLiteFTSSearchBackend()
+        else:
+            backend = IContainsSearchBackend()
+        _backends[using] = backend
+    return _backends[using]
+
+
+def search(qs, query):
+    """Filter ``qs`` to rows matching ``query``, annotated with ``search_rank``."""
+    return get_backend(qs.db).search(qs, query)
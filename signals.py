@@ -0,0 +1,85 @@
+"""
+Signal handlers for the Recruitment module.
+
+Bulk paths that use ``QuerySet.update()`` bypass these and call the same
+helpers directly.
+"""
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import attachments, funnel, instrumentation, pipeline, ranking, similarity
+from .models import Candidate, CandidateAttachment, JobPosition, PositionPipelineStats
+from .stats import invalidate_pipeline_summary
+
+
+@receiver(post_save, sender=JobPosition)
+@receiver(post_delete, sender=JobPosition)
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_dashboard(sender, instance, signal, **kwargs):
+    if signal is post_delete and instance.is_deleted:
+        # Purging a tombstone doesn't change anything the dashboard counts.
+        return
+    invalidate_pipeline_summary(instance.hub_id)
+
+
+@receiver(post_save, sender=JobPosition)
+def create_pipeline_stats(sender, instance, created, **kwargs):
+    if created:
+        PositionPipelineStats.objects.get_or_create(position=instance, defaults={'hub_id': instance.hub_id})
+
+
+@receiver(post_save, sender=Candidate)
+def track_pipeline_on_save(sender, instance, created, **kwargs):
+    new = instance.pipeline_state()
+    if created:
+        pipeline.transition(None, new)
+        funnel.record_created([instance])
+    elif hasattr(instance, '_pipeline_state'):
+        old = instance._pipeline_state
+        pipeline.transition(old, new)
+        if old[1] != new[1] and not instance.is_deleted:
+            funnel.record_stage_change(instance, old[1])
+    else:
+        # Loaded without the tracked columns; recount the affected position.
+        pipeline.rebuild_position(instance.position_id)
+    instance._pipeline_state = new
+
+
+@receiver(post_delete, sender=Candidate)
+def track_pipeline_on_delete(sender, instance, **kwargs):
+    pipeline.transition(getattr(instance, '_pipeline_state', instance.pipeline_state()), None)
+
+
+@receiver(post_save, sender=Candidate)
+def index_notes_on_save(sender, instance, created, **kwargs):
+    state = instance.indexed_state()
+    if created or getattr(instance, '_indexed_state', None) != state:
+        ranking.index_candidates([instance])
+        similarity.update_candidates(instance.hub_id, [instance.pk])
+    instance._indexed_state = state
+
+
+@receiver(post_save, sender=JobPosition)
+def reindex_on_position_save(sender, instance, created, **kwargs):
+    state = instance.indexed_state()
+    old = getattr(instance, '_indexed_state', None) or (None, None, None)
+    if not created:
+        if old[:2] != state[:2]:
+            ranking.score_candidates(instance.hub_id, position_ids=[instance.pk])
+        if (old[0], old[2]) != (state[0], state[2]):
+            similarity.update_positions(instance.hub_id, [instance.pk])
+    instance._indexed_state = state
+
+
+@receiver(post_delete, sender=CandidateAttachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    # Hard deletes only (tombstone purges, candidate cascades); soft-deleted
+    # attachments keep their reference.
+    attachments.release(instance.blob_id)
+
+
+@receiver(connection_created)
+def count_instrumented_queries(sender, connection, **kwargs):
+    instrumentation.install(connection)
@@ -0,0 +1,316 @@
+"""
+"Find candidates like this one" over hashed bag-of-words vectors.
+
+Each live candidate is embedded as a fixed-size float32 vector: tokens of
+the resume notes plus the position title and department are hashed
+(CRC32, stable across processes) into ``dim`` signed buckets, weighted by
+``1 + log(tf)`` and L2-normalised, so cosine similarity is a dot product
+and a top-k query is one matrix-vector product over the hub's matrix.
+
+Per hub the index is two ``.npy`` files in RECRUITMENT_SIMILARITY_DIR,
+memory-mapped by every worker: a ``capacity x dim`` vector matrix and a
+``capacity x 2`` uint64 id matrix (UUID halves, zero for free slots).
+Saves update rows in place under a file lock; when the index is full it
+is copied into a larger generation and the ``.current`` pointer file is
+swapped atomically, so readers never see a half-written index. Soft
+deleted candidates are filtered out at query time and dropped by
+``rebuild_index``.
+
+NumPy is optional: without it the feature reports itself unavailable.
+"""
+import math
+import os
+import tempfile
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+
+from .models import Candidate
+from .ranking import tokenize
+
+DEFAULT_DIM = 1024
+INITIAL_CAPACITY = 1024
+DEFAULT_BATCH_SIZE = 2000
+# Candidates fetched per requested result, to survive soft-deleted rows.
+OVERFETCH = 3
+
+# Open memory maps per hub: {hub_id: (generation, ids, vectors)}.
+_open = {}
+
+
+class SimilarityUnavailable(Exception):
+    """NumPy is not installed."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise SimilarityUnavailable('Similarity search requires numpy') from exc
+    return numpy
+
+
+def available():
+    try:
+        _numpy()
+    except SimilarityUnavailable:
+        return False
+    return True
+
+
+def index_dir():
+    path = getattr(settings, 'RECRUITMENT_SIMILARITY_DIR', None)
+    return path or os.path.join(tempfile.gettempdir(), 'recruitment-similarity')
+
+
+def dimensions():
+    return getattr(settings, 'RECRUITMENT_SIMILARITY_DIM', DEFAULT_DIM)
+
+
+def _path(hub_id, name):
+    return os.path.join(index_dir(), f'{hub_id}.{name}')
+
+
+def _id_halves(pk):
+    value = UUID(str(pk)).int
+    return value >> 64, value & (2 ** 64 - 1)
+
+
+def _uuid(hi, lo):
+    return UUID(int=(int(hi) << 64) | int(lo))
+
+
+# -- Embedding ---------------------------------------------------------------
+
+def _document(notes, title, department):
+    return tokenize(f'{notes}\n{title}\n{department}')
+
+
+def embed(documents, dim=None):
+    """``len(documents) x dim`` float32 matrix of normalised hashed vectors."""
+    np = _numpy()
+    dim = dim or dimensions()
+    rows, columns, weights = [], [], []
+    for row, tokens in enumerate(documents):
+        for token, tf in Counter(tokens).items():
+            h = zlib.crc32(token.encode())
+            rows.append(row)
+            columns.append(h % dim)
+            weights.append((1 if h & 0x80000000 else -1) * (1 + math.log(tf)))
+    matrix = np.zeros((len(documents), dim), dtype=np.float32)
+    if weights:
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), weights)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _candidate_rows(qs):
+    return qs.order_by().values_list('id', 'resume_notes', 'position__title', 'position__department')
+
+
+# -- Files -------------------------------------------------------------------
+
+@contextmanager
+def _locked(hub_id):
+    import fcntl
+
+    os.makedirs(index_dir(), exist_ok=True)
+    with open(_path(hub_id, 'lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _generation(hub_id):
+    try:
+        with open(_path(hub_id, 'current')) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _create(hub_id, generation, capacity, dim):
+    from numpy.lib.format import open_memmap
+
+    np = _numpy()
+    ids = open_memmap(_path(hub_id, f'{generation}.ids.npy'), mode='w+', dtype=np.uint64, shape=(capacity, 2))
+    vectors = open_memmap(
+        _path(hub_id, f'{generation}.vec.npy'), mode='w+', dtype=np.float32, shape=(capacity, dim),
+    )
+    return ids, vectors
+
+
+def _publish(hub_id, generation):
+    """Point readers at ``generation`` and remove older files."""
+    tmp = _path(hub_id, 'current.tmp')
+    with open(tmp, 'w') as f:
+        f.write(str(generation))
+    os.replace(tmp, _path(hub_id, 'current'))
+    prefix = f'{hub_id}.'
+    for name in os.listdir(index_dir()):
+        if name.startswith(prefix) and name.endswith('.npy'):
+            old = name[len(prefix):].split('.', 1)[0]
+            if old.isdigit() and int(old) < generation:
+                # Workers that still map the old files keep them alive.
+                os.unlink(os.path.join(index_dir(), name))
+
+
+def _load(hub_id, mode='r'):
+    """``(generation, ids, vectors)`` memory maps of a hub's index, or None."""
+    np = _numpy()
+    generation = _generation(hub_id)
+    if generation is None:
+        return None
+    cached = _open.get(hub_id)
+    if mode == 'r' and cached and cached[0] == generation:
+        return cached
+    try:
+        ids = np.load(_path(hub_id, f'{generation}.ids.npy'), mmap_mode=mode)
+        vectors = np.load(_path(hub_id, f'{generation}.vec.npy'), mmap_mode=mode)
+    except FileNotFoundError:
+        # Replaced between reading the pointer and opening; the caller retries.
+        return None
+    loaded = (generation, ids, vectors)
+    if mode == 'r':
+        _open[hub_id] = loaded
+    return loaded
+
+
+# -- Maintenance -------------------------------------------------------------
+
+def rebuild_index(hub_id, batch_size=DEFAULT_BATCH_SIZE):
+    """Write a fresh index of the hub's live candidates. Returns the row count."""
+    np = _numpy()
+    qs = Candidate.objects.for_hub(hub_id)
+    count = qs.count()
+    # Room to grow before the next copy; rows added meanwhile beyond it wait for the next rebuild.
+    capacity = max(INITIAL_CAPACITY, 2 * count)
+    with _locked(hub_id):
+        generation = (_generation(hub_id) or 0) + 1
+        ids, vectors = _create(hub_id, generation, capacity, dimensions())
+        row = 0
+        batch = []
+        for item in islice(_candidate_rows(qs).iterator(chunk_size=batch_size), capacity):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                row = _write_rows(np, ids, vectors, row, batch)
+                batch = []
+        row = _write_rows(np, ids, vectors, row, batch)
+        ids.flush()
+        vectors.flush()
+        del ids, vectors
+        _publish(hub_id, generation)
+    return row
+
+
+def _write_rows(np, ids, vectors, start, batch):
+    if not batch:
+        return start
+    end = start + len(batch)
+    ids[start:end] = np.array([_id_halves(pk) for pk, *_rest in batch], dtype=np.uint64)
+    vectors[start:end] = embed([_document(*rest) for _pk, *rest in batch], dim=vectors.shape[1])
+    return end
+
+
+def update_candidates(hub_id, candidate_ids):
+    """
+    Re-embed ``candidate_ids`` in place, appending new ones. Does nothing
+    for hubs that have no index yet (it is built on first query) or when
+    NumPy is missing.
+    """
+    if not candidate_ids or not available() or _generation(hub_id) is None:
+        return 0
+    np = _numpy()
+    rows = list(_candidate_rows(Candidate.objects.for_hub(hub_id).filter(id__in=candidate_ids)))
+    with _locked(hub_id):
+        loaded = _load(hub_id, mode='r+')
+        if loaded is None:
+            return 0
+        generation, ids, vectors = loaded
+        # Existing rows of the touched candidates are cleared, then refilled;
+        # rows of candidates no longer live stay cleared.
+        wanted = {_id_halves(pk) for pk in candidate_ids}
+        maybe = np.flatnonzero(np.isin(ids[:, 0], np.array([hi for hi, _lo in wanted], dtype=np.uint64)))
+        ids[[i for i in maybe if (int(ids[i, 0]), int(ids[i, 1])) in wanted]] = 0
+        free = np.flatnonzero((ids[:, 0] == 0) & (ids[:, 1] == 0))
+        if len(free) < len(rows):
+            generation, ids, vectors = _grow(hub_id, generation, ids, vectors, len(rows))
+            free = np.flatnonzero((ids[:, 0] == 0) & (ids[:, 1] == 0))
+        if rows:
+            slots = free[:len(rows)]
+            ids[slots] = np.array([_id_halves(pk) for pk, *_rest in rows], dtype=np.uint64)
+            vectors[slots] = embed([_document(*rest) for _pk, *rest in rows], dim=vectors.shape[1])
+        ids.flush()
+        vectors.flush()
+    return len(rows)
+
+
+def _grow(hub_id, generation, ids, vectors, needed):
+    capacity = len(ids)
+    while capacity - _used(ids) < needed:
+        capacity *= 2
+    new_ids, new_vectors = _create(hub_id, generation + 1, capacity, vectors.shape[1])
+    new_ids[:len(ids)] = ids
+    new_vectors[:len(vectors)] = vectors
+    new_ids.flush()
+    new_vectors.flush()
+    _publish(hub_id, generation + 1)
+    return generation + 1, new_ids, new_vectors
+
+
+def _used(ids):
+    return int(((ids[:, 0] != 0) | (ids[:, 1] != 0)).sum())
+
+
+def update_positions(hub_id, position_ids):
+    """Re-embed the candidates of ``position_ids`` after their title or department changed."""
+    ids = list(Candidate.objects.for_hub(hub_id).filter(position_id__in=position_ids).values_list('id', flat=True))
+    return update_candidates(hub_id, ids)
+
+
+# -- Queries -----------------------------------------------------------------
+
+def similar_candidates(candidate, limit=10, exclude_position=False):
+    """
+    ``[(candidate, similarity)]`` for the live candidates of the same hub
+    most similar to ``candidate``, best first.
+    """
+    np = _numpy()
+    if limit < 1:
+        return []
+    hub_id = candidate.hub_id
+    loaded = _load(hub_id)
+    if loaded is None:
+        rebuild_index(hub_id)
+        loaded = _load(hub_id)
+    _generation_, ids, vectors = loaded
+
+    hi, lo = _id_halves(candidate.pk)
+    own = np.flatnonzero((ids[:, 0] == hi) & (ids[:, 1] == lo))
+    if len(own):
+        query = np.asarray(vectors[own[0]])
+    else:
+        position = candidate.position
+        query = embed([_document(candidate.resume_notes, position.title, position.department)], dim=vectors.shape[1])[0]
+    if not query.any():
+        return []
+
+    scores = vectors @ query
+    scores[own] = 0
+    wanted = min(limit * OVERFETCH, len(scores))
+    top = np.argpartition(-scores, wanted - 1)[:wanted]
+    top = top[np.argsort(-scores[top])]
+    ranked = [(_uuid(*ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    qs = Candidate.objects.for_list(hub_id).filter(id__in=[pk for pk, _score in ranked])
+    if exclude_position:
+        qs = qs.exclude(position_id=candidate.position_id)
+    found = {c.pk: c for c in qs}
+    return [(found[pk], round(score, 3)) for pk, score in ranked if pk in found][:limit]
@@ -0,0 +1,139 @@
+"""
+Pipeline aggregates for the recruitment dashboard.
+
+The dashboard's counts come from one grouped query over the hub's
+positions joined to their live candidates, and its funnel from a second
+query over PositionStageMetrics, which ``rollup_stage_metrics`` keeps up
+to date (see funnel.py). The result is cached per hub; signals and the
+bulk views drop the cached entry whenever candidates or positions change.
+Summaries read from a replica are cached only for the pin window (see
+routers.py), so one computed before a write reached it expires quickly.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from . import routers
+from .funnel import ahub_funnel, hub_funnel
+from .models import CAND_STAGE, JOB_STATUS, JobPosition
+
+CACHE_TIMEOUT = 300
+HITS_KEY = 'recruitment:dashboard:hits'
+MISSES_KEY = 'recruitment:dashboard:misses'
+# Open positions listed with their vacancies on the dashboard.
+TOP_POSITIONS = 10
+
+
+def _cache_key(hub_id):
+    return f'recruitment:dashboard:{hub_id}'
+
+
+def _count(key):
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); the counter restarts.
+        pass
+
+
+async def _acount(key):
+    if await cache.aadd(key, 1, timeout=None):
+        return
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+
+def _position_rows(hub_id):
+    live = Q(candidates__is_deleted=False)
+    per_stage = {
+        f'stage_{code}': Count('candidates', filter=live & Q(candidates__stage=code))
+        for code, _label in CAND_STAGE
+    }
+    return (
+        JobPosition.objects.for_hub(hub_id)
+        .values('id', 'title', 'status', 'vacancies')
+        .annotate(
+            total=Count('candidates', filter=live),
+            rating_sum=Sum('candidates__rating', filter=live),
+            **per_stage,
+        )
+        .order_by()
+    )
+
+
+def compute_pipeline_summary(hub_id):
+    return _summarise(list(_position_rows(hub_id)), hub_funnel(hub_id))
+
+
+async def acompute_pipeline_summary(hub_id):
+    rows = [row async for row in _position_rows(hub_id)]
+    return _summarise(rows, await ahub_funnel(hub_id))
+
+
+def _summarise(rows, funnel):
+    stages = {code: sum(row[f'stage_{code}'] for row in rows) for code, _label in CAND_STAGE}
+    statuses = {code: 0 for code, _label in JOB_STATUS}
+    for row in rows:
+        statuses[row['status']] = statuses.get(row['status'], 0) + 1
+    total_candidates = sum(row['total'] for row in rows)
+    rating_sum = sum(row['rating_sum'] or 0 for row in rows)
+
+    open_positions = sorted(
+        (row for row in rows if row['status'] == 'open'),
+        key=lambda row: (-row['total'], row['title']),
+    )[:TOP_POSITIONS]
+    return {
+        'total_job_positions': len(rows),
+        'total_candidates': total_candidates,
+        'average_rating': round(rating_sum / total_candidates, 2) if total_candidates else None,
+        'stage_counts': [(code, label, stages[code]) for code, label in CAND_STAGE],
+        'status_counts': [(code, label, statuses.get(code, 0)) for code, label in JOB_STATUS],
+        'funnel': funnel,
+        'open_positions': [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'vacancies': row['vacancies'],
+                'hired': row['stage_hired'],
+                'remaining': max(row['vacancies'] - row['stage_hired'], 0),
+                'candidates': row['total'],
+            }
+            for row in open_positions
+        ],
+    }
+
+
+def pipeline_summary(hub_id):
+    key = _cache_key(hub_id)
+    summary = cache.get(key)
+    if summary is None:
+        _count(MISSES_KEY)
+        summary = compute_pipeline_summary(hub_id)
+        cache.set(key, summary, routers.cache_timeout(CACHE_TIMEOUT))
+    else:
+        _count(HITS_KEY)
+    return summary
+
+
+async def apipeline_summary(hub_id):
+    """``pipeline_summary`` through the async cache and ORM APIs."""
+    key = _cache_key(hub_id)
+    summary = await cache.aget(key)
+    if summary is None:
+        await _acount(MISSES_KEY)
+        summary = await acompute_pipeline_summary(hub_id)
+        await cache.aset(key, summary, routers.cache_timeout(CACHE_TIMEOUT))
+    else:
+        await _acount(HITS_KEY)
+    return summary
+
+
+def invalidate_pipeline_summary(hub_id):
+    cache.delete(_cache_key(hub_id))
+
+
+def cache_stats():
+    return {'hits': cache.get(HITS_KEY, 0), 'misses': cache.get(MISSES_KEY, 0)}
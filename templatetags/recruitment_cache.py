@@ -0,0 +1,49 @@
+"""
+Fragment caching for the recruitment datatables (see rowcache.py).
+
+    {% load recruitment_cache %}
+    {% rowcache "candidate" item.id item.updated_at %}...{% endrowcache %}
+    {% cached_icon "create-outline" %}
+"""
+from django import template
+from django.utils.safestring import mark_safe
+
+from recruitment import rowcache as row_cache
+
+register = template.Library()
+
+
+class RowCacheNode(template.Node):
+
+    def __init__(self, nodelist, parts):
+        self.nodelist = nodelist
+        self.parts = parts
+
+    def render(self, context):
+        # RequestContext carries the request whether or not the request
+        # context processor is enabled.
+        request = getattr(context, 'request', None)
+        key = row_cache.row_key([part.resolve(context) for part in self.parts], request)
+        cache = row_cache.backend()
+        html = cache.get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(key, html)
+        return mark_safe(html)
+
+
+@register.tag
+def rowcache(parser, token):
+    """Cache the enclosed block under the given values, the language and the user's role."""
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f'{bits[0]} needs at least one key value')
+    nodelist = parser.parse(('endrowcache',))
+    parser.delete_first_token()
+    return RowCacheNode(nodelist, [parser.compile_filter(bit) for bit in bits[1:]])
+
+
+@register.simple_tag
+def cached_icon(name):
+    """``{% icon name %}`` rendered once per process."""
+    return row_cache.icon(name)
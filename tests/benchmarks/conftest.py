@@ -0,0 +1,123 @@
+"""
+Fixtures for the recruitment benchmarks.
+
+Benchmarks are slow and build large datasets, so they only run when
+RECRUITMENT_BENCHMARKS=1 is set. RECRUITMENT_BENCH_ROWS sets the dataset
+size (default 1,000,000 candidates).
+
+The load suite (test_load_benchmark.py) runs once per size named in
+RECRUITMENT_BENCH_SIZES (any of 1k, 100k, 1m; default "1k,100k"). Each
+size is a hub of that many candidates plus RECRUITMENT_BENCH_TENANTS - 1
+smaller neighbouring hubs, so hub scoping is exercised too.
+"""
+import os
+import random
+import uuid
+
+import pytest
+
+from recruitment.models import JobPosition, Candidate
+
+BENCH_ROWS = int(os.environ.get('RECRUITMENT_BENCH_ROWS', 1_000_000))
+BATCH_SIZE = 5000
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+LOAD_SIZES = [
+    size.strip() for size in os.environ.get('RECRUITMENT_BENCH_SIZES', '1k,100k').split(',') if size.strip() in SIZES
+]
+TENANTS = int(os.environ.get('RECRUITMENT_BENCH_TENANTS', 5))
+
+FIRST_NAMES = ['Ana', 'Bob', 'Carla', 'David', 'Elena', 'Farid', 'Greta', 'Hugo', 'Irene', 'Jon']
+LAST_NAMES = ['Garcia', 'Smith', 'Perez', 'Muller', 'Rossi', 'Novak', 'Silva', 'Kim', 'Ortiz', 'Berg']
+SKILLS = ['python', 'django', 'kubernetes', 'react', 'sql', 'rust', 'sales', 'support', 'design', 'finance']
+STAGES = ['applied', 'screening', 'interview', 'offer', 'hired', 'rejected']
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get('RECRUITMENT_BENCHMARKS') == '1':
+        return
+    skip = pytest.mark.skip(reason='set RECRUITMENT_BENCHMARKS=1 to run benchmarks')
+    for item in items:
+        if 'benchmarks' in item.nodeid:
+            item.add_marker(skip)
+
+
+def make_positions(hub_id, count=50):
+    return JobPosition.objects.bulk_create([
+        JobPosition(hub_id=hub_id, title=f'Position {i}', department=f'Dept {i % 8}', status='open')
+        for i in range(count)
+    ])
+
+
+def iter_candidates(hub_id, positions, count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield Candidate(
+            hub_id=hub_id,
+            position=rng.choice(positions),
+            name=f'{first} {last} {i}',
+            email=f'{first}.{last}.{i}@example.com'.lower(),
+            phone=f'+346{i:08d}',
+            stage=rng.choice(STAGES),
+            rating=rng.randint(0, 5),
+            resume_notes=' '.join(rng.sample(SKILLS, 3)),
+        )
+
+
+def make_candidates(hub_id, positions, count, seed=0):
+    batch = []
+    for candidate in iter_candidates(hub_id, positions, count, seed):
+        batch.append(candidate)
+        if len(batch) == BATCH_SIZE:
+            Candidate.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Candidate.objects.bulk_create(batch)
+
+
+@pytest.fixture(scope='module')
+def bench_hub(django_db_setup, django_db_blocker):
+    """A hub with BENCH_ROWS candidates, built once per benchmark module."""
+    hub_id = uuid.uuid4()
+    with django_db_blocker.unblock():
+        positions = make_positions(hub_id)
+        make_candidates(hub_id, positions, BENCH_ROWS)
+    yield hub_id
+    with django_db_blocker.unblock():
+        Candidate.all_objects.filter(hub_id=hub_id).delete()
+        JobPosition.all_objects.filter(hub_id=hub_id).delete()
+
+
+def positions_for(count):
+    """Positions per hub grow with the hub, from 10 up to 500."""
+    return min(max(count // 2000, 10), 500)
+
+
+@pytest.fixture(scope='session', params=LOAD_SIZES)
+def sized_hub(request, django_db_setup, django_db_blocker):
+    """``(size label, hub_id)`` of a hub with SIZES[label] candidates and neighbouring tenants."""
+    from recruitment.pipeline import rebuild_pipeline_stats
+
+    count = SIZES[request.param]
+    hub_ids = [uuid.uuid4() for _ in range(TENANTS)]
+    with django_db_blocker.unblock():
+        for index, hub_id in enumerate(hub_ids):
+            hub_count = count if index == 0 else max(count // 10, 100)
+            positions = make_positions(hub_id, count=positions_for(hub_count))
+            make_candidates(hub_id, positions, hub_count, seed=index)
+            rebuild_pipeline_stats(hub_id=hub_id)
+    yield request.param, hub_ids[0]
+    with django_db_blocker.unblock():
+        Candidate.all_objects.filter(hub_id__in=hub_ids).delete()
+        JobPosition.all_objects.filter(hub_id__in=hub_ids).delete()
+
+
+@pytest.fixture(scope='session')
+def baselines():
+    """Stored benchmark baselines, written back at the end when updating."""
+    from .harness import Baselines
+
+    stored = Baselines()
+    yield stored
+    stored.save()
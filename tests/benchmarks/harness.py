@@ -0,0 +1,111 @@
+"""
+Latency, query-count and memory measurement against stored baselines.
+
+``measure`` runs a callable a few times untimed, then RUNS times under
+CaptureQueriesContext for p50/p99 latency and the query count, then once
+more under tracemalloc for peak Python memory.
+
+Baselines live in baselines.json keyed by database vendor, dataset size
+and case. A case fails when its query count grows at all, or when p50,
+p99 or peak memory exceed the baseline by more than the tolerance (plus
+a small absolute slack so sub-millisecond cases don't flap). A baseline
+may hold the query count alone: query counts don't depend on the machine,
+so those are committed for the sqlite 1k cases, while timings and memory
+are only compared where they were recorded. Record or refresh baselines
+on the reference machine with RECRUITMENT_BENCH_UPDATE=1; a case without
+a baseline fails otherwise.
+"""
+import json
+import math
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+RUNS = int(os.environ.get('RECRUITMENT_BENCH_RUNS', 20))
+WARMUP = 2
+TOLERANCE = float(os.environ.get('RECRUITMENT_BENCH_TOLERANCE', 1.3))
+LATENCY_SLACK_MS = 2.0
+MEMORY_SLACK_KB = 256
+UPDATE = os.environ.get('RECRUITMENT_BENCH_UPDATE') == '1'
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values`` (``q`` in 0-100)."""
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(fn, runs=RUNS):
+    """``{'p50_ms', 'p99_ms', 'queries', 'peak_kb'}`` for calling ``fn``."""
+    for _ in range(WARMUP):
+        fn()
+    timings = []
+    queries = 0
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(ctx.captured_queries))
+
+    tracemalloc.start()
+    try:
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'queries': queries,
+        'peak_kb': round(peak / 1024),
+    }
+
+
+def regressions(baseline, metrics):
+    """Human-readable list of the metrics in ``metrics`` worse than ``baseline``."""
+    found = []
+    if metrics['queries'] > baseline['queries']:
+        found.append(f"queries {baseline['queries']} -> {metrics['queries']}")
+    for name, slack in (('p50_ms', LATENCY_SLACK_MS), ('p99_ms', LATENCY_SLACK_MS), ('peak_kb', MEMORY_SLACK_KB)):
+        if name not in baseline:
+            continue
+        limit = baseline[name] * TOLERANCE + slack
+        if metrics[name] > limit:
+            found.append(f'{name} {baseline[name]} -> {metrics[name]} (limit {limit:.1f})')
+    return found
+
+
+class Baselines:
+
+    def __init__(self, path=BASELINES_PATH):
+        self.path = path
+        self.data = json.loads(path.read_text()) if path.exists() else {}
+        self.changed = False
+
+    @staticmethod
+    def key(size, case):
+        return f'{connection.vendor}/{size}/{case}'
+
+    def check(self, size, case, metrics):
+        """Compare (or with RECRUITMENT_BENCH_UPDATE=1, record) ``metrics``; returns regressions."""
+        key = self.key(size, case)
+        print(f'{key}: {metrics}')
+        if UPDATE:
+            self.data[key] = metrics
+            self.changed = True
+            return []
+        baseline = self.data.get(key)
+        if baseline is None:
+            return [f'{key}: no baseline; record one with RECRUITMENT_BENCH_UPDATE=1']
+        return regressions(baseline, metrics)
+
+    def save(self):
+        if self.changed:
+            self.path.write_text(json.dumps(self.data, indent=2, sort_keys=True) + '\n')
@@ -0,0 +1,59 @@
+"""
+Requests per second one ASGI worker sustains, sync versus async views.
+
+Every request goes through the in-process ASGI handler (AsyncClient), the
+way a single uvicorn worker serves it: sync views are handed to the
+worker's one thread-sensitive executor, async views run on the event
+loop. Throughput is printed per view and concurrency level.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+CONCURRENCY = [1, 8, 32]
+REQUESTS = int(os.environ.get('RECRUITMENT_BENCH_CONCURRENT_REQUESTS', 64))
+CASES = {
+    'dashboard': {},
+    'candidates_list': {'q': 'python', 'per_page': 24},
+    'job_positions_list': {'sort': 'candidates', 'dir': 'desc'},
+}
+HTMX_BODY = {'HTTP_HX_REQUEST': 'true', 'HTTP_HX_TARGET': 'datatable-body'}
+
+
+async def _burst(client, url, params, concurrency, total):
+    """``(requests per second, status codes)`` for ``total`` requests, ``concurrency`` at a time."""
+    gate = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def one():
+        async with gate:
+            response = await client.get(url, params, **HTMX_BODY)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start), statuses
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+@pytest.mark.parametrize('name', list(CASES))
+def test_concurrent_throughput(request, auth_client, sized_hub, mode, name):
+    if mode == 'async':
+        request.getfixturevalue('async_list_views')
+    session = auth_client.session
+    session['hub_id'] = str(sized_hub[1])
+    session.save()
+    client = AsyncClient()
+    client.cookies = auth_client.cookies
+    url = reverse(f'recruitment:{name}')
+
+    for concurrency in CONCURRENCY:
+        rps, statuses = async_to_sync(_burst)(client, url, CASES[name], concurrency, REQUESTS)
+        print(f'{sized_hub[0]} {name} {mode} x{concurrency}: {rps:.1f} req/s')
+        assert set(statuses) == {200}
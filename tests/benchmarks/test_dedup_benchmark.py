@@ -0,0 +1,37 @@
+"""Duplicate detection over a large hub."""
+import time
+
+import pytest
+
+from recruitment.dedup import refresh_duplicate_groups
+from recruitment.models import Candidate, DuplicateGroup
+
+from .conftest import BENCH_ROWS
+
+# Planted duplicates: 1% of the hub, each a re-application with the email
+# case and phone format changed and the name reordered.
+PLANTED = max(BENCH_ROWS // 100, 10)
+# Budget for a full scan, scaled from 10 minutes per million candidates.
+BUDGET_SECONDS = 600 * BENCH_ROWS / 1_000_000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dedup_throughput(bench_hub):
+    originals = Candidate.objects.for_hub(bench_hub).order_by('created_at')[:PLANTED]
+    Candidate.objects.bulk_create([
+        Candidate(
+            hub_id=bench_hub, position_id=c.position_id, stage='applied',
+            name=' '.join(reversed(c.name.split())), email=c.email.upper(),
+            phone='00' + c.phone.lstrip('+'),
+        )
+        for c in originals
+    ], batch_size=5000)
+
+    start = time.perf_counter()
+    groups = refresh_duplicate_groups(bench_hub)
+    elapsed = time.perf_counter() - start
+
+    print(f'scanned {BENCH_ROWS + PLANTED} candidates in {elapsed:.1f}s, {groups} groups')
+    assert groups >= PLANTED * 0.95
+    assert elapsed < BUDGET_SECONDS
+    DuplicateGroup.objects.filter(hub_id=bench_hub).delete()
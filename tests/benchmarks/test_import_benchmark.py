@@ -0,0 +1,39 @@
+"""Throughput of the bulk candidate import."""
+import csv
+import os
+import time
+import uuid
+
+import pytest
+
+from recruitment.imports import import_candidates
+from recruitment.models import Candidate, JobPosition
+
+from .conftest import iter_candidates, make_positions
+
+IMPORT_ROWS = int(os.environ.get('RECRUITMENT_BENCH_IMPORT_ROWS', 50_000))
+MIN_ROWS_PER_SECOND = 1000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_throughput(tmp_path):
+    hub_id = uuid.uuid4()
+    positions = make_positions(hub_id, count=20)
+    path = tmp_path / 'candidates.csv'
+    with open(path, 'w', newline='') as fileobj:
+        writer = csv.writer(fileobj)
+        writer.writerow(['name', 'email', 'phone', 'stage', 'rating', 'resume_notes', 'position'])
+        for c in iter_candidates(hub_id, positions, IMPORT_ROWS):
+            writer.writerow([c.name, c.email, c.phone, c.stage, c.rating, c.resume_notes, c.position.title])
+
+    start = time.perf_counter()
+    with open(path, 'rb') as fileobj:
+        result = import_candidates(fileobj, 'candidates.csv', hub_id, batch_size=2000)
+    elapsed = time.perf_counter() - start
+
+    rate = result.created / elapsed
+    print(f'imported {result.created} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)')
+    assert result.created == IMPORT_ROWS
+    assert rate > MIN_ROWS_PER_SECOND
+    Candidate.all_objects.filter(hub_id=hub_id).delete()
+    JobPosition.all_objects.filter(hub_id=hub_id).delete()
@@ -0,0 +1,119 @@
+"""
+Latency, query count and peak memory of the recruitment views and AI
+tools, per dataset size, checked against baselines.json (see harness.py).
+"""
+import itertools
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from recruitment.ai_tools import CandidateStats, ListCandidates, ListJobPositions, PreviewBatch, RankCandidates
+from recruitment.models import JobPosition
+from recruitment.stats import invalidate_pipeline_summary
+
+from .harness import measure
+
+CANDIDATE_SORTS = ['name', 'position', 'rating', 'match_score', 'created_at']
+POSITION_SORTS = ['title', 'candidates', 'hired', 'created_at']
+SEARCHES = ['', 'python']
+PER_PAGE = [12, 96]
+PAGINATE = ['page', 'cursor']
+
+CANDIDATE_LIST_CASES = list(itertools.product(CANDIDATE_SORTS, SEARCHES, PER_PAGE, PAGINATE))
+POSITION_LIST_CASES = list(itertools.product(POSITION_SORTS, SEARCHES, PER_PAGE))
+
+
+@pytest.fixture
+def bench_client(auth_client, sized_hub):
+    session = auth_client.session
+    session['hub_id'] = str(sized_hub[1])
+    session.save()
+    return auth_client
+
+
+def _tool_request(hub_id):
+    request = RequestFactory().get('/')
+    request.session = {'hub_id': str(hub_id)}
+    return request
+
+
+def _check(baselines, sized_hub, case, fn):
+    metrics = measure(fn)
+    found = baselines.check(sized_hub[0], case, metrics)
+    assert not found, f'{case} regressed: ' + '; '.join(found)
+
+
+def _get(client, url, params):
+    response = client.get(url, params, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body')
+    assert response.status_code == 200
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort,q,per_page,paginate', CANDIDATE_LIST_CASES)
+def test_candidates_list(bench_client, sized_hub, baselines, sort, q, per_page, paginate):
+    params = {'sort': sort, 'dir': 'asc', 'q': q, 'per_page': per_page, 'paginate': paginate}
+    url = reverse('recruitment:candidates_list')
+    _check(baselines, sized_hub, f'candidates_list[{sort},{q or "-"},{per_page},{paginate}]',
+           lambda: _get(bench_client, url, params))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort,q,per_page', POSITION_LIST_CASES)
+def test_job_positions_list(bench_client, sized_hub, baselines, sort, q, per_page):
+    params = {'sort': sort, 'dir': 'desc', 'q': q, 'per_page': per_page}
+    url = reverse('recruitment:job_positions_list')
+    _check(baselines, sized_hub, f'job_positions_list[{sort},{q or "-"},{per_page}]',
+           lambda: _get(bench_client, url, params))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('export', ['csv', 'excel'])
+def test_candidates_export(bench_client, sized_hub, baselines, export):
+    if export == 'excel':
+        pytest.importorskip('openpyxl')
+    url = reverse('recruitment:candidates_list')
+    _check(baselines, sized_hub, f'candidates_export[{export}]',
+           lambda: _get(bench_client, url, {'export': export, 'q': 'python'}))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cached', [False, True])
+def test_dashboard(bench_client, sized_hub, baselines, cached):
+    url = reverse('recruitment:dashboard')
+
+    def run():
+        if not cached:
+            invalidate_pipeline_summary(sized_hub[1])
+        _get(bench_client, url, {})
+
+    _check(baselines, sized_hub, f'dashboard[{"cached" if cached else "cold"}]', run)
+
+
+def _tool_cases(hub_id):
+    position_id = str(JobPosition.objects.for_hub(hub_id).values_list('id', flat=True).first())
+    return {
+        'list_candidates': (ListCandidates, {'limit': 50, 'stage': 'interview'}),
+        'list_candidates[summary]': (ListCandidates, {'summary': True}),
+        'list_job_positions': (ListJobPositions, {'limit': 50}),
+        'candidate_stats[stage,position]': (CandidateStats, {'group_by': ['stage', 'position']}),
+        'candidate_stats[week]': (CandidateStats, {'group_by': ['week'], 'position_id': position_id}),
+        'rank_candidates': (RankCandidates, {'position_id': position_id, 'limit': 20}),
+        'preview_batch': (PreviewBatch, {'model': 'candidates', 'where': {'max_rating': 1}}),
+    }
+
+
+@pytest.mark.django_db
+def test_ai_tools(sized_hub, baselines):
+    hub_id = sized_hub[1]
+    request = _tool_request(hub_id)
+    failures = []
+    for case, (tool, args) in _tool_cases(hub_id).items():
+        result = tool().execute(args, request)
+        assert 'error' not in result, (case, result)
+        metrics = measure(lambda: tool().execute(args, request))
+        failures += [f'{case}: {message}' for message in baselines.check(sized_hub[0], f'ai_tools.{case}', metrics)]
+    assert not failures, '; '.join(failures)
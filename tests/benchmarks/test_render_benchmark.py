@@ -0,0 +1,48 @@
+"""Render time of a 96-row datatable page with a cold versus a warm row cache."""
+import pytest
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from recruitment import rowcache
+from recruitment.models import Candidate, JobPosition
+
+from .harness import measure
+
+PAGE = 96
+PAGES = [
+    ('candidates_list', 'candidates', lambda hub_id: Candidate.objects.for_list(hub_id).order_by('name')),
+    ('job_positions_list', 'job_positions', lambda hub_id: JobPosition.objects.for_list(hub_id).order_by('title')),
+]
+
+
+@pytest.fixture
+def local_cache(settings):
+    settings.RECRUITMENT_ROW_CACHE = 'recruitment.rowcache.LocalRowCache'
+    rowcache.backend.cache_clear()
+    yield rowcache.backend()
+    rowcache.backend.cache_clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('template,name,queryset', PAGES, ids=[page[0] for page in PAGES])
+def test_warm_rows_render_faster(local_cache, sized_hub, baselines, template, name, queryset):
+    label, hub_id = sized_hub
+    request = RequestFactory().get('/')
+    request.session = {'hub_id': str(hub_id), 'user_role': 'admin'}
+    rows = list(queryset(hub_id)[:PAGE])
+    context = {name: rows, 'sort_field': 'name', 'sort_dir': 'asc', 'per_page': PAGE}
+
+    def render():
+        render_to_string(f'recruitment/partials/{template}.html', context, request=request)
+
+    def cold():
+        local_cache.clear()
+        render()
+
+    cold_metrics = measure(cold)
+    warm_metrics = measure(render)
+    print(f'{label} {template}: cold {cold_metrics["p50_ms"]} ms, warm {warm_metrics["p50_ms"]} ms')
+    failures = baselines.check(label, f'render.{template}[cold]', cold_metrics)
+    failures += baselines.check(label, f'render.{template}[warm]', warm_metrics)
+    assert warm_metrics['p50_ms'] < cold_metrics['p50_ms']
+    assert not failures, '; '.join(failures)
@@ -0,0 +1,34 @@
+"""Full-text search versus the historical icontains filter."""
+import statistics
+import time
+
+import pytest
+
+from recruitment.models import Candidate
+from recruitment.search import IContainsSearchBackend, get_backend
+
+QUERIES = ['kubernetes', 'perez', 'ana.garcia', '+34600001', 'elena rossi']
+RUNS = 5
+
+
+def _median_ms(backend, hub_id, query):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        qs = backend.search(Candidate.objects.for_list(hub_id), query)
+        list(qs.order_by('-search_rank', 'id')[:24])
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.mark.django_db
+def test_fulltext_beats_icontains(bench_hub):
+    backend = get_backend()
+    if not backend.ranked:
+        pytest.skip('No full-text index on this database')
+    baseline = IContainsSearchBackend()
+    for query in QUERIES:
+        fulltext_ms = _median_ms(backend, bench_hub, query)
+        icontains_ms = _median_ms(baseline, bench_hub, query)
+        print(f'{query!r}: fulltext {fulltext_ms:.1f} ms, icontains {icontains_ms:.1f} ms')
+        assert fulltext_ms < icontains_ms
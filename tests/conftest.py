@@ -80,10 +80,11 @@ def job_position(db, hub_id):
 
 
 @pytest.fixture
-def candidate(db, hub_id):
+def candidate(db, hub_id, job_position):
     """Create a test Candidate."""
     return Candidate.objects.create(
         hub_id=hub_id,
+        position=job_position,
         name='Test Name',
         email='test@example.com',
         phone='+34600000000',
@@ -91,3 +92,42 @@ def candidate(db, hub_id):
         resume_notes='Test description',
     )
 
+
+
+def _reload_urls():
+    import importlib
+    from django.conf import settings
+    from django.urls import clear_url_caches
+    from recruitment import urls
+    importlib.reload(urls)
+    # The root URLconf's include() resolver keeps the patterns it first loaded.
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_list_views(settings):
+    """Route the dashboard and lists to async_views.py."""
+    settings.RECRUITMENT_ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.RECRUITMENT_ASYNC_VIEWS = False
+    _reload_urls()
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Add a 'replica' alias, a test mirror of the default database."""
+    from django.db import connections
+
+    default = connections.settings['default']
+    connections.settings['replica'] = {**default, 'TEST': {**default['TEST'], 'MIRROR': 'default'}}
+
+
+@pytest.fixture
+def replica(settings):
+    """Route recruitment reads to the 'replica' alias. Tests querying it list it in their databases."""
+    settings.DATABASE_ROUTERS = ['recruitment.routers.RecruitmentRouter']
+    settings.MIDDLEWARE = [*settings.MIDDLEWARE, 'recruitment.routers.ReplicaPinMiddleware']
+    settings.RECRUITMENT_REPLICA_DB = 'replica'
+    return 'replica'
@@ -0,0 +1,230 @@
+"""Tests for the recruitment AI assistant tools."""
+import json
+import uuid
+
+import pytest
+from django.test import RequestFactory
+
+from recruitment.ai_tools import (
+    MAX_PAGE_SIZE, CandidateStats, CreateCandidate, CreateCandidatesBatch, DeleteApplication,
+    DeleteCandidatesBatch, DeleteJobPosting, DeleteJobPostingsBatch, ListCandidates, ListJobPositions,
+    PreviewBatch, UpdateCandidatesBatch, UpdateJobPostingsBatch,
+)
+from recruitment.models import Candidate, JobPosition
+from recruitment.pipeline import check_pipeline_stats, rebuild_pipeline_stats
+
+HUBS = 5
+ROWS_PER_HUB = 120
+
+
+def _request(hub_id):
+    request = RequestFactory().get('/')
+    request.session = {'hub_id': str(hub_id)}
+    return request
+
+
+@pytest.fixture
+def hubs(db):
+    hub_ids = [uuid.uuid4() for _ in range(HUBS)]
+    for hub_id in hub_ids:
+        positions = JobPosition.objects.bulk_create([
+            JobPosition(hub_id=hub_id, title=f'Position {i}', status='open' if i % 2 else 'draft')
+            for i in range(3)
+        ])
+        Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=positions[i % 3], name=f'Candidate {i:03d}', stage='screening')
+            for i in range(ROWS_PER_HUB)
+        ])
+    rebuild_pipeline_stats()
+    return hub_ids
+
+
+@pytest.mark.django_db
+class TestListTools:
+    """Hub isolation and bounded responses."""
+
+    def test_candidates_isolated_and_bounded(self, hubs):
+        """Test every page is capped and only holds the session hub's rows."""
+        hub_id = hubs[0]
+        own = set(str(pk) for pk in Candidate.objects.filter(hub_id=hub_id).values_list('id', flat=True))
+        seen, cursor = [], None
+        while True:
+            result = ListCandidates().execute({'limit': 10_000, 'cursor': cursor}, _request(hub_id))
+            assert len(result['candidates']) <= MAX_PAGE_SIZE
+            assert len(json.dumps(result)) < MAX_PAGE_SIZE * 400
+            seen += [row['id'] for row in result['candidates']]
+            cursor = result['next_cursor']
+            if not cursor:
+                break
+        assert len(seen) == len(set(seen)) == ROWS_PER_HUB
+        assert set(seen) == own
+
+    def test_soft_deleted_hidden(self, hubs):
+        """Test soft-deleted rows are not listed."""
+        Candidate.objects.filter(hub_id=hubs[1], name='Candidate 000').update(is_deleted=True)
+        result = ListCandidates().execute({'summary': True}, _request(hubs[1]))
+        assert result['total'] == ROWS_PER_HUB - 1
+
+    def test_positions_summary(self, hubs):
+        """Test summary mode returns counts only."""
+        result = ListJobPositions().execute({'summary': True}, _request(hubs[2]))
+        assert result == {'total': 3, 'by_status': {'open': 1, 'draft': 2}}
+
+    def test_positions_page(self, hubs):
+        """Test positions are projected to plain values."""
+        result = ListJobPositions().execute({}, _request(hubs[2]))
+        assert [p['title'] for p in result['positions']] == ['Position 0', 'Position 1', 'Position 2']
+        assert result['next_cursor'] is None
+        json.dumps(result)
+
+    def test_no_hub(self, hubs):
+        """Test tools refuse to run without an active hub."""
+        request = RequestFactory().get('/')
+        request.session = {}
+        assert 'error' in ListCandidates().execute({}, request)
+
+
+@pytest.mark.django_db
+class TestCandidateStats:
+    """Aggregations computed in SQL."""
+
+    def test_grouped_counts(self, hubs, django_assert_num_queries):
+        """Test counts and averages per position and stage in two queries."""
+        hub_id = hubs[0]
+        Candidate.objects.filter(hub_id=hub_id, name__in=['Candidate 000', 'Candidate 003']).update(
+            stage='interview', rating=4,
+        )
+        with django_assert_num_queries(2):
+            result = CandidateStats().execute({'group_by': ['position', 'stage']}, _request(hub_id))
+        assert result['total'] == ROWS_PER_HUB
+        interview = [g for g in result['groups'] if g['stage'] == 'interview']
+        assert interview == [{
+            'position_id': interview[0]['position_id'], 'position': 'Position 0',
+            'stage': 'interview', 'count': 2, 'avg_rating': 4.0,
+        }]
+        assert not result['truncated']
+
+    def test_filters_and_weeks(self, hubs):
+        """Test filters narrow the counts and weeks bucket by creation date."""
+        position = JobPosition.objects.get(hub_id=hubs[0], title='Position 1')
+        result = CandidateStats().execute(
+            {'position_id': str(position.pk), 'group_by': ['week']}, _request(hubs[0]),
+        )
+        assert result['total'] == ROWS_PER_HUB // 3
+        assert sum(g['count'] for g in result['groups']) == result['total']
+        json.dumps(result)
+
+    def test_bad_date(self, hubs):
+        """Test invalid dates are reported."""
+        assert 'error' in CandidateStats().execute({'since': 'yesterday'}, _request(hubs[0]))
+
+
+@pytest.mark.django_db
+class TestWriteTools:
+    """Writes stay inside the session hub."""
+
+    def test_create_candidate_rejects_foreign_position(self, hubs):
+        """Test candidates cannot be attached to another hub's position."""
+        foreign = JobPosition.objects.filter(hub_id=hubs[1]).first()
+        result = CreateCandidate().execute({'position_id': str(foreign.pk), 'name': 'X'}, _request(hubs[0]))
+        assert 'error' in result
+
+    def test_delete_foreign_candidate(self, hubs):
+        """Test another hub's candidate is not found."""
+        foreign = Candidate.objects.filter(hub_id=hubs[1]).first()
+        result = DeleteApplication().execute({'candidate_id': str(foreign.pk)}, _request(hubs[0]))
+        assert 'error' in result
+        assert Candidate.objects.filter(pk=foreign.pk).exists()
+
+    def test_delete_position_is_soft(self, hubs):
+        """Test deleting a position keeps the row and its candidates."""
+        position = JobPosition.objects.filter(hub_id=hubs[0]).first()
+        result = DeleteJobPosting().execute({'position_id': str(position.pk)}, _request(hubs[0]))
+        assert result['deleted'] is True
+        assert JobPosition.all_objects.get(pk=position.pk).is_deleted is True
+        assert Candidate.all_objects.filter(position_id=position.pk).count() == ROWS_PER_HUB // 3
+
+
+@pytest.mark.django_db
+class TestBatchTools:
+    """Batch mutations: preview, one transaction, set-based updates."""
+
+    def test_preview_then_reject(self, hubs, django_assert_max_num_queries):
+        """Test rejecting a filtered selection after previewing it."""
+        hub_id = hubs[0]
+        position = JobPosition.objects.get(hub_id=hub_id, title='Position 0')
+        Candidate.objects.filter(hub_id=hub_id, position=position, name__lt='Candidate 030').update(rating=1)
+        where = {'position_id': str(position.pk), 'min_rating': 1, 'max_rating': 1}
+        preview = PreviewBatch().execute({'model': 'candidates', 'where': where}, _request(hub_id))
+        assert preview['count'] == 10
+        assert len(preview['sample']) == 10
+
+        with django_assert_max_num_queries(10):
+            result = UpdateCandidatesBatch().execute(
+                {'where': where, 'stage': 'rejected', 'expected_count': preview['count']}, _request(hub_id),
+            )
+        assert result == {'count': 10, 'moved': 10, 'skipped': 0}
+        assert Candidate.objects.filter(hub_id=hub_id, stage='rejected').count() == 10
+        assert check_pipeline_stats(hub_id) == []
+
+    def test_expected_count_guard(self, hubs):
+        """Test a stale preview aborts without changes."""
+        where = {'stage': 'screening'}
+        result = DeleteCandidatesBatch().execute({'where': where, 'expected_count': 3}, _request(hubs[0]))
+        assert 'error' in result
+        assert Candidate.objects.filter(hub_id=hubs[0]).count() == ROWS_PER_HUB
+
+    def test_empty_selection_refused(self, hubs):
+        """Test batches need ids or a filter."""
+        assert 'error' in DeleteCandidatesBatch().execute({'where': {}}, _request(hubs[0]))
+
+    def test_malformed_ids_refused(self, hubs):
+        """Test a malformed id is named in the error instead of failing the query."""
+        own = str(Candidate.objects.filter(hub_id=hubs[0]).values_list('id', flat=True).first())
+        for model in ('candidates', 'job_positions'):
+            result = PreviewBatch().execute({'model': model, 'where': {'ids': [own, 'x']}}, _request(hubs[0]))
+            assert result == {'error': 'Invalid id: x'}
+        result = DeleteCandidatesBatch().execute({'where': {'position_id': 'x'}}, _request(hubs[0]))
+        assert result == {'error': 'Invalid position_id: x'}
+        assert Candidate.objects.filter(hub_id=hubs[0]).count() == ROWS_PER_HUB
+
+    def test_delete_batch_is_soft_and_scoped(self, hubs):
+        """Test batch deletes soft-delete only the session hub's rows."""
+        foreign = Candidate.objects.filter(hub_id=hubs[1]).first()
+        own = list(Candidate.objects.filter(hub_id=hubs[0]).values_list('id', flat=True)[:5])
+        ids = [str(pk) for pk in own] + [str(foreign.pk)]
+        result = DeleteCandidatesBatch().execute({'where': {'ids': ids}}, _request(hubs[0]))
+        assert result == {'deleted': 5}
+        assert Candidate.all_objects.filter(id__in=own, is_deleted=True).count() == 5
+        assert Candidate.objects.filter(pk=foreign.pk).exists()
+        assert check_pipeline_stats(hubs[0]) == []
+
+    def test_positions_batch(self, hubs):
+        """Test positions are updated and deleted in bulk."""
+        result = UpdateJobPostingsBatch().execute(
+            {'where': {'status': 'draft'}, 'status': 'open'}, _request(hubs[0]),
+        )
+        assert result == {'updated': 2}
+        result = DeleteJobPostingsBatch().execute({'where': {'status': 'open'}}, _request(hubs[0]))
+        assert result == {'deleted': 3}
+        assert not JobPosition.objects.filter(hub_id=hubs[0]).exists()
+
+    def test_positions_batch_unknown_status(self, hubs):
+        """Test an unknown status is refused like an unknown stage."""
+        result = UpdateJobPostingsBatch().execute(
+            {'where': {'status': 'draft'}, 'status': 'archived'}, _request(hubs[0]),
+        )
+        assert result == {'error': "Unknown status 'archived'"}
+        assert JobPosition.objects.filter(hub_id=hubs[0], status='draft').count() == 2
+
+    def test_create_batch(self, hubs):
+        """Test several candidates are created with one call."""
+        position = JobPosition.objects.filter(hub_id=hubs[0]).first()
+        rows = [
+            {'position_id': str(position.pk), 'name': 'New A', 'email': 'a@example.com'},
+            {'position_id': str(position.pk), 'name': 'New B', 'email': 'a@example.com'},
+            {'position_id': str(uuid.uuid4()), 'name': 'New C'},
+        ]
+        result = CreateCandidatesBatch().execute({'candidates': rows}, _request(hubs[0]))
+        assert (result['created'], result['duplicates'], result['failed']) == (1, 1, 1)
+        assert result['errors'][0]['row'] == 3
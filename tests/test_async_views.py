@@ -0,0 +1,74 @@
+"""Tests for the async dashboard and list views."""
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.urls import resolve, reverse
+
+from recruitment.models import Candidate, JobPosition
+
+HTMX_BODY = {'HTTP_HX_REQUEST': 'true', 'HTTP_HX_TARGET': 'datatable-body'}
+
+
+@pytest.fixture
+def pool(hub_id):
+    positions = [
+        JobPosition.objects.create(hub_id=hub_id, title=f'Position {i}', status='open', vacancies=2)
+        for i in range(3)
+    ]
+    for i in range(30):
+        Candidate.objects.create(
+            hub_id=hub_id, position=positions[i % 3], name=f'Candidate {i:02}',
+            email=f'c{i}@test.com', stage='applied', rating=i % 5,
+        )
+    return positions
+
+
+def _get(client, name, params=None, **headers):
+    response = client.get(reverse(f'recruitment:{name}'), params or {}, **headers)
+    assert response.status_code == 200
+    return response
+
+
+async def _collect(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """The async views answer exactly like the sync ones."""
+
+    def test_routed_when_enabled(self, async_list_views):
+        """Test the setting switches the dashboard and lists to coroutines."""
+        for name in ('dashboard', 'job_positions_list', 'candidates_list'):
+            view = resolve(reverse(f'recruitment:{name}')).func
+            assert iscoroutinefunction(view)
+            assert view.__name__ == name
+
+    @pytest.mark.parametrize('name,params', [
+        ('candidates_list', {'sort': 'rating', 'dir': 'desc', 'per_page': 12, 'page': 2}),
+        ('candidates_list', {'q': 'Candidate 1', 'per_page': 0}),
+        ('candidates_list', {'paginate': 'cursor', 'per_page': 12}),
+        ('job_positions_list', {'sort': 'candidates', 'dir': 'desc'}),
+    ])
+    def test_lists_match_sync(self, request, auth_client, pool, name, params):
+        """Test the datatable fragments are identical to the sync views'."""
+        expected = _get(auth_client, name, params, **HTMX_BODY).content
+        request.getfixturevalue('async_list_views')
+        assert _get(auth_client, name, params, **HTMX_BODY).content == expected
+
+    def test_dashboard(self, auth_client, pool, async_list_views):
+        """Test the dashboard renders the pipeline summary."""
+        response = _get(auth_client, 'dashboard')
+        assert 'Position 0' in response.content.decode()
+
+    def test_csv_export_streams(self, auth_client, pool, async_list_views):
+        """Test the CSV export is an async stream with every row."""
+        response = _get(auth_client, 'candidates_list', {'export': 'csv'})
+        assert response.is_async
+        lines = async_to_sync(_collect)(response).decode().splitlines()
+        assert lines[0].startswith('Name,JobPosition')
+        assert len(lines) == 31
+
+    def test_login_required(self, client, async_list_views):
+        """Test anonymous requests are redirected before any query."""
+        response = client.get(reverse('recruitment:candidates_list'))
+        assert response.status_code == 302
@@ -0,0 +1,238 @@
+"""Tests for candidate attachments: chunked uploads, blob storage, downloads and GC."""
+import hashlib
+import io
+import os
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+from django.urls import reverse
+from django.utils import timezone
+
+from recruitment import attachments
+from recruitment.models import AttachmentBlob, AttachmentUpload, Candidate, CandidateAttachment, JobPosition
+
+CONTENT = bytes(range(256)) * 40  # 10 KiB
+CHUNK = 4096
+
+
+@pytest.fixture(autouse=True)
+def attachment_root(settings, tmp_path):
+    settings.RECRUITMENT_ATTACHMENT_ROOT = str(tmp_path)
+    settings.RECRUITMENT_ATTACHMENT_CHUNK_SIZE = CHUNK
+    return tmp_path
+
+
+@pytest.fixture
+def applicants(db, hub_id):
+    """One person applying to two positions."""
+    return [
+        Candidate.objects.create(
+            hub_id=hub_id, name='Ada', email='ada@test.com',
+            position=JobPosition.objects.create(hub_id=hub_id, title=title),
+        )
+        for title in ('Backend', 'Frontend')
+    ]
+
+
+def _upload(candidate, content=CONTENT, filename='resume.pdf'):
+    upload = attachments.start_upload(candidate, filename, len(content), 'application/pdf')
+    stream = io.BytesIO(content)
+    for offset in range(0, len(content), CHUNK):
+        attachments.write_chunk(upload, offset, stream, min(CHUNK, len(content) - offset))
+    return attachments.finish_upload(upload)
+
+
+def _blob_files(root):
+    return [name for _dir, _dirs, names in os.walk(root / 'blobs') for name in names]
+
+
+@pytest.mark.django_db
+class TestUploads:
+    """Chunked, resumable uploads into content-addressed blobs."""
+
+    def test_same_content_stored_once(self, applicants, attachment_root):
+        """Test the same file attached for two positions shares one blob."""
+        first, second = (_upload(candidate) for candidate in applicants)
+        sha256 = hashlib.sha256(CONTENT).hexdigest()
+        assert first.blob_id == second.blob_id == sha256
+        assert AttachmentBlob.objects.get().refcount == 2
+        assert _blob_files(attachment_root) == [sha256]
+        assert not os.listdir(attachment_root / 'uploads')
+
+    def test_resume_after_wrong_offset(self, auth_client, applicants):
+        """Test a chunk for the wrong offset is refused with the offset to resume from."""
+        response = auth_client.post(
+            reverse('recruitment:candidate_attachment_upload', args=[applicants[0].pk]),
+            {'filename': 'resume.pdf', 'size': len(CONTENT), 'content_type': 'application/pdf'},
+        )
+        assert response.status_code == 201
+        state = response.json()
+
+        def send(offset):
+            return auth_client.post(
+                state['url'], CONTENT[offset:offset + CHUNK],
+                content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+            )
+
+        assert send(0).json()['offset'] == CHUNK
+        response = send(2 * CHUNK)
+        assert response.status_code == 409
+        assert response.json()['offset'] == CHUNK
+        assert auth_client.get(state['url']).json()['offset'] == CHUNK
+
+        send(CHUNK)
+        response = send(2 * CHUNK)
+        assert response.status_code == 201
+        assert response.json()['attachment']['filename'] == 'resume.pdf'
+        assert not AttachmentUpload.objects.exists()
+
+    def test_limits(self, applicants, settings):
+        """Test files over the size limit and chunks past the end are refused."""
+        settings.RECRUITMENT_ATTACHMENT_MAX_SIZE = 1000
+        with pytest.raises(attachments.UploadError):
+            attachments.start_upload(applicants[0], 'big.pdf', 1001)
+        upload = attachments.start_upload(applicants[0], 'small.pdf', 10)
+        with pytest.raises(attachments.UploadError):
+            attachments.write_chunk(upload, 0, io.BytesIO(b'x' * 11), 11)
+
+
+@pytest.mark.django_db
+class TestDownloads:
+    """Streamed downloads with range requests."""
+
+    @pytest.fixture
+    def url(self, applicants):
+        return reverse('recruitment:candidate_attachment_download', args=[_upload(applicants[0]).pk])
+
+    def _body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self, auth_client, url):
+        """Test a plain GET streams everything and advertises ranges."""
+        response = auth_client.get(url)
+        assert response.status_code == 200
+        assert response['Accept-Ranges'] == 'bytes'
+        assert 'resume.pdf' in response['Content-Disposition']
+        assert self._body(response) == CONTENT
+
+    @pytest.mark.parametrize('header,start,end', [
+        ('bytes=10-19', 10, 19),
+        ('bytes=10000-', 10000, len(CONTENT) - 1),
+        ('bytes=-5', len(CONTENT) - 5, len(CONTENT) - 1),
+        ('bytes=100-999999', 100, len(CONTENT) - 1),
+    ])
+    def test_ranges(self, auth_client, url, header, start, end):
+        """Test single ranges answer 206 with the requested bytes."""
+        response = auth_client.get(url, HTTP_RANGE=header)
+        assert response.status_code == 206
+        assert response['Content-Range'] == f'bytes {start}-{end}/{len(CONTENT)}'
+        assert self._body(response) == CONTENT[start:end + 1]
+
+    def test_unsatisfiable(self, auth_client, url):
+        """Test a range past the end answers 416."""
+        response = auth_client.get(url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        assert response.status_code == 416
+        assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+    def test_if_range_mismatch(self, auth_client, url):
+        """Test a stale If-Range gets the whole file."""
+        response = auth_client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        assert response.status_code == 200
+        assert self._body(response) == CONTENT
+
+
+@pytest.mark.django_db
+class TestGarbageCollection:
+    """Reference counts and the GC command."""
+
+    def test_blob_kept_until_unreferenced(self, applicants, attachment_root):
+        """Test a blob goes only once its last attachment is purged and the grace period passed."""
+        first, second = (_upload(candidate) for candidate in applicants)
+        first.delete()
+        assert AttachmentBlob.objects.get().refcount == 1
+        assert attachments.collect_garbage(grace_seconds=0)['blobs'] == 0
+
+        second.delete()
+        assert attachments.collect_garbage(grace_seconds=3600)['blobs'] == 0
+        call_command('gc_attachment_blobs', grace_seconds=0)
+        assert not AttachmentBlob.objects.exists()
+        assert _blob_files(attachment_root) == []
+
+    def test_reused_before_collection(self, applicants, attachment_root):
+        """Test an orphan picked up again by a new upload survives the GC."""
+        _upload(applicants[0]).delete()
+        _upload(applicants[1])
+        attachments.collect_garbage(grace_seconds=0)
+        assert AttachmentBlob.objects.get().refcount == 1
+        assert len(_blob_files(attachment_root)) == 1
+
+    def test_tombstones_purged_after_retention(self, applicants):
+        """Test soft-deleted attachments keep their blob until the retention window passes."""
+        attachment = _upload(applicants[0])
+        CandidateAttachment.all_objects.filter(pk=attachment.pk).update(
+            is_deleted=True, deleted_at=timezone.now() - timedelta(days=365),
+        )
+        counts = attachments.collect_garbage(grace_seconds=0)
+        assert counts['attachments'] == 1
+        assert AttachmentBlob.objects.get().refcount == 0
+
+    def test_stray_files_and_abandoned_uploads(self, applicants, attachment_root, settings):
+        """Test blob files without a row and expired uploads are removed."""
+        settings.RECRUITMENT_ATTACHMENT_UPLOAD_EXPIRY = 0
+        stray = attachment_root / 'blobs' / 'ab' / 'cd' / ('abcd' + '0' * 60)
+        stray.parent.mkdir(parents=True)
+        stray.write_bytes(b'left over')
+        old = (timezone.now() - timedelta(hours=2)).timestamp()
+        os.utime(stray, (old, old))
+        upload = attachments.start_upload(applicants[0], 'resume.pdf', 100)
+        AttachmentUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now() - timedelta(days=2))
+
+        counts = attachments.collect_garbage()
+        assert counts['files'] == 1
+        assert counts['uploads'] == 1
+        assert not stray.exists()
+        assert not os.listdir(attachment_root / 'uploads')
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentUploads:
+    """Uploads of one file finishing at the same time."""
+
+    def test_same_file_in_parallel(self, applicants, attachment_root):
+        """Test parallel uploads of one file end with one blob counting every attachment."""
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            pytest.skip('in-memory SQLite does not take writes from several connections')
+        workers = 6
+        candidates = [applicants[i % 2] for i in range(workers)]
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def upload(candidate):
+            try:
+                pending = attachments.start_upload(candidate, 'resume.pdf', len(CONTENT))
+                attachments.write_chunk(pending, 0, io.BytesIO(CONTENT), CHUNK)
+                attachments.write_chunk(pending, CHUNK, io.BytesIO(CONTENT[CHUNK:]), CHUNK)
+                attachments.write_chunk(pending, 2 * CHUNK, io.BytesIO(CONTENT[2 * CHUNK:]), len(CONTENT) - 2 * CHUNK)
+                barrier.wait()
+                attachments.finish_upload(pending)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=upload, args=(candidate,)) for candidate in candidates]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        blob = AttachmentBlob.objects.get()
+        assert blob.refcount == CandidateAttachment.objects.count() == workers
+        path = attachments.storage().path(attachments.blob_name(blob.sha256))
+        with open(path, 'rb') as file:
+            assert hashlib.sha256(file.read()).hexdigest() == blob.sha256
+        assert not os.listdir(attachment_root / 'uploads')
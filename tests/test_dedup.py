@@ -0,0 +1,119 @@
+"""Tests for candidate de-duplication."""
+import pytest
+from django.urls import reverse
+
+from recruitment.dedup import (
+    DuplicateFinder, normalise_email, normalise_name, normalise_phone, refresh_duplicate_groups,
+)
+from recruitment.models import Candidate, DuplicateGroup, JobPosition
+from recruitment.pipeline import check_pipeline_stats
+
+
+class TestNormalisation:
+    """Key normalisation."""
+
+    @pytest.mark.parametrize('raw,expected', [
+        ('Ana.Garcia+jobs@GMail.com ', 'anagarcia@gmail.com'),
+        ('ana@googlemail.com', 'ana@gmail.com'),
+        ('ana.garcia@example.com', 'ana.garcia@example.com'),
+        ('not-an-email', ''),
+    ])
+    def test_email(self, raw, expected):
+        """Test emails are folded to one canonical form."""
+        assert normalise_email(raw) == expected
+
+    @pytest.mark.parametrize('raw,calling_code,expected', [
+        ('+34 600 12 34 56', None, '+34600123456'),
+        ('0034-600-123-456', None, '+34600123456'),
+        ('600 123 456', '34', '+34600123456'),
+        ('(600) 123-456', None, '600123456'),
+        ('123', '34', ''),
+    ])
+    def test_phone(self, raw, calling_code, expected):
+        """Test phones are normalised to E.164 when the country is known."""
+        assert normalise_phone(raw, calling_code) == expected
+
+    def test_name(self):
+        """Test names ignore accents, case, punctuation and order."""
+        assert normalise_name('García, Ana') == normalise_name('ana garcia')
+
+
+@pytest.mark.django_db
+class TestDuplicateFinder:
+    """Blocking and scoring."""
+
+    @pytest.fixture
+    def people(self, hub_id):
+        backend = JobPosition.objects.create(hub_id=hub_id, title='Backend')
+        frontend = JobPosition.objects.create(hub_id=hub_id, title='Frontend')
+        rows = [
+            (backend, 'Ana García', 'ana.garcia@gmail.com', '+34 600 123 456'),
+            (frontend, 'Garcia Ana', 'AnaGarcia+cv@gmail.com', ''),
+            (frontend, 'Anna García', '', '0034600123456'),
+            (backend, 'Bob Smith', 'family@example.com', ''),
+            (frontend, 'Carla Smith', 'family@example.com', ''),
+            (backend, 'David Kim', 'david@example.com', '+1 555 000 0000'),
+        ]
+        return [
+            Candidate.objects.create(hub_id=hub_id, position=p, name=n, email=e, phone=ph)
+            for p, n, e, ph in rows
+        ]
+
+    def test_groups(self, hub_id, people):
+        """Test the same person is grouped across positions and shared emails alone are not enough."""
+        groups = DuplicateFinder(hub_id).run()
+        assert len(groups) == 1
+        score, ids = groups[0]
+        assert set(ids) == {c.pk for c in people[:3]}
+        assert 0.7 <= score <= 1.0
+
+    def test_other_hubs_ignored(self, hub_id, people):
+        """Test blocking never crosses hubs."""
+        other = JobPosition.objects.create(hub_id='00000000-0000-0000-0000-000000000001', title='X')
+        Candidate.objects.create(hub_id=other.hub_id, position=other, name='Ana Garcia', email='ana.garcia@gmail.com')
+        assert len(DuplicateFinder(hub_id).run()[0][1]) == 3
+
+    def test_refresh_keeps_dismissed(self, hub_id, people):
+        """Test dismissed groups are not raised again."""
+        assert refresh_duplicate_groups(hub_id) == 1
+        DuplicateGroup.objects.filter(hub_id=hub_id).update(status='dismissed')
+        assert refresh_duplicate_groups(hub_id) == 0
+
+
+@pytest.mark.django_db
+class TestDuplicateViews:
+    """Merge review screen."""
+
+    @pytest.fixture
+    def group(self, hub_id, job_position):
+        first = Candidate.objects.create(hub_id=hub_id, position=job_position, name='Ana Garcia', email='ana@example.com', rating=2, resume_notes='Python')
+        second = Candidate.objects.create(hub_id=hub_id, position=job_position, name='Ana García', email='ANA@example.com', phone='+34600123456', rating=4, resume_notes='Django')
+        refresh_duplicate_groups(hub_id)
+        return DuplicateGroup.objects.get(hub_id=hub_id), first, second
+
+    def test_screen_lists_groups(self, auth_client, group):
+        """Test the review screen shows the group members."""
+        response = auth_client.get(reverse('recruitment:candidates_duplicates'))
+        assert response.status_code == 200
+        assert 'García' in response.content.decode()
+
+    def test_merge(self, auth_client, hub_id, group):
+        """Test merging keeps the chosen row and folds the others into it."""
+        duplicate_group, first, second = group
+        url = reverse('recruitment:candidates_duplicate_action', args=[duplicate_group.pk])
+        response = auth_client.post(url, {'action': 'merge', 'primary': str(first.pk)})
+        assert response.status_code == 200
+        first.refresh_from_db()
+        assert (first.phone, first.rating) == ('+34600123456', 4)
+        assert 'Django' in first.resume_notes
+        assert not Candidate.objects.filter(pk=second.pk).exists()
+        assert not DuplicateGroup.objects.filter(pk=duplicate_group.pk).exists()
+        assert check_pipeline_stats(hub_id) == []
+
+    def test_dismiss(self, auth_client, group):
+        """Test dismissing marks the group."""
+        duplicate_group = group[0]
+        url = reverse('recruitment:candidates_duplicate_action', args=[duplicate_group.pk])
+        auth_client.post(url, {'action': 'dismiss'})
+        duplicate_group.refresh_from_db()
+        assert duplicate_group.status == 'dismissed'
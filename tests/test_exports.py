@@ -0,0 +1,73 @@
+"""Tests for recruitment streaming exports."""
+import csv
+import io
+import tracemalloc
+
+import pytest
+from django.urls import reverse
+
+from recruitment.exports import stream_csv, stream_excel
+from recruitment.models import Candidate
+
+HEADERS = ['Name', 'JobPosition', 'Stage', 'Rating', 'Email', 'Phone']
+
+
+def _rows(count):
+    for i in range(count):
+        yield (f'Candidate {i}', 'Backend Engineer', 'screening', i % 6, f'c{i}@example.com', f'+346{i:08d}')
+
+
+def _peak_bytes(stream, count):
+    # Warm up so lazily imported writer modules are not counted.
+    for _chunk in stream(_rows(1), HEADERS, 'export').streaming_content:
+        pass
+    tracemalloc.start()
+    try:
+        response = stream(_rows(count), HEADERS, 'export')
+        # Exhausting the stream is enough; response.close() would send
+        # request_finished, which touches the database.
+        for _chunk in response.streaming_content:
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestStreamingMemory:
+    """Export memory must not grow with row count."""
+
+    def test_csv_memory_flat(self):
+        """Test CSV peak memory is independent of row count."""
+        small = _peak_bytes(stream_csv, 2_000)
+        large = _peak_bytes(stream_csv, 50_000)
+        assert large < small * 1.5
+
+    def test_excel_memory_flat(self):
+        """Test Excel peak memory is independent of row count."""
+        pytest.importorskip('openpyxl')
+        small = _peak_bytes(stream_excel, 2_000)
+        large = _peak_bytes(stream_excel, 50_000)
+        assert large < small * 1.5
+
+    def test_csv_content(self):
+        """Test CSV output has the header and one line per row."""
+        response = stream_csv(_rows(3), HEADERS, 'candidates.csv')
+        content = b''.join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in response.streaming_content)
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        assert rows[0] == HEADERS
+        assert len(rows) == 4
+        assert 'attachment; filename="candidates.csv"' == response['Content-Disposition']
+
+
+@pytest.mark.django_db
+class TestExportViews:
+    """Export view tests."""
+
+    def test_candidate_export_streams_position_title(self, auth_client, hub_id, job_position):
+        """Test candidate CSV export streams and resolves the position title."""
+        Candidate.objects.create(hub_id=hub_id, position=job_position, name='Ana', stage='interview')
+        response = auth_client.get(reverse('recruitment:candidates_list'), {'export': 'csv'})
+        assert response.status_code == 200
+        assert response.streaming
+        content = b''.join(response.streaming_content).decode()
+        assert 'Ana,Test Title,interview' in content
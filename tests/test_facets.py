@@ -0,0 +1,118 @@
+"""Tests for the candidates list filters and facet counts."""
+import pytest
+from django.http import QueryDict
+from django.urls import reverse
+
+from recruitment import facets
+from recruitment.models import Candidate, JobPosition
+
+HTMX_BODY = {'HTTP_HX_REQUEST': 'true', 'HTTP_HX_TARGET': 'datatable-body'}
+
+
+@pytest.fixture
+def pool(hub_id):
+    """Two engineering positions and one sales position, four candidates each."""
+    positions = [
+        JobPosition.objects.create(hub_id=hub_id, title='Backend', department='Engineering'),
+        JobPosition.objects.create(hub_id=hub_id, title='Frontend', department='Engineering'),
+        JobPosition.objects.create(hub_id=hub_id, title='Account Manager', department='Sales'),
+    ]
+    for p, position in enumerate(positions):
+        for i, stage in enumerate(['applied', 'applied', 'interview', 'offer']):
+            Candidate.objects.create(
+                hub_id=hub_id, position=position, name=f'Candidate {p}{i}',
+                email=f'c{p}{i}@test.com', stage=stage, rating=i + 1,
+            )
+    return positions
+
+
+def _options(group):
+    return {option['label']: option['count'] for option in group}
+
+
+class TestParseFilters:
+    """Test query string parsing."""
+
+    def test_repeated_values(self):
+        """Test repeated parameters become lists and bad values are dropped."""
+        params = QueryDict(
+            'stages=applied&stages=bogus&positions=not-a-uuid&departments=Sales'
+            '&min_rating=2&max_rating=x'
+        )
+        filters = facets.parse_filters(params)
+        assert filters['stages'] == ['applied']
+        assert filters['positions'] == []
+        assert filters['departments'] == ['Sales']
+        assert filters['min_rating'] == 2
+        assert filters['max_rating'] is None
+        assert facets.is_filtered(filters)
+
+    def test_empty(self):
+        """Test no parameters means no filters."""
+        assert not facets.is_filtered(facets.parse_filters(QueryDict()))
+
+
+@pytest.mark.django_db
+class TestFacetCounts:
+    """Test counts are grouped in one query and skip their own filter."""
+
+    def test_unfiltered(self, hub_id, pool, django_assert_num_queries):
+        """Test every option counts the whole list, in two queries."""
+        qs = Candidate.objects.for_list(hub_id)
+        with django_assert_num_queries(2):
+            counts = facets.facet_counts(qs, facets.parse_filters(QueryDict()))
+        assert _options(counts['positions']) == {'Account Manager': 4, 'Backend': 4, 'Frontend': 4}
+        assert _options(counts['departments']) == {'Engineering': 8, 'Sales': 4}
+        assert _options(counts['stages'])['Applied'] == 6
+        assert [option['value'] for option in counts['rating']] == [1, 2, 3, 4]
+
+    def test_own_filter_skipped(self, hub_id, pool):
+        """Test a facet ignores its own selection but honours the others."""
+        filters = facets.parse_filters(QueryDict('departments=Sales&stages=applied'))
+        counts = facets.facet_counts(Candidate.objects.for_list(hub_id), filters)
+        assert _options(counts['departments']) == {'Engineering': 4, 'Sales': 2}
+        assert _options(counts['stages'])['Applied'] == 2
+        assert _options(counts['stages'])['Interview'] == 1
+        assert _options(counts['positions']) == {'Account Manager': 2, 'Backend': 0, 'Frontend': 0}
+        assert [o['value'] for o in counts['departments'] if o['selected']] == ['Sales']
+
+    def test_apply_filters(self, hub_id, pool):
+        """Test values within a filter are OR-ed and filters AND-ed."""
+        filters = facets.parse_filters(QueryDict(
+            f'positions={pool[0].id}&positions={pool[2].id}&min_rating=3'
+        ))
+        qs = facets.apply_filters(Candidate.objects.for_list(hub_id), filters)
+        assert qs.count() == 4
+        assert set(qs.values_list('rating', flat=True)) == {3, 4}
+
+
+@pytest.mark.django_db
+class TestCandidatesListFacets:
+    """Test the faceted list view."""
+
+    def test_filtered_fragment(self, auth_client, pool):
+        """Test filters narrow the rows and the facet bar shows counts."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'),
+            {'departments': 'Sales', 'stages': 'offer'}, **HTMX_BODY,
+        )
+        assert response.status_code == 200
+        assert [c.name for c in response.context['candidates']] == ['Candidate 23']
+        assert response.context['filtered']
+        assert 'datatable-facets' in response.content.decode()
+
+    def test_export_respects_filters(self, auth_client, pool):
+        """Test the CSV export holds the filtered rows only."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'), {'export': 'csv', 'stages': 'interview'},
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 4
+
+    def test_sort_by_position_title(self, auth_client, pool):
+        """Test sorting by position orders by its title."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'), {'sort': 'position', 'per_page': 0}, **HTMX_BODY,
+        )
+        titles = [c.position.title for c in response.context['candidates']]
+        assert titles == sorted(titles)
@@ -0,0 +1,147 @@
+"""Tests for stage history and funnel metrics."""
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from recruitment.funnel import DAY, DURATION_BUCKETS, HOUR, bucket_index, hub_funnel, quantile, rollup_stage_metrics
+from recruitment.imports import import_candidates
+from recruitment.models import Candidate, CandidateStageEvent, JobPosition, PositionStageMetrics
+from recruitment.pipeline import move_candidates
+from recruitment.stats import compute_pipeline_summary
+
+
+@pytest.fixture
+def position(hub_id):
+    return JobPosition.objects.create(hub_id=hub_id, title='Backend')
+
+
+def _events(candidate):
+    return list(
+        CandidateStageEvent.objects.filter(candidate=candidate).order_by('id').values_list('from_stage', 'to_stage')
+    )
+
+
+class TestHistogram:
+    """Time-in-stage histogram helpers."""
+
+    def test_bucket_index(self):
+        """Test durations land in the first bucket whose bound covers them."""
+        assert bucket_index(0) == 0
+        assert bucket_index(HOUR) == 0
+        assert bucket_index(HOUR + 1) == 1
+        assert bucket_index(10 ** 9) == len(DURATION_BUCKETS) - 1
+
+    def test_quantile(self):
+        """Test quantiles interpolate within the bucket and handle empty histograms."""
+        histogram = [0] * len(DURATION_BUCKETS)
+        assert quantile(histogram, 0.5) is None
+        histogram[bucket_index(2 * DAY)] = 10
+        median = quantile(histogram, 0.5)
+        assert DAY < median <= 2 * DAY
+        assert quantile(histogram, 0.9) > median
+
+
+@pytest.mark.django_db
+class TestStageEvents:
+    """Events written on every path that changes a stage."""
+
+    def test_single_save(self, hub_id, position):
+        """Test create and stage changes through save() are logged with time in stage."""
+        candidate = Candidate.objects.create(hub_id=hub_id, position=position, name='Ana')
+        Candidate.objects.filter(pk=candidate.pk).update(stage_changed_at=timezone.now() - timedelta(days=3))
+        candidate.refresh_from_db()
+        candidate.stage = 'screening'
+        candidate.save()
+        candidate.rating = 4
+        candidate.save()
+
+        assert _events(candidate) == [('', 'applied'), ('applied', 'screening')]
+        event = CandidateStageEvent.objects.get(candidate=candidate, from_stage='applied')
+        assert 3 * DAY - 60 <= event.seconds_in_stage <= 3 * DAY + 60
+        candidate.refresh_from_db()
+        assert timezone.now() - candidate.stage_changed_at < timedelta(minutes=1)
+
+    def test_bulk_move_constant_queries(self, hub_id, position):
+        """Test bulk moves log one event per changed row in a constant number of queries."""
+        def run(count):
+            pool = Candidate.objects.bulk_create([
+                Candidate(hub_id=hub_id, position=position, name=f'C{i}', stage='screening') for i in range(count)
+            ])
+            with CaptureQueriesContext(connection) as ctx:
+                move_candidates(Candidate.objects.filter(pk__in=[c.pk for c in pool]), 'advance')
+            return pool, len(ctx.captured_queries)
+
+        _small, small_queries = run(2)
+        large, large_queries = run(100)
+        assert small_queries == large_queries
+        assert CandidateStageEvent.objects.filter(
+            candidate__in=large, from_stage='screening', to_stage='interview',
+        ).count() == 100
+
+    def test_import(self, hub_id, position):
+        """Test imported candidates get their initial event."""
+        data = 'name,email,stage\nAna,ana@example.com,interview\nBen,ben@example.com,\n'
+        import_candidates(io.BytesIO(data.encode()), 'people.csv', hub_id, default_position=position.pk)
+        assert sorted(CandidateStageEvent.objects.filter(hub_id=hub_id).values_list('to_stage', flat=True)) == [
+            'applied', 'interview',
+        ]
+
+
+@pytest.mark.django_db
+class TestRollup:
+    """Incremental rollup into PositionStageMetrics."""
+
+    def _event(self, candidate, from_stage, to_stage, days):
+        return CandidateStageEvent.objects.create(
+            hub_id=candidate.hub_id, candidate=candidate, position_id=candidate.position_id,
+            from_stage=from_stage, to_stage=to_stage, seconds_in_stage=int(days * DAY),
+            created_at=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_rollup_is_incremental(self, hub_id, position):
+        """Test each event is folded in exactly once and the funnel reads the summary."""
+        candidates = Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=position, name=f'C{i}') for i in range(10)
+        ])
+        for i, candidate in enumerate(candidates):
+            self._event(candidate, '', 'applied', 0)
+            self._event(candidate, 'applied', 'screening' if i < 6 else 'rejected', i + 1)
+
+        assert rollup_stage_metrics(settle=0) == 20
+        assert rollup_stage_metrics(settle=0) == 0
+        applied = PositionStageMetrics.objects.get(position=position, stage='applied')
+        assert applied.entered == 10
+        assert applied.exits == {'screening': 6, 'rejected': 4}
+        assert sum(applied.histogram) == 10
+        assert 4 * DAY <= applied.median_seconds <= 7 * DAY
+
+        self._event(candidates[0], 'screening', 'interview', 2)
+        assert rollup_stage_metrics(settle=0) == 1
+        assert PositionStageMetrics.objects.get(position=position, stage='screening').exits == {'interview': 1}
+
+        funnel = {row['stage']: row for row in hub_funnel(hub_id)}
+        assert funnel['applied']['conversion'] == 60.0
+        assert funnel['screening']['advanced'] == 1
+        assert funnel['hired']['conversion'] is None
+        with CaptureQueriesContext(connection) as ctx:
+            compute_pipeline_summary(hub_id)
+        assert not any('candidatestageevent' in q['sql'] for q in ctx.captured_queries)
+
+    def test_unsettled_events_wait(self, hub_id, position):
+        """Test events younger than the settle window are left for the next run."""
+        candidate = Candidate.objects.create(hub_id=hub_id, position=position, name='Ana')
+        assert rollup_stage_metrics(settle=3600) == 0
+        assert rollup_stage_metrics(settle=0) == CandidateStageEvent.objects.filter(candidate=candidate).count()
+
+    def test_rebuild_command(self, hub_id, position):
+        """Test --rebuild recomputes the same metrics from the whole log."""
+        Candidate.objects.create(hub_id=hub_id, position=position, name='Ana')
+        rollup_stage_metrics(settle=0)
+        before = list(PositionStageMetrics.objects.values_list('stage', 'entered'))
+        call_command('rollup_stage_metrics', '--rebuild', '--settle=0', stdout=io.StringIO())
+        assert list(PositionStageMetrics.objects.values_list('stage', 'entered')) == before
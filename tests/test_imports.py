@@ -0,0 +1,109 @@
+"""Tests for the bulk candidate import."""
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from recruitment.imports import CandidateImporter, import_candidates, iter_csv_rows
+from recruitment.models import Candidate, PositionPipelineStats
+
+HEADER = 'Name,Email,Phone,Stage,Rating,Position\n'
+
+
+def _csv(*lines):
+    return io.BytesIO((HEADER + ''.join(line + '\n' for line in lines)).encode())
+
+
+@pytest.mark.django_db
+class TestCandidateImporter:
+    """Importer behaviour."""
+
+    def test_imports_and_resolves_positions(self, hub_id, job_position):
+        """Test rows are created against positions by title or id."""
+        result = import_candidates(_csv(
+            'Ana,ana@example.com,+34600,interview,4,Test Title',
+            f'Bob,bob@example.com,,,,{job_position.pk}',
+        ), 'file.csv', hub_id)
+        assert (result.created, result.failed, result.duplicates) == (2, 0, 0)
+        bob = Candidate.objects.get(hub_id=hub_id, name='Bob')
+        assert (bob.position_id, bob.stage, bob.rating) == (job_position.pk, 'applied', 0)
+
+    def test_reports_row_errors(self, hub_id, job_position):
+        """Test invalid rows are reported with their line number."""
+        result = import_candidates(_csv(
+            'Ana,not-an-email,,,,Test Title',
+            'Bob,bob@example.com,,unknown,,Test Title',
+            'Carla,carla@example.com,,,,Missing Position',
+            ',nobody@example.com,,,,Test Title',
+        ), 'file.csv', hub_id)
+        assert result.created == 0
+        assert [row for row, _message in result.errors] == [2, 3, 4, 5]
+        assert 'email' in result.errors[0][1]
+        assert 'position' in result.errors[2][1]
+
+    def test_deduplicates_by_email(self, hub_id, job_position):
+        """Test duplicates within the file and the hub are skipped."""
+        Candidate.objects.create(hub_id=hub_id, position=job_position, name='Ana', email='Ana@Example.com')
+        result = import_candidates(_csv(
+            'Ana again,ana@example.com,,,,Test Title',
+            'Bob,bob@example.com,,,,Test Title',
+            'Bob twice,BOB@example.com,,,,Test Title',
+        ), 'file.csv', hub_id)
+        assert (result.created, result.duplicates) == (1, 2)
+
+    def test_batches_and_counters(self, hub_id, job_position, django_assert_max_num_queries):
+        """Test rows are written in batches and the pipeline counters follow."""
+        lines = [f'C{i},c{i}@example.com,,screening,,Test Title' for i in range(10)]
+        importer = CandidateImporter(hub_id, batch_size=4)
+        # Per batch: duplicate lookup, INSERT, counter UPDATE and stage
+        # events INSERT (+ savepoint), then the ranking index: term vectors,
+        # corpus statistics and rescoring (13, savepoints included). The
+        # hub has no similarity index yet, so updating it costs nothing.
+        with django_assert_max_num_queries(3 * (6 + 13) + 2):
+            result = importer.run(iter_csv_rows(_csv(*lines)))
+        assert result.created == 10
+        stats = PositionPipelineStats.objects.get(position=job_position)
+        assert (stats.total, stats.screening) == (10, 10)
+
+    def test_dry_run_writes_nothing(self, hub_id, job_position):
+        """Test dry runs validate without inserting."""
+        result = import_candidates(_csv('Ana,ana@example.com,,,,Test Title'), 'file.csv', hub_id, dry_run=True)
+        assert result.created == 1
+        assert not Candidate.objects.filter(hub_id=hub_id).exists()
+
+    def test_xlsx(self, hub_id, job_position):
+        """Test Excel files are read row by row."""
+        openpyxl = pytest.importorskip('openpyxl')
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['Name', 'Email', 'Position'])
+        workbook.active.append(['Ana', 'ana@example.com', 'Test Title'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        assert import_candidates(buffer, 'file.xlsx', hub_id).created == 1
+
+
+@pytest.mark.django_db
+class TestImportEntryPoints:
+    """View and management command."""
+
+    def test_view_upload(self, auth_client, hub_id, job_position):
+        """Test uploading a file through the import view."""
+        upload = SimpleUploadedFile('candidates.csv', _csv('Ana,ana@example.com,,,,').getvalue(), content_type='text/csv')
+        response = auth_client.post(reverse('recruitment:candidates_import'), {'file': upload, 'position': str(job_position.pk)})
+        assert response.status_code == 200
+        assert Candidate.objects.filter(hub_id=hub_id, name='Ana', position=job_position).exists()
+
+    def test_view_loads(self, auth_client):
+        """Test the import form loads."""
+        response = auth_client.get(reverse('recruitment:candidates_import'))
+        assert response.status_code == 200
+
+    def test_command(self, hub_id, job_position, tmp_path):
+        """Test the management command imports a file from disk."""
+        path = tmp_path / 'candidates.csv'
+        path.write_bytes(_csv('Ana,ana@example.com,,,,Test Title').getvalue())
+        call_command('import_candidates', str(path), hub_id=str(hub_id))
+        assert Candidate.objects.filter(hub_id=hub_id, name='Ana').exists()
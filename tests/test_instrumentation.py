@@ -0,0 +1,127 @@
+"""Tests for view and tool instrumentation."""
+import logging
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from recruitment import instrumentation
+from recruitment.ai_tools import ListCandidates
+from recruitment.instrumentation import Histogram, PrometheusSink, RingBufferSink, get_sink
+
+SINKS = [
+    'recruitment.instrumentation.RingBufferSink',
+    'recruitment.instrumentation.PrometheusSink',
+    'recruitment.instrumentation.LogSink',
+]
+
+
+@pytest.fixture(autouse=True)
+def configured(settings):
+    settings.RECRUITMENT_INSTRUMENTATION_SINKS = SINKS
+    settings.RECRUITMENT_INSTRUMENTATION_SAMPLE_RATE = 1
+    settings.RECRUITMENT_METRICS_TOKEN = 'secret'
+    instrumentation.sinks.cache_clear()
+    yield
+    instrumentation.sinks.cache_clear()
+
+
+def _calls(endpoint):
+    return [call for call in get_sink(RingBufferSink).calls if call.endpoint == endpoint]
+
+
+class TestHistogram:
+    """Prometheus text output."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative and end with +Inf, sum and count."""
+        histogram = Histogram('t_seconds', 'Test.', (0.1, 1))
+        labels = (('endpoint', 'x'),)
+        for value in (0.05, 0.5, 5):
+            histogram.observe(labels, value)
+        lines = list(histogram.lines())
+        assert 't_seconds_bucket{endpoint="x",le="0.1"} 1' in lines
+        assert 't_seconds_bucket{endpoint="x",le="1"} 2' in lines
+        assert 't_seconds_bucket{endpoint="x",le="+Inf"} 3' in lines
+        assert 't_seconds_count{endpoint="x"} 3' in lines
+
+
+@pytest.mark.django_db
+class TestInstrumentedCalls:
+    """Recording views and tools."""
+
+    def test_view_call_recorded(self, auth_client, hub_id, candidate):
+        """Test a list view records time, queries and render time tagged by hub."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'), HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body',
+        )
+        assert response.status_code == 200
+        call, = _calls('candidates_list')
+        assert call.kind == 'view'
+        assert call.hub_id == str(hub_id)
+        assert call.status == '200'
+        assert call.queries > 0
+        assert 0 < call.db_seconds <= call.seconds
+        assert 0 < call.render_seconds <= call.seconds
+
+    def test_async_view_queries_recorded(self, auth_client, hub_id, candidate, async_list_views):
+        """Test an async view counts the queries its sync_to_async workers run."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'), HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body',
+        )
+        assert response.status_code == 200
+        call, = _calls('candidates_list')
+        assert call.hub_id == str(hub_id)
+        assert call.queries > 0
+        assert 0 < call.db_seconds <= call.seconds
+
+    def test_tool_call_recorded(self, hub_id, candidate):
+        """Test tool calls are recorded under the tool name."""
+        request = RequestFactory().get('/')
+        request.session = {'hub_id': str(hub_id)}
+        ListCandidates().execute({'limit': 5}, request)
+        call, = _calls('list_candidates')
+        assert (call.kind, call.status) == ('tool', 'ok')
+        assert call.queries > 0
+
+    def test_sampling(self, settings, auth_client):
+        """Test a zero sample rate records nothing."""
+        settings.RECRUITMENT_INSTRUMENTATION_SAMPLE_RATE = 0
+        auth_client.get(reverse('recruitment:dashboard'))
+        assert not _calls('dashboard')
+
+    def test_log_sink(self, auth_client, caplog):
+        """Test the log sink writes one line per call."""
+        with caplog.at_level(logging.INFO, logger='recruitment.instrumentation'):
+            auth_client.get(reverse('recruitment:dashboard'))
+        assert any('endpoint=dashboard' in message for message in caplog.messages)
+
+
+@pytest.mark.django_db
+class TestInstrumentationSurfaces:
+    """Settings page summary and Prometheus endpoint."""
+
+    def test_settings_summary(self, auth_client):
+        """Test the settings page lists the hub's recorded endpoints."""
+        auth_client.get(reverse('recruitment:dashboard'))
+        response = auth_client.get(reverse('recruitment:settings'))
+        assert response.status_code == 200
+        assert 'Endpoint Performance' in response.content.decode()
+        summary = get_sink(RingBufferSink).summary()
+        assert {row['endpoint'] for row in summary} >= {'dashboard'}
+
+    def test_metrics_requires_token(self, client, auth_client):
+        """Test the metrics endpoint serves histograms only with the bearer token."""
+        auth_client.get(reverse('recruitment:dashboard'))
+        url = reverse('recruitment:metrics')
+        assert client.get(url).status_code == 404
+        response = client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
+        assert 'recruitment_call_seconds_bucket{kind="view",endpoint="dashboard"' in response.content.decode()
+
+    def test_metrics_without_prometheus_sink(self, settings, client):
+        """Test the endpoint is hidden when the Prometheus sink is not configured."""
+        settings.RECRUITMENT_INSTRUMENTATION_SINKS = SINKS[:1]
+        instrumentation.sinks.cache_clear()
+        assert get_sink(PrometheusSink) is None
+        assert client.get(reverse('recruitment:metrics'), HTTP_AUTHORIZATION='Bearer secret').status_code == 404
@@ -1,8 +1,15 @@
 """Tests for recruitment models."""
+from datetime import timedelta
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
 from django.utils import timezone
 
 from recruitment.models import JobPosition, Candidate
+from recruitment.pipeline import check_pipeline_stats, rebuild_position
+from recruitment.retention import purge_deleted
 
 
 @pytest.mark.django_db
@@ -75,3 +82,101 @@ class TestCandidate:
         assert Candidate.objects.filter(hub_id=hub_id).count() == 0
 
 
+
+@pytest.mark.django_db
+class TestListIndexes:
+    """Each datatable sort key is served by a tenant index."""
+
+    JOB_POSITION_INDEXES = {
+        'title': 'rec_pos_hub_title_idx',
+        'status': 'rec_pos_hub_status_idx',
+        'is_active': 'rec_pos_hub_active_idx',
+        'vacancies': 'rec_pos_hub_vacancies_idx',
+        'department': 'rec_pos_hub_dept_idx',
+        'created_at': 'rec_pos_hub_created_idx',
+    }
+    CANDIDATE_INDEXES = {
+        'name': 'rec_cand_hub_name_idx',
+        'stage': 'rec_cand_hub_stage_idx',
+        'rating': 'rec_cand_hub_rating_idx',
+        'email': 'rec_cand_hub_email_idx',
+        'phone': 'rec_cand_hub_phone_idx',
+        'created_at': 'rec_cand_hub_created_idx',
+    }
+
+    @staticmethod
+    def _plan(qs):
+        if connection.vendor == 'postgresql':
+            # The test tables are tiny; make the planner show index choice.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            pytest.skip('Index plans are only checked on PostgreSQL and SQLite')
+        return qs.explain()
+
+    @pytest.mark.parametrize('sort_field', sorted(JOB_POSITION_INDEXES))
+    def test_job_position_sort_uses_index(self, hub_id, sort_field):
+        """Test JobPosition list sort uses its composite index."""
+        qs = JobPosition.objects.for_hub(hub_id).order_by(sort_field)
+        assert self.JOB_POSITION_INDEXES[sort_field] in self._plan(qs)
+
+    @pytest.mark.parametrize('sort_field', sorted(CANDIDATE_INDEXES))
+    def test_candidate_sort_uses_index(self, hub_id, sort_field):
+        """Test Candidate list sort uses its composite index."""
+        qs = Candidate.objects.for_list(hub_id).order_by(sort_field)
+        assert self.CANDIDATE_INDEXES[sort_field] in self._plan(qs)
+
+    def test_candidate_position_stage_uses_index(self, hub_id, job_position):
+        """Test per-position stage filtering uses the pipeline index."""
+        qs = Candidate.objects.for_hub(hub_id).filter(position=job_position, stage='interview')
+        assert 'rec_cand_hub_facet_idx' in self._plan(qs)
+
+
+@pytest.mark.django_db
+class TestSoftDeleteCascade:
+    """Soft-delete managers, cascade and purge."""
+
+    def test_all_objects(self, candidate):
+        """Test the explicit manager still sees tombstones."""
+        Candidate.objects.filter(pk=candidate.pk).soft_delete()
+        assert not Candidate.objects.filter(pk=candidate.pk).exists()
+        assert Candidate.all_objects.get(pk=candidate.pk).deleted_at is not None
+
+    def test_position_cascades_in_one_update(self, hub_id, job_position, django_assert_max_num_queries):
+        """Test soft-deleting a position soft-deletes its candidates with one UPDATE."""
+        Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=job_position, name=f'C{i}') for i in range(50)
+        ])
+        # bulk_create skips the signals that keep the counters.
+        rebuild_position(job_position.pk)
+        # Position ids, counter recount + UPDATE, candidate UPDATE, position UPDATE (+ one savepoint).
+        with django_assert_max_num_queries(7):
+            assert JobPosition.objects.filter(pk=job_position.pk).soft_delete() == 1
+        assert not Candidate.objects.filter(position=job_position).exists()
+        assert Candidate.all_objects.filter(position=job_position, is_deleted=True).count() == 50
+        assert check_pipeline_stats(hub_id) == []
+
+    def test_delete_view_cascades(self, auth_client, hub_id, job_position):
+        """Test the delete view hides the position's candidates from the list."""
+        Candidate.objects.create(hub_id=hub_id, position=job_position, name='Orphan')
+        auth_client.post(reverse('recruitment:job_position_delete', args=[job_position.pk]))
+        response = auth_client.get(reverse('recruitment:candidates_list'))
+        assert b'Orphan' not in response.content
+
+    def test_purge(self, hub_id, job_position):
+        """Test tombstones past retention are purged in batches, newer ones kept."""
+        Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=job_position, name=f'C{i}') for i in range(7)
+        ])
+        JobPosition.objects.filter(pk=job_position.pk).soft_delete()
+        recent = JobPosition.objects.create(hub_id=hub_id, title='Recent')
+        JobPosition.objects.filter(pk=recent.pk).soft_delete()
+        old = timezone.now() - timedelta(days=400)
+        JobPosition.all_objects.filter(pk=job_position.pk).update(deleted_at=old)
+        Candidate.all_objects.filter(position=job_position).update(deleted_at=old)
+
+        assert purge_deleted(days=90, dry_run=True) == {'candidates': 7, 'positions': 0}
+        call_command('purge_deleted', days=90, batch_size=3)
+        assert not Candidate.all_objects.filter(position_id=job_position.pk).exists()
+        assert not JobPosition.all_objects.filter(pk=job_position.pk).exists()
+        assert JobPosition.all_objects.filter(pk=recent.pk).exists()
@@ -0,0 +1,191 @@
+"""Tests for the per-position pipeline counters."""
+import math
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recruitment.models import JobPosition, Candidate, CandidateStageEvent, PositionPipelineStats
+from recruitment.pipeline import check_pipeline_stats, rebuild_pipeline_stats, stage_targets
+
+
+def _stats(position):
+    return PositionPipelineStats.objects.get(position=position)
+
+
+@pytest.fixture
+def positions(hub_id):
+    return (
+        JobPosition.objects.create(hub_id=hub_id, title='Backend'),
+        JobPosition.objects.create(hub_id=hub_id, title='Frontend'),
+    )
+
+
+@pytest.mark.django_db
+class TestPipelineCounters:
+    """Incremental counter maintenance."""
+
+    def test_created_with_position(self, positions):
+        """Test a stats row exists for new positions."""
+        assert _stats(positions[0]).total == 0
+
+    def test_candidate_create(self, hub_id, positions):
+        """Test creating candidates increments their stage."""
+        Candidate.objects.create(hub_id=hub_id, position=positions[0], name='A')
+        Candidate.objects.create(hub_id=hub_id, position=positions[0], name='B', stage='interview')
+        stats = _stats(positions[0])
+        assert (stats.total, stats.applied, stats.interview) == (2, 1, 1)
+
+    def test_stage_change_and_move(self, hub_id, positions):
+        """Test stage changes and position moves shift counts."""
+        candidate = Candidate.objects.create(hub_id=hub_id, position=positions[0], name='A')
+        candidate = Candidate.objects.get(pk=candidate.pk)
+        candidate.stage = 'offer'
+        candidate.save()
+        assert (_stats(positions[0]).applied, _stats(positions[0]).offer) == (0, 1)
+        candidate.position = positions[1]
+        candidate.save()
+        assert _stats(positions[0]).total == 0
+        assert (_stats(positions[1]).total, _stats(positions[1]).offer) == (1, 1)
+
+    def test_soft_and_hard_delete(self, hub_id, positions):
+        """Test soft and hard deletes decrement once."""
+        first = Candidate.objects.create(hub_id=hub_id, position=positions[0], name='A')
+        second = Candidate.objects.create(hub_id=hub_id, position=positions[0], name='B')
+        first.is_deleted = True
+        first.save()
+        first.save()
+        second.delete()
+        assert _stats(positions[0]).total == 0
+
+    def test_delete_view(self, auth_client, hub_id, positions):
+        """Test the single delete view keeps counters in sync."""
+        candidate = Candidate.objects.create(hub_id=hub_id, position=positions[0], name='A')
+        auth_client.post(reverse('recruitment:candidate_delete', args=[candidate.pk]))
+        assert _stats(positions[0]).total == 0
+
+    def test_bulk_delete_view(self, auth_client, hub_id, positions):
+        """Test bulk deletes decrement per position and stage."""
+        created = [
+            Candidate.objects.create(hub_id=hub_id, position=position, name=name, stage=stage)
+            for position, name, stage in [
+                (positions[0], 'A', 'applied'), (positions[0], 'B', 'hired'), (positions[1], 'C', 'applied'),
+            ]
+        ]
+        ids = ','.join(str(c.pk) for c in created[1:])
+        auth_client.post(reverse('recruitment:candidates_bulk_action'), {'ids': ids, 'action': 'delete'})
+        assert (_stats(positions[0]).total, _stats(positions[0]).hired) == (1, 0)
+        assert _stats(positions[1]).total == 0
+        assert check_pipeline_stats(hub_id) == []
+
+
+@pytest.mark.django_db
+class TestStageTransitions:
+    """Bulk stage moves."""
+
+    @pytest.fixture
+    def pool(self, hub_id, positions):
+        return [
+            Candidate.objects.create(hub_id=hub_id, position=position, name=f'{stage} {position.title}', stage=stage)
+            for position in positions
+            for stage in ('applied', 'screening', 'offer', 'hired', 'rejected')
+        ]
+
+    def _post(self, client, pool, **data):
+        ids = ','.join(str(c.pk) for c in pool)
+        return client.post(reverse('recruitment:candidates_bulk_action'), {'ids': ids, **data})
+
+    def test_stage_targets(self):
+        """Test transition tables honour the allowed moves."""
+        assert stage_targets('advance')['offer'] == 'hired'
+        assert 'hired' not in stage_targets('advance')
+        assert set(stage_targets('reject')) == {'applied', 'screening', 'interview', 'offer'}
+        assert stage_targets('set_stage', 'applied') == {'screening': 'applied', 'rejected': 'applied'}
+        with pytest.raises(ValueError):
+            stage_targets('set_stage', 'bogus')
+
+    def test_advance(self, auth_client, hub_id, pool):
+        """Test advance moves each row one stage and skips final stages."""
+        response = self._post(auth_client, pool, action='advance')
+        assert response.status_code == 200
+        stages = sorted(Candidate.objects.filter(hub_id=hub_id).values_list('stage', flat=True))
+        assert stages == sorted(['screening', 'interview', 'hired', 'hired', 'rejected'] * 2)
+        assert check_pipeline_stats(hub_id) == []
+
+    def test_reject_and_set_stage(self, auth_client, hub_id, pool, positions):
+        """Test reject and set_stage only touch allowed rows."""
+        self._post(auth_client, pool, action='reject')
+        assert _stats(positions[0]).rejected == 4
+        self._post(auth_client, pool, action='set_stage', stage='screening')
+        assert (_stats(positions[0]).screening, _stats(positions[0]).hired) == (4, 1)
+        assert check_pipeline_stats(hub_id) == []
+
+    def test_invalid_stage(self, auth_client, pool):
+        """Test unknown stages are rejected."""
+        response = self._post(auth_client, pool, action='set_stage', stage='bogus')
+        assert response.status_code == 400
+
+    def test_constant_queries_and_changed_rows_only(self, auth_client, hub_id, positions):
+        """Test the move costs the same for 2 rows as for 200, bar event batches, and returns only changed rows."""
+        def run(count):
+            pool = Candidate.objects.bulk_create([
+                Candidate(hub_id=hub_id, position=positions[i % 2], name=f'C{i}', stage='screening')
+                for i in range(count)
+            ])
+            ids = ','.join(str(c.pk) for c in pool)
+            with CaptureQueriesContext(connection) as ctx:
+                response = auth_client.post(
+                    reverse('recruitment:candidates_bulk_action'), {'ids': ids, 'action': 'advance'},
+                )
+            return response, [query['sql'] for query in ctx.captured_queries]
+
+        def counts(queries):
+            events = sum(sql.startswith('INSERT INTO "recruitment_candidatestageevent"') for sql in queries)
+            return len(queries) - events, events
+
+        small, small_queries = run(2)
+        large, large_queries = run(200)
+        # Only the stage events grow, by however many bulk insert batches the backend needs.
+        fields = [field for field in CandidateStageEvent._meta.concrete_fields if not field.primary_key]
+        batches = math.ceil(200 / (connection.ops.bulk_batch_size(fields, [None] * 200) or 200))
+        assert counts(small_queries) == (counts(large_queries)[0], 1)
+        assert counts(large_queries)[1] == batches
+        assert small.content.count(b'hx-swap-oob') == 2
+        assert large.content.count(b'hx-swap-oob') == 200
+
+
+@pytest.mark.django_db
+class TestPipelineMaintenance:
+    """Rebuild and consistency check."""
+
+    def test_check_detects_and_rebuild_fixes(self, hub_id, positions):
+        """Test drift is reported and repaired."""
+        Candidate.objects.create(hub_id=hub_id, position=positions[0], name='A')
+        PositionPipelineStats.objects.filter(position=positions[0]).update(total=7)
+        assert [row[0] for row in check_pipeline_stats(hub_id)] == [positions[0].pk]
+        assert rebuild_pipeline_stats(hub_id) == 2
+        assert check_pipeline_stats(hub_id) == []
+        assert _stats(positions[0]).total == 1
+
+    def test_commands(self, hub_id, positions):
+        """Test the management commands run."""
+        PositionPipelineStats.objects.filter(position=positions[0]).update(total=3)
+        call_command('check_pipeline_stats', hub_id=str(hub_id), fix=True)
+        call_command('rebuild_pipeline_stats', hub_id=str(hub_id))
+        call_command('check_pipeline_stats', hub_id=str(hub_id))
+
+
+@pytest.mark.django_db
+class TestPositionsListCounters:
+    """Positions list shows and sorts by counters."""
+
+    def test_sort_by_candidates(self, auth_client, hub_id, positions):
+        """Test sorting by applicant count joins the counters."""
+        Candidate.objects.create(hub_id=hub_id, position=positions[1], name='A')
+        url = reverse('recruitment:job_positions_list')
+        response = auth_client.get(url, {'sort': 'candidates', 'dir': 'desc'}, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body')
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert content.index('Frontend') < content.index('Backend')
@@ -0,0 +1,137 @@
+"""Tests for the candidate ranking engine."""
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recruitment.ai_tools import RankCandidates
+from recruitment.models import Candidate, CandidateTermVector, JobPosition, RankingCorpus, RankingTerm
+from recruitment.ranking import Corpus, index_candidates, rebuild_ranking, term_vector, tokenize, top_candidates
+
+NOTES = {
+    'Ana': 'Senior Python developer, Django and PostgreSQL in production for six years.',
+    'Ben': 'Frontend engineer: React, TypeScript, some Python scripting.',
+    'Cai': 'Warehouse supervisor with forklift licence.',
+}
+
+
+@pytest.fixture
+def position(hub_id):
+    return JobPosition.objects.create(
+        hub_id=hub_id, title='Backend developer', description='Python and Django backend, PostgreSQL.',
+    )
+
+
+@pytest.fixture
+def pool(hub_id, position):
+    return {
+        name: Candidate.objects.create(hub_id=hub_id, position=position, name=name, resume_notes=notes)
+        for name, notes in NOTES.items()
+    }
+
+
+def _df(hub_id, term):
+    return RankingTerm.objects.filter(hub_id=hub_id, term=term).values_list('df', flat=True).first()
+
+
+class TestTokenize:
+    """Tokenisation and term vectors."""
+
+    def test_tokenize(self):
+        """Test lowercasing, stopwords and single characters are dropped."""
+        assert tokenize('The Python and C developer, 10 years') == ['python', 'developer', '10', 'years']
+
+    def test_term_vector(self):
+        """Test term frequencies and document length."""
+        assert term_vector('python Python django') == ({'python': 2, 'django': 1}, 3)
+
+
+@pytest.mark.django_db
+class TestRanking:
+    """Incremental index maintenance and scoring."""
+
+    def test_scores_follow_relevance(self, hub_id, position, pool):
+        """Test candidates are ranked by how well their notes match the position."""
+        for candidate in pool.values():
+            candidate.refresh_from_db()
+        assert pool['Ana'].match_score > pool['Ben'].match_score > pool['Cai'].match_score == 0
+        assert [c.name for c in top_candidates(hub_id, position.pk, limit=2)] == ['Ana', 'Ben']
+
+    def test_incremental_statistics(self, hub_id, pool):
+        """Test note edits adjust document frequencies and the corpus instead of rebuilding."""
+        corpus = RankingCorpus.objects.get(hub_id=hub_id)
+        assert corpus.documents == 3
+        assert _df(hub_id, 'python') == 2
+
+        cai = Candidate.objects.get(pk=pool['Cai'].pk)
+        cai.resume_notes = 'Python automation for warehouse robots.'
+        cai.save()
+        assert _df(hub_id, 'python') == 3
+        assert _df(hub_id, 'forklift') == 0
+        assert RankingCorpus.objects.get(hub_id=hub_id).documents == 3
+        cai.refresh_from_db()
+        assert cai.match_score > 0
+
+        cai.rating = 5
+        with CaptureQueriesContext(connection) as ctx:
+            cai.save()
+        assert not any('candidatetermvector' in q['sql'] for q in ctx.captured_queries)
+
+    def test_position_text_change_rescores(self, hub_id, position, pool):
+        """Test editing the position description rescores only its candidates."""
+        position = JobPosition.objects.get(pk=position.pk)
+        position.title = 'Warehouse supervisor'
+        position.description = 'Forklift licence required.'
+        position.save()
+        assert [c.name for c in top_candidates(hub_id, position.pk, limit=1)] == ['Cai']
+
+    def test_bulk_index_is_constant_queries(self, hub_id, position):
+        """Test indexing 200 candidates costs the same queries as 2."""
+        def run(count):
+            pool = Candidate.objects.bulk_create([
+                Candidate(hub_id=hub_id, position=position, name=f'C{i}', resume_notes='python backend')
+                for i in range(count)
+            ])
+            with CaptureQueriesContext(connection) as ctx:
+                index_candidates(pool)
+            return len(ctx.captured_queries)
+
+        assert run(2) == run(200)
+
+    def test_rebuild_matches_incremental(self, hub_id, position, pool):
+        """Test a rebuild drops soft-deleted candidates from the statistics."""
+        Candidate.objects.filter(pk=pool['Cai'].pk).soft_delete()
+        rebuild_ranking(hub_id)
+        assert RankingCorpus.objects.get(hub_id=hub_id).documents == 2
+        assert not CandidateTermVector.objects.filter(candidate=pool['Cai']).exists()
+        call_command('rebuild_ranking', '--hub', str(hub_id))
+        assert Corpus(hub_id, ['python']).df == {'python': 2}
+
+
+@pytest.mark.django_db
+class TestRankingSurfaces:
+    """Sort key and AI tool."""
+
+    def test_sort_by_match(self, auth_client, hub_id, pool):
+        """Test the candidates list sorts by match_score."""
+        response = auth_client.get(
+            reverse('recruitment:candidates_list'), {'sort': 'match_score', 'dir': 'desc'},
+            HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body',
+        )
+        content = response.content.decode()
+        assert content.index('Ana') < content.index('Ben') < content.index('Cai')
+
+    def test_rank_candidates_tool(self, hub_id, position, pool):
+        """Test the tool returns ranked candidates with their matched terms."""
+        request = RequestFactory().get('/')
+        request.session = {'hub_id': str(hub_id)}
+        result = RankCandidates().execute({'position_id': str(position.pk), 'limit': 2}, request)
+        assert [row['name'] for row in result['candidates']] == ['Ana', 'Ben']
+        assert 'python' in result['candidates'][0]['matched_terms']
+        other = RequestFactory().get('/')
+        other.session = {'hub_id': '00000000-0000-0000-0000-000000000000'}
+        assert 'error' in RankCandidates().execute({'position_id': str(position.pk)}, other)
+        result = RankCandidates().execute({'position_id': 'not-a-uuid'}, request)
+        assert result == {'error': 'Job position not found'}
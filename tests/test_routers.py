@@ -0,0 +1,98 @@
+"""Tests for read-replica routing."""
+import time
+
+import pytest
+from django.db import connections, router
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import LocalUser
+from recruitment.ai_tools import ListCandidates
+from recruitment.models import Candidate
+from recruitment.routers import PIN_SESSION_KEY, use_replica
+
+
+def _touches(ctx, table):
+    return any(table in query['sql'] for query in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestRouter:
+    """Routing decisions between the two aliases."""
+
+    def test_primary_by_default(self, replica):
+        """Test reads outside an opted-in path stay on the primary."""
+        assert Candidate.objects.all().db == 'default'
+
+    def test_replica_when_opted_in(self, replica):
+        """Test recruitment reads go to the replica, other apps and writes don't."""
+        with use_replica():
+            assert Candidate.objects.all().db == 'replica'
+            assert LocalUser.objects.all().db == 'default'
+            assert router.db_for_write(Candidate) == 'default'
+
+    def test_write_sends_later_reads_to_primary(self, replica):
+        """Test a write in the block sends the reads after it to the primary."""
+        with use_replica():
+            assert Candidate.objects.all().db == 'replica'
+            router.db_for_write(Candidate)
+            assert Candidate.objects.all().db == 'default'
+
+    def test_disabled_without_alias(self, replica, settings):
+        """Test nothing is routed when RECRUITMENT_REPLICA_DB is unset."""
+        settings.RECRUITMENT_REPLICA_DB = None
+        with use_replica():
+            assert Candidate.objects.all().db == 'default'
+
+    def test_no_migrations_on_replica(self, replica):
+        """Test the replica never gets recruitment migrations."""
+        assert router.allow_migrate('replica', 'recruitment') is False
+        assert router.allow_migrate('default', 'recruitment') is True
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaReadPaths:
+    """Opted-in views and tools query the replica connection."""
+
+    def test_list_reads_replica(self, auth_client, replica, candidate):
+        """Test the candidates list reads its rows from the replica."""
+        with CaptureQueriesContext(connections['replica']) as on_replica, \
+                CaptureQueriesContext(connections['default']) as on_primary:
+            response = auth_client.get(reverse('recruitment:candidates_list'))
+        assert response.status_code == 200
+        assert _touches(on_replica, 'recruitment_candidate')
+        assert not _touches(on_primary, 'recruitment_candidate')
+
+    def test_export_streams_from_replica(self, auth_client, replica, candidate):
+        """Test export rows come from the replica though they stream after the view returns."""
+        response = auth_client.get(reverse('recruitment:candidates_list'), {'export': 'csv'})
+        with CaptureQueriesContext(connections['replica']) as on_replica:
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 2
+        assert _touches(on_replica, 'recruitment_candidate')
+
+    def test_write_pins_session(self, auth_client, replica, job_position):
+        """Test a session that wrote reads the primary until the pin expires."""
+        auth_client.post(reverse('recruitment:job_position_toggle_status', args=[job_position.pk]))
+        assert auth_client.session[PIN_SESSION_KEY] > time.time()
+
+        with CaptureQueriesContext(connections['replica']) as on_replica:
+            auth_client.get(reverse('recruitment:job_positions_list'))
+        assert not _touches(on_replica, 'recruitment_jobposition')
+
+        session = auth_client.session
+        session[PIN_SESSION_KEY] = time.time() - 1
+        session.save()
+        with CaptureQueriesContext(connections['replica']) as on_replica:
+            auth_client.get(reverse('recruitment:job_positions_list'))
+        assert _touches(on_replica, 'recruitment_jobposition')
+
+    def test_read_tool_uses_replica(self, replica, candidate, hub_id):
+        """Test read-only AI tools are opted in."""
+        request = RequestFactory().get('/')
+        request.session = {'hub_id': str(hub_id)}
+        with CaptureQueriesContext(connections['replica']) as on_replica:
+            result = ListCandidates().execute({}, request)
+        assert [row['name'] for row in result['candidates']] == ['Test Name']
+        assert _touches(on_replica, 'recruitment_candidate')
@@ -0,0 +1,84 @@
+"""Tests for the datatable row fragment cache."""
+import pytest
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import translation
+
+from recruitment import rowcache
+from recruitment.models import Candidate
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.RECRUITMENT_ROW_CACHE = 'recruitment.rowcache.LocalRowCache'
+    rowcache.backend.cache_clear()
+    yield rowcache.backend()
+    rowcache.backend.cache_clear()
+
+
+@pytest.fixture
+def rows(hub_id, job_position):
+    return [
+        Candidate.objects.create(hub_id=hub_id, position=job_position, name=f'Row {i}', email=f'r{i}@test.com')
+        for i in range(3)
+    ]
+
+
+def _render(hub_id, role='admin'):
+    request = RequestFactory().get('/')
+    request.session = {'hub_id': str(hub_id), 'user_role': role}
+    candidates = list(Candidate.objects.for_list(hub_id).order_by('name'))
+    return render_to_string('recruitment/partials/candidates_rows.html', {'candidates': candidates}, request=request)
+
+
+class TestLocalRowCache:
+    """LRU backend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unread entry goes first once the cache is full."""
+        cache = rowcache.LocalRowCache(size=2)
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        assert cache.get('a') == 'A'
+        cache.set('c', 'C')
+        assert cache.get('b') is None
+        assert (cache.get('a'), cache.get('c')) == ('A', 'C')
+
+
+@pytest.mark.django_db
+class TestRowCache:
+    """Cached rows in the candidates partial."""
+
+    def test_unchanged_rows_are_reused(self, local_cache, hub_id, rows):
+        """Test a second render serves every row from the cache."""
+        first = _render(hub_id)
+        misses = local_cache.misses
+        assert _render(hub_id) == first
+        assert local_cache.misses == misses
+        assert local_cache.hits >= len(rows)
+
+    def test_changed_row_is_rerendered(self, hub_id, rows):
+        """Test saves and score updates show up without explicit invalidation."""
+        _render(hub_id)
+        rows[0].name = 'Renamed'
+        rows[0].save()
+        rows[1].match_score = 7.5
+        Candidate.objects.bulk_update([rows[1]], ['match_score'])
+        html = _render(hub_id)
+        assert 'Renamed' in html
+        assert '7.5' in html
+
+    def test_keyed_by_language_and_role(self, local_cache, hub_id, rows):
+        """Test another language or role never reuses a row."""
+        _render(hub_id)
+        misses = local_cache.misses
+        _render(hub_id, role='employee')
+        with translation.override('es'):
+            _render(hub_id)
+        assert local_cache.misses == misses + 2 * len(rows)
+
+    def test_null_backend(self, settings, hub_id, rows):
+        """Test the cache can be switched off."""
+        settings.RECRUITMENT_ROW_CACHE = 'recruitment.rowcache.NullRowCache'
+        rowcache.backend.cache_clear()
+        assert 'Row 0' in _render(hub_id)
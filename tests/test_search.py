@@ -0,0 +1,102 @@
+"""Tests for recruitment full-text search."""
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from recruitment.models import JobPosition, Candidate
+from recruitment.search import IContainsSearchBackend, SQLiteFTSSearchBackend, get_backend, search
+
+
+@pytest.fixture
+def ranked_backend(db):
+    backend = get_backend()
+    if not backend.ranked:
+        pytest.skip('No full-text index on this database')
+    return backend
+
+
+@pytest.fixture
+def candidates(hub_id, job_position):
+    return [
+        Candidate.objects.create(
+            hub_id=hub_id, position=job_position, name='Ana Perez', email='ana.perez@example.com',
+            phone='+34600111222', resume_notes='Kubernetes and Terraform in production',
+        ),
+        Candidate.objects.create(
+            hub_id=hub_id, position=job_position, name='Bob Smith', email='bob@example.org',
+            resume_notes='Frontend developer, some kubernetes exposure',
+        ),
+    ]
+
+
+@pytest.mark.django_db
+class TestSearch:
+    """Search backend tests."""
+
+    def test_matches_name_prefix(self, hub_id, candidates):
+        """Test partial names match."""
+        qs = search(Candidate.objects.for_list(hub_id), 'pere')
+        assert [c.name for c in qs] == ['Ana Perez']
+
+    def test_matches_resume_notes(self, hub_id, candidates, ranked_backend):
+        """Test resume notes are searchable."""
+        qs = search(Candidate.objects.for_list(hub_id), 'terraform')
+        assert [c.name for c in qs] == ['Ana Perez']
+
+    def test_ranks_better_match_first(self, hub_id, candidates, ranked_backend):
+        """Test rows matching on heavier fields rank higher."""
+        qs = search(Candidate.objects.for_list(hub_id), 'bob kubernetes').order_by('-search_rank')
+        assert [c.name for c in qs] == ['Bob Smith']
+        qs = search(Candidate.objects.for_list(hub_id), 'kubernetes').order_by('-search_rank')
+        assert len(qs) == 2
+
+    def test_soft_deleted_rows_leave_index(self, hub_id, candidates):
+        """Test soft-deleted candidates are no longer found."""
+        Candidate.objects.filter(pk=candidates[0].pk).update(is_deleted=True, deleted_at=timezone.now())
+        assert not search(Candidate.all_objects.filter(hub_id=hub_id), 'terraform').filter(is_deleted=False).exists()
+
+    def test_updates_follow_saves(self, hub_id, candidates):
+        """Test edited fields are searchable immediately."""
+        candidate = candidates[1]
+        candidate.name = 'Roberta Smith'
+        candidate.save()
+        assert search(Candidate.objects.for_list(hub_id), 'roberta').get().pk == candidate.pk
+
+    def test_scoped_to_hub(self, hub_id, candidates):
+        """Test matches from other hubs are excluded by the base queryset."""
+        other = JobPosition.objects.create(hub_id=hub_id, title='Other')
+        Candidate.objects.create(hub_id=None, position=other, name='Ana Perez')
+        assert search(Candidate.objects.for_list(hub_id), 'ana').count() == 1
+
+    def test_icontains_fallback(self, hub_id, candidates):
+        """Test the fallback backend keeps the historical columns."""
+        qs = IContainsSearchBackend().search(Candidate.objects.for_list(hub_id), 'bob@')
+        assert [c.name for c in qs] == ['Bob Smith']
+
+    def test_list_sorts_by_relevance(self, auth_client, candidates):
+        """Test the list view accepts the relevance sort key."""
+        url = reverse('recruitment:candidates_list')
+        response = auth_client.get(url, {'q': 'kubernetes', 'sort': 'relevance', 'dir': 'desc'})
+        assert response.status_code == 200
+        response = auth_client.get(url, {'sort': 'relevance'})
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestSearchIndexMigrations:
+    """The index keeps working once every migration has run."""
+
+    def test_triggers_survive_table_rebuilds(self):
+        """Test later migrations rebuilding the table left the SQLite triggers in place."""
+        if not isinstance(get_backend(), SQLiteFTSSearchBackend):
+            pytest.skip('No SQLite full-text index on this database')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'recruitment_candidate'")
+            triggers = {row[0] for row in cursor.fetchall()}
+        assert {f'recruitment_candidate_fts_{suffix}' for suffix in ('ai', 'ad', 'au')} <= triggers
+
+    def test_new_candidate_is_indexed(self, hub_id, job_position):
+        """Test a candidate created after migrating is found."""
+        Candidate.objects.create(hub_id=hub_id, position=job_position, name='Zoe Quintana')
+        assert [c.name for c in search(Candidate.objects.for_list(hub_id), 'quint')] == ['Zoe Quintana']
@@ -0,0 +1,149 @@
+"""Tests for the candidate similarity index."""
+import io
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import reverse
+
+from recruitment import similarity
+from recruitment.ai_tools import FindSimilarCandidates, UpdateJobPostingsBatch
+from recruitment.models import Candidate, JobPosition
+
+np = pytest.importorskip('numpy')
+
+NOTES = {
+    'Ana': 'Python Django developer, PostgreSQL, REST APIs, Celery.',
+    'Ben': 'Django and Python backend developer, REST APIs and PostgreSQL.',
+    'Cai': 'Forklift driver, warehouse inventory and shipping.',
+    'Dee': 'Warehouse picker, forklift certified, shipping and receiving.',
+}
+
+
+@pytest.fixture(autouse=True)
+def index_dir(settings, tmp_path):
+    settings.RECRUITMENT_SIMILARITY_DIR = str(tmp_path)
+    similarity._open.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def positions(hub_id):
+    return (
+        JobPosition.objects.create(hub_id=hub_id, title='Backend developer', department='Engineering'),
+        JobPosition.objects.create(hub_id=hub_id, title='Warehouse operator', department='Logistics'),
+    )
+
+
+@pytest.fixture
+def pool(hub_id, positions):
+    return {
+        name: Candidate.objects.create(
+            hub_id=hub_id, position=positions[0] if name in ('Ana', 'Ben') else positions[1],
+            name=name, resume_notes=notes,
+        )
+        for name, notes in NOTES.items()
+    }
+
+
+def _names(results):
+    return [candidate.name for candidate, _score in results]
+
+
+def _scores(results):
+    return {candidate.name: score for candidate, score in results}
+
+
+class TestEmbed:
+    """Hashed vectors."""
+
+    def test_normalised_and_deterministic(self):
+        """Test vectors are unit length, stable and cosine 1 for the same text."""
+        vectors = similarity.embed([['python', 'django'], ['python', 'django'], []], dim=64)
+        assert vectors.dtype == np.float32
+        assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1)
+        assert float(vectors[0] @ vectors[1]) == pytest.approx(1)
+        assert not vectors[2].any()
+
+
+@pytest.mark.django_db
+class TestSimilarCandidates:
+    """Index maintenance and top-k queries."""
+
+    def test_built_on_first_query(self, index_dir, pool):
+        """Test the index is created lazily and ranks the closest profile first."""
+        assert not list(index_dir.glob('*.npy'))
+        results = similarity.similar_candidates(pool['Ana'], limit=2)
+        assert _names(results)[0] == 'Ben'
+        assert 'Ana' not in _names(results)
+        assert list(index_dir.glob('*.npy'))
+
+    def test_incremental_updates(self, hub_id, positions, pool):
+        """Test saves after the index exists are visible without a rebuild."""
+        similarity.rebuild_index(hub_id)
+        eve = Candidate.objects.create(
+            hub_id=hub_id, position=positions[1], name='Eve', resume_notes='Forklift and warehouse shipping.',
+        )
+        assert _names(similarity.similar_candidates(pool['Cai'], limit=2))[0] in ('Dee', 'Eve')
+
+        eve = Candidate.objects.get(pk=eve.pk)
+        eve.resume_notes = 'Python Django REST APIs developer.'
+        eve.save()
+        assert 'Eve' in _names(similarity.similar_candidates(pool['Ana'], limit=2))
+
+    def test_grows_and_drops_deleted(self, hub_id, positions, pool, monkeypatch):
+        """Test a full index moves to a larger generation and deleted rows are filtered."""
+        monkeypatch.setattr(similarity, 'INITIAL_CAPACITY', 4)
+        similarity.rebuild_index(hub_id)
+        first = similarity._generation(hub_id)
+        for i in range(6):
+            Candidate.objects.create(hub_id=hub_id, position=positions[0], name=f'Dev {i}', resume_notes='python django')
+        assert similarity._generation(hub_id) > first
+        Candidate.objects.filter(pk=pool['Ben'].pk).soft_delete()
+        names = _names(similarity.similar_candidates(pool['Ana'], limit=20))
+        assert 'Ben' not in names
+        assert sum(name.startswith('Dev') for name in names) == 6
+
+    def test_batch_department_change(self, hub_id, positions, pool):
+        """Test a batch department change re-embeds the positions' candidates."""
+        similarity.rebuild_index(hub_id)
+        before = _scores(similarity.similar_candidates(pool['Ana'], limit=3))
+        request = RequestFactory().get('/')
+        request.session = {'hub_id': str(hub_id)}
+        result = UpdateJobPostingsBatch().execute(
+            {'where': {'ids': [str(positions[1].pk)]}, 'department': 'Python Django developer'}, request,
+        )
+        assert result == {'updated': 1}
+        after = _scores(similarity.similar_candidates(pool['Ana'], limit=3))
+        assert after['Cai'] > before.get('Cai', 0)
+        assert after['Ben'] == pytest.approx(before['Ben'])
+
+    def test_rebuild_command(self, hub_id, pool):
+        """Test the command rebuilds a hub's index."""
+        call_command('rebuild_similarity_index', '--hub', str(hub_id), stdout=io.StringIO())
+        assert similarity._generation(str(hub_id)) == 1
+
+
+@pytest.mark.django_db
+class TestSimilarSurfaces:
+    """Edit page card and AI tool."""
+
+    def test_edit_view_card(self, auth_client, pool):
+        """Test the similar candidates partial lists the closest candidates."""
+        response = auth_client.get(reverse('recruitment:candidate_similar', args=[pool['Cai'].pk]))
+        assert response.status_code == 200
+        assert 'Dee' in response.content.decode()
+
+    def test_tool(self, hub_id, pool):
+        """Test the tool returns scored candidates and can skip the same position."""
+        request = RequestFactory().get('/')
+        request.session = {'hub_id': str(hub_id)}
+        result = FindSimilarCandidates().execute({'candidate_id': str(pool['Ana'].pk), 'limit': 1}, request)
+        assert [row['name'] for row in result['similar']] == ['Ben']
+        assert 0 < result['similar'][0]['similarity'] <= 1
+        result = FindSimilarCandidates().execute(
+            {'candidate_id': str(pool['Ana'].pk), 'exclude_same_position': True}, request,
+        )
+        assert 'Ben' not in [row['name'] for row in result['similar']]
+        result = FindSimilarCandidates().execute({'candidate_id': 'not-a-uuid'}, request)
+        assert result == {'error': 'Candidate not found'}
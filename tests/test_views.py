@@ -1,6 +1,20 @@
 """Tests for recruitment views."""
+import json
+from datetime import timedelta
+
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+from recruitment.models import JobPosition, Candidate
+from recruitment.pagination import paginate_by_cursor
+from recruitment.stats import cache_stats, pipeline_summary
+from recruitment.views import JOB_POSITION_SORT_FIELDS
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 
 @pytest.mark.django_db
@@ -26,6 +40,65 @@ class TestDashboard:
         assert response.status_code == 302
 
 
+@pytest.mark.django_db
+class TestPipelineSummary:
+    """Dashboard aggregate tests."""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM_CACHE
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def pipeline(self, hub_id):
+        backend = JobPosition.objects.create(hub_id=hub_id, title='Backend', status='open', vacancies=2)
+        JobPosition.objects.create(hub_id=hub_id, title='Archive', status='closed')
+        for stage, rating in [('applied', 1), ('applied', 3), ('interview', 4), ('hired', 5)]:
+            Candidate.objects.create(hub_id=hub_id, position=backend, name=stage, stage=stage, rating=rating)
+        return backend
+
+    def test_aggregates(self, hub_id, pipeline):
+        """Test stage, status and per-position figures."""
+        summary = pipeline_summary(hub_id)
+        stages = {code: count for code, _label, count in summary['stage_counts']}
+        statuses = {code: count for code, _label, count in summary['status_counts']}
+        assert summary['total_candidates'] == 4
+        assert summary['total_job_positions'] == 2
+        assert summary['average_rating'] == 3.25
+        assert stages['applied'] == 2 and stages['hired'] == 1 and stages['offer'] == 0
+        assert statuses['open'] == 1 and statuses['closed'] == 1
+        assert summary['open_positions'] == [{
+            'id': pipeline.id, 'title': 'Backend', 'vacancies': 2,
+            'hired': 1, 'remaining': 1, 'candidates': 4,
+        }]
+
+    def test_two_queries_then_cached(self, hub_id, pipeline, django_assert_num_queries):
+        """Test a miss costs the counts and funnel queries and a hit costs none."""
+        before = cache_stats()
+        with django_assert_num_queries(2):
+            pipeline_summary(hub_id)
+        with django_assert_num_queries(0):
+            pipeline_summary(hub_id)
+        after = cache_stats()
+        assert after['misses'] == before['misses'] + 1
+        assert after['hits'] == before['hits'] + 1
+
+    def test_invalidated_by_save(self, hub_id, pipeline):
+        """Test saving a candidate drops the cached summary."""
+        assert pipeline_summary(hub_id)['total_candidates'] == 4
+        Candidate.objects.create(hub_id=hub_id, position=pipeline, name='New')
+        assert pipeline_summary(hub_id)['total_candidates'] == 5
+
+    def test_invalidated_by_bulk_action(self, auth_client, hub_id, pipeline):
+        """Test bulk deletes drop the cached summary."""
+        assert pipeline_summary(hub_id)['total_candidates'] == 4
+        ids = ','.join(str(pk) for pk in Candidate.objects.filter(position=pipeline).values_list('pk', flat=True)[:2])
+        auth_client.post(reverse('recruitment:candidates_bulk_action'), {'ids': ids, 'action': 'delete'})
+        assert pipeline_summary(hub_id)['total_candidates'] == 2
+
+
 @pytest.mark.django_db
 class TestJobPositionViews:
     """JobPosition view tests."""
@@ -130,6 +203,36 @@ class TestJobPositionViews:
         job_position.refresh_from_db()
         assert job_position.is_deleted is True
 
+    def test_toggle_swaps_only_its_row(self, auth_client, hub_id, job_position):
+        """Test a toggle returns one out-of-band row and skips the list query."""
+        JobPosition.objects.create(hub_id=hub_id, title='Other')
+        url = reverse('recruitment:job_position_toggle_status', args=[job_position.pk])
+        response = auth_client.post(url, HTTP_HX_REQUEST='true')
+        content = response.content.decode()
+        assert response['HX-Reswap'] == 'none'
+        assert content.count('hx-swap-oob') == 1
+        assert f'job-position-row-{job_position.pk}' in content
+        assert 'Other' not in content
+
+    def test_bulk_delete_removes_rows(self, auth_client, hub_id, job_position):
+        """Test bulk deletes drop the rows and report the count."""
+        other = JobPosition.objects.create(hub_id=hub_id, title='Other')
+        url = reverse('recruitment:job_positions_bulk_action')
+        ids = f'{job_position.pk},{other.pk}'
+        response = auth_client.post(url, {'ids': ids, 'action': 'delete'}, HTTP_HX_REQUEST='true')
+        assert response.content.decode().count('hx-swap-oob="delete"') == 2
+        assert json.loads(response['HX-Trigger']) == {'recruitment-rows-removed': {'count': 2}}
+
+    def test_edit_from_page_returns_to_list(self, auth_client, job_position):
+        """Test full-page edits navigate back to the list, panel edits swap the row."""
+        url = reverse('recruitment:job_position_edit', args=[job_position.pk])
+        data = {'title': 'Updated Title', 'vacancies': '1'}
+        response = auth_client.post(url, data, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='edit-job_position-form')
+        assert response.status_code == 204
+        assert 'HX-Location' in response
+        response = auth_client.post(url, data, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body')
+        assert f'job-position-row-{job_position.pk}' in response.content.decode()
+
     def test_list_requires_auth(self, client):
         """Test list requires authentication."""
         url = reverse('recruitment:job_positions_list')
@@ -153,6 +256,21 @@ class TestCandidateViews:
         response = auth_client.get(url, HTTP_HX_REQUEST='true')
         assert response.status_code == 200
 
+    def test_list_query_count_constant(self, auth_client, hub_id, job_position):
+        """Test list query count does not grow with page size."""
+        Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=job_position, name=f'Candidate {i}')
+            for i in range(30)
+        ])
+        url = reverse('recruitment:candidates_list')
+        counts = []
+        for per_page in (12, 96, 0):
+            with CaptureQueriesContext(connection) as ctx:
+                response = auth_client.get(url, {'per_page': per_page})
+            assert response.status_code == 200
+            counts.append(len(ctx.captured_queries))
+        assert len(set(counts)) == 1
+
     def test_list_search(self, auth_client):
         """Test list search."""
         url = reverse('recruitment:candidates_list')
@@ -230,6 +348,14 @@ class TestCandidateViews:
         candidate.refresh_from_db()
         assert candidate.is_deleted is True
 
+    def test_delete_removes_row(self, auth_client, candidate):
+        """Test a single delete returns a row removal."""
+        url = reverse('recruitment:candidate_delete', args=[candidate.pk])
+        response = auth_client.post(url, HTTP_HX_REQUEST='true')
+        content = response.content.decode()
+        assert f'id="candidate-row-{candidate.pk}" hx-swap-oob="delete"' in content
+        assert 'datatable-tbody' not in content
+
     def test_list_requires_auth(self, client):
         """Test list requires authentication."""
         url = reverse('recruitment:candidates_list')
@@ -237,6 +363,91 @@ class TestCandidateViews:
         assert response.status_code == 302
 
 
+@pytest.mark.django_db
+class TestCursorPagination:
+    """Keyset pagination tests."""
+
+    @pytest.fixture
+    def candidates(self, hub_id, job_position):
+        # Repeated names exercise the id tiebreaker.
+        return Candidate.objects.bulk_create([
+            Candidate(hub_id=hub_id, position=job_position, name=f'Candidate {i % 4}', rating=i % 3)
+            for i in range(25)
+        ])
+
+    def _walk(self, qs, sort_field, descending):
+        seen, cursor = [], None
+        while True:
+            page = paginate_by_cursor(qs, sort_field, descending, cursor=cursor, per_page=7)
+            seen.extend(c.pk for c in page)
+            if not page.has_next():
+                return seen
+            cursor = page.next_cursor
+
+    def _expected(self, qs, sort_field, descending):
+        prefix = '-' if descending else ''
+        return list(qs.order_by(f'{prefix}{sort_field}', f'{prefix}id').values_list('pk', flat=True))
+
+    @pytest.mark.parametrize('sort_field,descending', [('name', False), ('rating', True), ('position', False)])
+    def test_walks_every_row_once(self, hub_id, candidates, sort_field, descending):
+        """Test following next cursors visits each row exactly once, in order."""
+        qs = Candidate.objects.for_list(hub_id)
+        assert self._walk(qs, sort_field, descending) == self._expected(qs, sort_field, descending)
+
+    @pytest.mark.parametrize('descending', [False, True])
+    def test_sub_millisecond_timestamps(self, hub_id, candidates, descending):
+        """Test created_at cursors keep microseconds, so rows within one millisecond are walked once."""
+        base = timezone.now().replace(microsecond=0)
+        for i, candidate in enumerate(candidates):
+            Candidate.all_objects.filter(pk=candidate.pk).update(created_at=base + timedelta(microseconds=37 * i))
+        qs = Candidate.objects.for_list(hub_id)
+        assert self._walk(qs, 'created_at', descending) == self._expected(qs, 'created_at', descending)
+
+    @pytest.mark.parametrize('sort', ['candidates', 'hired'])
+    @pytest.mark.parametrize('descending', [False, True])
+    def test_positions_without_stats(self, hub_id, candidates, sort, descending):
+        """Test positions bulk-created without a stats row are walked as zero counts."""
+        JobPosition.objects.bulk_create([JobPosition(hub_id=hub_id, title=f'Bulk {i}') for i in range(10)])
+        qs = JobPosition.objects.for_list(hub_id)
+        sort_field = JOB_POSITION_SORT_FIELDS[sort]
+        walked = self._walk(qs, sort_field, descending)
+        assert len(walked) == 11
+        assert walked == self._expected(qs, sort_field, descending)
+
+    def test_previous_cursor_returns_prior_page(self, hub_id, candidates):
+        """Test stepping back returns the same rows as the previous page."""
+        qs = Candidate.objects.for_list(hub_id)
+        first = paginate_by_cursor(qs, 'name', per_page=10)
+        second = paginate_by_cursor(qs, 'name', cursor=first.next_cursor, per_page=10)
+        back = paginate_by_cursor(qs, 'name', cursor=second.previous_cursor, per_page=10)
+        assert [c.pk for c in back] == [c.pk for c in first]
+        assert not first.has_previous()
+        assert back.has_next()
+
+    def test_invalid_cursor_restarts(self, hub_id, candidates):
+        """Test a garbled cursor falls back to the first page."""
+        qs = Candidate.objects.for_list(hub_id)
+        page = paginate_by_cursor(qs, 'name', cursor='not-a-cursor', per_page=5)
+        assert [c.pk for c in page] == [c.pk for c in paginate_by_cursor(qs, 'name', per_page=5)]
+
+    def test_list_cursor_mode(self, auth_client, candidates):
+        """Test candidates list renders in cursor mode without COUNT(*)."""
+        url = reverse('recruitment:candidates_list')
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(url, {'paginate': 'cursor', 'per_page': 12}, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-body')
+        assert response.status_code == 200
+        # The facet counts are grouped; only the paginator's total is ruled out.
+        assert not any('"__count"' in q['sql'] for q in ctx.captured_queries)
+        assert response.content.count(b'data-id=') == 12
+
+    def test_list_infinite_scroll(self, auth_client, candidates):
+        """Test "All" in cursor mode streams rows with a scroll sentinel."""
+        url = reverse('recruitment:job_positions_list')
+        response = auth_client.get(url, {'paginate': 'cursor', 'per_page': 0}, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='datatable-scroll')
+        assert response.status_code == 200
+        assert b'<table' not in response.content
+
+
 @pytest.mark.django_db
 class TestSettings:
     """Settings view tests."""
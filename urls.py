@@ -1,18 +1,25 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Native async dashboard and lists under ASGI (see async_views.py).
+if getattr(settings, 'RECRUITMENT_ASYNC_VIEWS', False):
+    from . import async_views as list_views
+else:
+    list_views = views
+
 app_name = 'recruitment'
 
 urlpatterns = [
     # Dashboard
-    path('', views.dashboard, name='dashboard'),
+    path('', list_views.dashboard, name='dashboard'),
 
     # Navigation tab aliases
-    path('positions/', views.job_positions_list, name='positions'),
+    path('positions/', list_views.job_positions_list, name='positions'),
 
 
     # JobPosition
-    path('job_positions/', views.job_positions_list, name='job_positions_list'),
+    path('job_positions/', list_views.job_positions_list, name='job_positions_list'),
     path('job_positions/add/', views.job_position_add, name='job_position_add'),
     path('job_positions/<uuid:pk>/edit/', views.job_position_edit, name='job_position_edit'),
     path('job_positions/<uuid:pk>/delete/', views.job_position_delete, name='job_position_delete'),
@@ -20,12 +27,22 @@ urlpatterns = [
     path('job_positions/bulk/', views.job_positions_bulk_action, name='job_positions_bulk_action'),
 
     # Candidate
-    path('candidates/', views.candidates_list, name='candidates_list'),
+    path('candidates/', list_views.candidates_list, name='candidates_list'),
     path('candidates/add/', views.candidate_add, name='candidate_add'),
+    path('candidates/import/', views.candidates_import, name='candidates_import'),
+    path('candidates/duplicates/', views.candidates_duplicates, name='candidates_duplicates'),
+    path('candidates/duplicates/<int:pk>/', views.candidates_duplicate_action, name='candidates_duplicate_action'),
     path('candidates/<uuid:pk>/edit/', views.candidate_edit, name='candidate_edit'),
+    path('candidates/<uuid:pk>/similar/', views.candidate_similar, name='candidate_similar'),
     path('candidates/<uuid:pk>/delete/', views.candidate_delete, name='candidate_delete'),
+    path('candidates/<uuid:pk>/attachments/', views.candidate_attachments, name='candidate_attachments'),
+    path('candidates/<uuid:pk>/attachments/upload/', views.candidate_attachment_upload, name='candidate_attachment_upload'),
+    path('attachments/uploads/<uuid:upload_id>/', views.attachment_upload_chunk, name='attachment_upload_chunk'),
+    path('attachments/<uuid:pk>/download/', views.candidate_attachment_download, name='candidate_attachment_download'),
+    path('attachments/<uuid:pk>/delete/', views.candidate_attachment_delete, name='candidate_attachment_delete'),
     path('candidates/bulk/', views.candidates_bulk_action, name='candidates_bulk_action'),
 
     # Settings
     path('settings/', views.settings_view, name='settings'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,38 +1,152 @@
 """
 Recruitment Module Views
 """
+import json
+
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, JsonResponse
 from django.urls import reverse
-from django.shortcuts import get_object_or_404, render as django_render
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_POST
 
 from apps.accounts.decorators import login_required, permission_required
 from apps.core.htmx import htmx_view
-from apps.core.services import export_to_csv, export_to_excel
 from apps.modules_runtime.navigation import with_module_nav
 
-from .models import JobPosition, Candidate
+from . import attachments, facets, pipeline, similarity
+from .dedup import merge_group
+from .exports import export_response
+from .imports import DEFAULT_BATCH_SIZE, import_candidates
+from .instrumentation import PrometheusSink, RingBufferSink, get_sink, instrumented, timed_render
+from .models import (
+    ATTACHMENT_KIND, CAND_STAGE, AttachmentUpload, Candidate, CandidateAttachment, DuplicateGroup, JobPosition,
+)
+from .pagination import paginate_by_cursor
+from .routers import replica_reads
+from .search import search
+from .stats import cache_stats, invalidate_pipeline_summary, pipeline_summary
 
 PER_PAGE_CHOICES = [12, 24, 48, 96, 0]
+# Rows fetched per infinite-scroll step when "All" is chosen in cursor mode.
+SCROLL_CHUNK = 96
+
+
+def _paginate(qs, per_page, page_number=1):
+    if per_page > 0:
+        return Paginator(qs, per_page).get_page(page_number)
+    # "All": size the single page from one COUNT(*) and reuse it.
+    total = qs.count()
+    paginator = Paginator(qs, max(total, 1))
+    paginator.count = total
+    return paginator.get_page(1)
+
+
+def _paginate_mode(request):
+    default = 'cursor' if getattr(settings, 'RECRUITMENT_CURSOR_PAGINATION', False) else 'page'
+    mode = request.GET.get('paginate') or default
+    return mode if mode in ('page', 'cursor') else 'page'
+
+
+def _list_page(request, qs, order_field, sort_dir, per_page, paginate_mode):
+    if paginate_mode == 'cursor':
+        return paginate_by_cursor(
+            qs, order_field, sort_dir == 'desc',
+            cursor=request.GET.get('cursor'), per_page=per_page or SCROLL_CHUNK,
+        )
+    return _paginate(qs, per_page, request.GET.get('page', 1))
+
+
+def _list_params(request, default_sort):
+    """Datatable query string: search, sort, view and page size."""
+    per_page = int(request.GET.get('per_page', 12))
+    if per_page not in PER_PAGE_CHOICES:
+        per_page = 12
+    return {
+        'search_query': request.GET.get('q', '').strip(),
+        'sort_field': request.GET.get('sort', default_sort),
+        'sort_dir': request.GET.get('dir', 'asc'),
+        'current_view': request.GET.get('view', 'table'),
+        'per_page': per_page,
+        'paginate_mode': _paginate_mode(request),
+    }
+
+
+def _sorted_list(qs, params, sort_fields, default_sort):
+    """Apply the search and sort of ``params`` to ``qs``; returns ``(qs, order_field)``."""
+    if params['search_query']:
+        qs = search(qs, params['search_query'])
+    elif params['sort_field'] == 'relevance':
+        params['sort_field'] = default_sort
+    order_field = sort_fields.get(params['sort_field'], default_sort)
+    order_by = f'-{order_field}' if params['sort_dir'] == 'desc' else order_field
+    return qs.order_by(order_by), order_field
+
+
+def _is_scroll(request):
+    """An infinite-scroll request for the next rows only."""
+    return bool(request.htmx and request.htmx.target == 'datatable-scroll')
+
+
+def _list_partial(request, name):
+    """Template of the datatable fragment an htmx request targets, or None for the page."""
+    if _is_scroll(request):
+        return f'recruitment/partials/{name}_rows.html'
+    if request.htmx and request.htmx.target == 'datatable-body':
+        return f'recruitment/partials/{name}_list.html'
+    return None
+
+
+def _row_updates(request, row_template, row_prefix, rows=(), removed=()):
+    """
+    Respond to a list mutation with out-of-band swaps of only the affected
+    rows: ``rows`` are re-rendered in place and ``removed`` ids are dropped,
+    keeping the user's page, sort and search. The list footer is told how
+    many rows went away through the ``recruitment-rows-removed`` event.
+    """
+    response = timed_render(request, 'recruitment/partials/row_updates.html', {
+        'rows': rows, 'row_template': row_template, 'row_prefix': row_prefix, 'removed': removed,
+    })
+    response['HX-Reswap'] = 'none'
+    if removed:
+        response['HX-Trigger'] = json.dumps({'recruitment-rows-removed': {'count': len(removed)}})
+    return response
+
+
+def _job_position_updates(request, rows=(), removed=()):
+    return _row_updates(request, 'recruitment/partials/job_position_row.html', 'job-position', rows, removed)
+
+
+def _candidate_updates(request, rows=(), removed=()):
+    return _row_updates(request, 'recruitment/partials/candidate_row.html', 'candidate', rows, removed)
+
+
+def _saved_from_list(request, list_url_name):
+    """Edits posted from the list's side panel swap the row; full-page edits go back to the list."""
+    if not request.htmx or request.htmx.target == 'datatable-body':
+        return None
+    response = HttpResponse(status=204)
+    response['HX-Location'] = json.dumps({'path': reverse(list_url_name), 'target': '#main-content-area'})
+    return response
 
 
 # ======================================================================
 # Dashboard
 # ======================================================================
 
+@instrumented
+@replica_reads
 @login_required
 @with_module_nav('recruitment', 'dashboard')
 @htmx_view('recruitment/pages/index.html', 'recruitment/partials/dashboard_content.html')
 def dashboard(request):
     hub_id = request.session.get('hub_id')
-    return {
-        'total_job_positions': JobPosition.objects.filter(hub_id=hub_id, is_deleted=False).count(),
-        'total_candidates': Candidate.objects.filter(hub_id=hub_id, is_deleted=False).count(),
-    }
+    return pipeline_summary(hub_id)
 
 
 # ======================================================================
@@ -46,75 +160,50 @@ JOB_POSITION_SORT_FIELDS = {
     'vacancies': 'vacancies',
     'department': 'department',
     'description': 'description',
+    'candidates': 'candidate_count',
+    'hired': 'hired_count',
     'created_at': 'created_at',
+    'relevance': 'search_rank',
 }
 
-def _build_job_positions_context(hub_id, per_page=10):
-    qs = JobPosition.objects.filter(hub_id=hub_id, is_deleted=False).order_by('title')
-    paginator = Paginator(qs, per_page if per_page > 0 else max(qs.count(), 1))
-    page_obj = paginator.get_page(1)
-    return {
-        'job_positions': page_obj,
-        'page_obj': page_obj,
-        'search_query': '',
-        'sort_field': 'title',
-        'sort_dir': 'asc',
-        'current_view': 'table',
-        'per_page': per_page,
-    }
+JOB_POSITION_EXPORT_COLUMNS = [
+    ('title', 'Title'),
+    ('status', 'Status'),
+    ('is_active', 'Is Active'),
+    ('vacancies', 'Vacancies'),
+    ('department', 'Department'),
+    ('description', 'Description'),
+]
 
-def _render_job_positions_list(request, hub_id, per_page=10):
-    ctx = _build_job_positions_context(hub_id, per_page)
-    return django_render(request, 'recruitment/partials/job_positions_list.html', ctx)
+def _job_position_rows(hub_id, ids):
+    return JobPosition.objects.for_list(hub_id).filter(id__in=ids)
 
+@instrumented
+@replica_reads
 @login_required
 @with_module_nav('recruitment', 'positions')
 @htmx_view('recruitment/pages/job_positions.html', 'recruitment/partials/job_positions_content.html')
 def job_positions_list(request):
     hub_id = request.session.get('hub_id')
-    search_query = request.GET.get('q', '').strip()
-    sort_field = request.GET.get('sort', 'title')
-    sort_dir = request.GET.get('dir', 'asc')
-    page_number = request.GET.get('page', 1)
-    current_view = request.GET.get('view', 'table')
-    per_page = int(request.GET.get('per_page', 12))
-    if per_page not in PER_PAGE_CHOICES:
-        per_page = 12
-
-    qs = JobPosition.objects.filter(hub_id=hub_id, is_deleted=False)
-
-    if search_query:
-        qs = qs.filter(Q(title__icontains=search_query) | Q(department__icontains=search_query) | Q(description__icontains=search_query) | Q(status__icontains=search_query))
-
-    order_by = JOB_POSITION_SORT_FIELDS.get(sort_field, 'title')
-    if sort_dir == 'desc':
-        order_by = f'-{order_by}'
-    qs = qs.order_by(order_by)
+    params = _list_params(request, 'title')
+    qs, order_field = _sorted_list(
+        JobPosition.objects.for_list(hub_id),
+        params, JOB_POSITION_SORT_FIELDS, 'title',
+    )
 
     export_format = request.GET.get('export')
     if export_format in ('csv', 'excel'):
-        fields = ['title', 'status', 'is_active', 'vacancies', 'department', 'description']
-        headers = ['Title', 'Status', 'Is Active', 'Vacancies', 'Department', 'Description']
-        if export_format == 'csv':
-            return export_to_csv(qs, fields=fields, headers=headers, filename='job_positions.csv')
-        return export_to_excel(qs, fields=fields, headers=headers, filename='job_positions.xlsx')
+        return export_response(qs, JOB_POSITION_EXPORT_COLUMNS, export_format, 'job_positions')
 
-    paginator = Paginator(qs, per_page if per_page > 0 else max(qs.count(), 1))
-    page_obj = paginator.get_page(page_number)
+    page_obj = _list_page(request, qs, order_field, params['sort_dir'], params['per_page'], params['paginate_mode'])
+    context = {'job_positions': page_obj, 'page_obj': page_obj, **params}
 
-    if request.htmx and request.htmx.target == 'datatable-body':
-        return django_render(request, 'recruitment/partials/job_positions_list.html', {
-            'job_positions': page_obj, 'page_obj': page_obj,
-            'search_query': search_query, 'sort_field': sort_field,
-            'sort_dir': sort_dir, 'current_view': current_view, 'per_page': per_page,
-        })
-
-    return {
-        'job_positions': page_obj, 'page_obj': page_obj,
-        'search_query': search_query, 'sort_field': sort_field,
-        'sort_dir': sort_dir, 'current_view': current_view, 'per_page': per_page,
-    }
+    template = _list_partial(request, 'job_positions')
+    if template:
+        return timed_render(request, template, context)
+    return context
 
+@instrumented
 @login_required
 @htmx_view('recruitment/pages/job_position_add.html', 'recruitment/partials/job_position_add_content.html')
 def job_position_add(request):
@@ -139,11 +228,12 @@ def job_position_add(request):
         return response
     return {}
 
+@instrumented
 @login_required
 @htmx_view('recruitment/pages/job_position_edit.html', 'recruitment/partials/job_position_edit_content.html')
 def job_position_edit(request, pk):
     hub_id = request.session.get('hub_id')
-    obj = get_object_or_404(JobPosition, pk=pk, hub_id=hub_id, is_deleted=False)
+    obj = get_object_or_404(JobPosition.objects.for_hub(hub_id), pk=pk)
     if request.method == 'POST':
         obj.title = request.POST.get('title', '').strip()
         obj.department = request.POST.get('department', '').strip()
@@ -152,42 +242,51 @@ def job_position_edit(request, pk):
         obj.vacancies = int(request.POST.get('vacancies', 0) or 0)
         obj.is_active = request.POST.get('is_active') == 'on'
         obj.save()
-        return _render_job_positions_list(request, hub_id)
+        return (
+            _saved_from_list(request, 'recruitment:job_positions_list')
+            or _job_position_updates(request, rows=_job_position_rows(hub_id, [obj.pk]))
+        )
     return {'obj': obj}
 
+@instrumented
 @login_required
 @require_POST
 def job_position_delete(request, pk):
     hub_id = request.session.get('hub_id')
-    obj = get_object_or_404(JobPosition, pk=pk, hub_id=hub_id, is_deleted=False)
-    obj.is_deleted = True
-    obj.deleted_at = timezone.now()
-    obj.save(update_fields=['is_deleted', 'deleted_at', 'updated_at'])
-    return _render_job_positions_list(request, hub_id)
+    obj = get_object_or_404(JobPosition.objects.for_hub(hub_id), pk=pk)
+    JobPosition.objects.filter(pk=obj.pk).soft_delete()
+    invalidate_pipeline_summary(hub_id)
+    return _job_position_updates(request, removed=[obj.pk])
 
+@instrumented
 @login_required
 @require_POST
 def job_position_toggle_status(request, pk):
     hub_id = request.session.get('hub_id')
-    obj = get_object_or_404(JobPosition, pk=pk, hub_id=hub_id, is_deleted=False)
+    obj = get_object_or_404(JobPosition.objects.for_hub(hub_id).select_related('pipeline_stats'), pk=pk)
     obj.is_active = not obj.is_active
     obj.save(update_fields=['is_active', 'updated_at'])
-    return _render_job_positions_list(request, hub_id)
+    return _job_position_updates(request, rows=[obj])
 
+@instrumented
 @login_required
 @require_POST
 def job_positions_bulk_action(request):
     hub_id = request.session.get('hub_id')
     ids = [i.strip() for i in request.POST.get('ids', '').split(',') if i.strip()]
     action = request.POST.get('action', '')
-    qs = JobPosition.objects.filter(hub_id=hub_id, is_deleted=False, id__in=ids)
-    if action == 'activate':
-        qs.update(is_active=True)
-    elif action == 'deactivate':
-        qs.update(is_active=False)
-    elif action == 'delete':
-        qs.update(is_deleted=True, deleted_at=timezone.now())
-    return _render_job_positions_list(request, hub_id)
+    qs = JobPosition.objects.for_hub(hub_id).filter(id__in=ids)
+    if action in ('activate', 'deactivate'):
+        qs.update(is_active=action == 'activate', updated_at=timezone.now())
+        invalidate_pipeline_summary(hub_id)
+        return _job_position_updates(request, rows=_job_position_rows(hub_id, ids))
+    removed = []
+    if action == 'delete':
+        with transaction.atomic():
+            removed = list(qs.values_list('id', flat=True))
+            JobPosition.objects.filter(id__in=removed).soft_delete()
+        invalidate_pipeline_summary(hub_id)
+    return _job_position_updates(request, removed=removed)
 
 
 # ======================================================================
@@ -196,80 +295,61 @@ def job_positions_bulk_action(request):
 
 CANDIDATE_SORT_FIELDS = {
     'name': 'name',
-    'position': 'position',
+    'position': 'position__title',
     'stage': 'stage',
     'rating': 'rating',
+    'match_score': 'match_score',
     'email': 'email',
     'phone': 'phone',
     'created_at': 'created_at',
+    'relevance': 'search_rank',
 }
 
-def _build_candidates_context(hub_id, per_page=10):
-    qs = Candidate.objects.filter(hub_id=hub_id, is_deleted=False).order_by('name')
-    paginator = Paginator(qs, per_page if per_page > 0 else max(qs.count(), 1))
-    page_obj = paginator.get_page(1)
-    return {
-        'candidates': page_obj,
-        'page_obj': page_obj,
-        'search_query': '',
-        'sort_field': 'name',
-        'sort_dir': 'asc',
-        'current_view': 'table',
-        'per_page': per_page,
-    }
+CANDIDATE_EXPORT_COLUMNS = [
+    ('name', 'Name'),
+    ('position__title', 'JobPosition'),
+    ('stage', 'Stage'),
+    ('rating', 'Rating'),
+    ('email', 'Email'),
+    ('phone', 'Phone'),
+]
+
+# Bulk actions that move candidates along the pipeline (see pipeline.py).
+CANDIDATE_STAGE_ACTIONS = ('advance', 'set_stage', 'reject')
 
-def _render_candidates_list(request, hub_id, per_page=10):
-    ctx = _build_candidates_context(hub_id, per_page)
-    return django_render(request, 'recruitment/partials/candidates_list.html', ctx)
+def _candidate_rows(hub_id, ids):
+    return Candidate.objects.for_list(hub_id).filter(id__in=ids)
 
+@instrumented
+@replica_reads
 @login_required
 @with_module_nav('recruitment', 'candidates')
 @htmx_view('recruitment/pages/candidates.html', 'recruitment/partials/candidates_content.html')
 def candidates_list(request):
     hub_id = request.session.get('hub_id')
-    search_query = request.GET.get('q', '').strip()
-    sort_field = request.GET.get('sort', 'name')
-    sort_dir = request.GET.get('dir', 'asc')
-    page_number = request.GET.get('page', 1)
-    current_view = request.GET.get('view', 'table')
-    per_page = int(request.GET.get('per_page', 12))
-    if per_page not in PER_PAGE_CHOICES:
-        per_page = 12
-
-    qs = Candidate.objects.filter(hub_id=hub_id, is_deleted=False)
-
-    if search_query:
-        qs = qs.filter(Q(name__icontains=search_query) | Q(email__icontains=search_query) | Q(phone__icontains=search_query) | Q(stage__icontains=search_query))
-
-    order_by = CANDIDATE_SORT_FIELDS.get(sort_field, 'name')
-    if sort_dir == 'desc':
-        order_by = f'-{order_by}'
-    qs = qs.order_by(order_by)
+    params = _list_params(request, 'name')
+    filters = facets.parse_filters(request.GET)
+    base, order_field = _sorted_list(Candidate.objects.for_list(hub_id), params, CANDIDATE_SORT_FIELDS, 'name')
+    qs = facets.apply_filters(base, filters)
 
     export_format = request.GET.get('export')
     if export_format in ('csv', 'excel'):
-        fields = ['name', 'position', 'stage', 'rating', 'email', 'phone']
-        headers = ['Name', 'JobPosition', 'Stage', 'Rating', 'Email', 'Phone']
-        if export_format == 'csv':
-            return export_to_csv(qs, fields=fields, headers=headers, filename='candidates.csv')
-        return export_to_excel(qs, fields=fields, headers=headers, filename='candidates.xlsx')
-
-    paginator = Paginator(qs, per_page if per_page > 0 else max(qs.count(), 1))
-    page_obj = paginator.get_page(page_number)
+        return export_response(qs, CANDIDATE_EXPORT_COLUMNS, export_format, 'candidates')
 
-    if request.htmx and request.htmx.target == 'datatable-body':
-        return django_render(request, 'recruitment/partials/candidates_list.html', {
-            'candidates': page_obj, 'page_obj': page_obj,
-            'search_query': search_query, 'sort_field': sort_field,
-            'sort_dir': sort_dir, 'current_view': current_view, 'per_page': per_page,
-        })
-
-    return {
-        'candidates': page_obj, 'page_obj': page_obj,
-        'search_query': search_query, 'sort_field': sort_field,
-        'sort_dir': sort_dir, 'current_view': current_view, 'per_page': per_page,
+    page_obj = _list_page(request, qs, order_field, params['sort_dir'], params['per_page'], params['paginate_mode'])
+    context = {
+        'candidates': page_obj, 'page_obj': page_obj, 'stage_choices': CAND_STAGE,
+        'filters': filters, 'filtered': facets.is_filtered(filters), **params,
     }
+    if not _is_scroll(request):
+        context['facets'] = facets.facet_counts(base, filters)
 
+    template = _list_partial(request, 'candidates')
+    if template:
+        return timed_render(request, template, context)
+    return context
+
+@instrumented
 @login_required
 @htmx_view('recruitment/pages/candidate_add.html', 'recruitment/partials/candidate_add_content.html')
 def candidate_add(request):
@@ -294,11 +374,64 @@ def candidate_add(request):
         return response
     return {}
 
+@instrumented
+@login_required
+@htmx_view('recruitment/pages/candidate_import.html', 'recruitment/partials/candidate_import_content.html')
+def candidates_import(request):
+    hub_id = request.session.get('hub_id')
+    positions = JobPosition.objects.for_hub(hub_id).order_by('title').only('id', 'title')
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            return {'positions': positions, 'error': _('Choose a CSV or Excel file to import.')}
+        result = import_candidates(
+            upload, upload.name, hub_id,
+            default_position=request.POST.get('position') or None,
+            batch_size=DEFAULT_BATCH_SIZE,
+        )
+        return {'positions': positions, 'result': result}
+    return {'positions': positions}
+
+@instrumented
+@login_required
+@with_module_nav('recruitment', 'candidates')
+@htmx_view('recruitment/pages/candidate_duplicates.html', 'recruitment/partials/candidate_duplicates_content.html')
+def candidates_duplicates(request):
+    hub_id = request.session.get('hub_id')
+    groups = (
+        DuplicateGroup.objects.filter(hub_id=hub_id, status='pending').order_by('-score', 'id')
+        .prefetch_related(Prefetch('candidates', queryset=Candidate.objects.for_list(hub_id).order_by('created_at')))
+    )
+    page_obj = _paginate(groups, 12, request.GET.get('page', 1))
+    return {'groups': page_obj, 'page_obj': page_obj}
+
+@instrumented
+@login_required
+@require_POST
+def candidates_duplicate_action(request, pk):
+    hub_id = request.session.get('hub_id')
+    group = get_object_or_404(DuplicateGroup, pk=pk, hub_id=hub_id, status='pending')
+    action = request.POST.get('action', '')
+    if action == 'merge':
+        try:
+            merge_group(group, request.POST.get('primary'))
+        except Candidate.DoesNotExist:
+            return HttpResponse(status=400)
+        invalidate_pipeline_summary(hub_id)
+    elif action == 'dismiss':
+        group.status = 'dismissed'
+        group.save(update_fields=['status'])
+    else:
+        return HttpResponse(status=400)
+    # The card removes itself (hx-swap="delete").
+    return HttpResponse()
+
+@instrumented
 @login_required
 @htmx_view('recruitment/pages/candidate_edit.html', 'recruitment/partials/candidate_edit_content.html')
 def candidate_edit(request, pk):
     hub_id = request.session.get('hub_id')
-    obj = get_object_or_404(Candidate, pk=pk, hub_id=hub_id, is_deleted=False)
+    obj = get_object_or_404(Candidate.objects.for_hub(hub_id), pk=pk)
     if request.method == 'POST':
         obj.name = request.POST.get('name', '').strip()
         obj.email = request.POST.get('email', '').strip()
@@ -307,35 +440,185 @@ def candidate_edit(request, pk):
         obj.resume_notes = request.POST.get('resume_notes', '').strip()
         obj.rating = int(request.POST.get('rating', 0) or 0)
         obj.save()
-        return _render_candidates_list(request, hub_id)
+        return (
+            _saved_from_list(request, 'recruitment:candidates_list')
+            or _candidate_updates(request, rows=_candidate_rows(hub_id, [obj.pk]))
+        )
     return {'obj': obj}
 
+# Rows shown in the "Similar Candidates" card of the edit page.
+SIMILAR_LIMIT = 10
+
+@instrumented
+@login_required
+def candidate_similar(request, pk):
+    hub_id = request.session.get('hub_id')
+    obj = get_object_or_404(Candidate.objects.for_hub(hub_id).select_related('position'), pk=pk)
+    try:
+        context = {'similar': similarity.similar_candidates(obj, limit=SIMILAR_LIMIT)}
+    except similarity.SimilarityUnavailable:
+        context = {'error': _('Similarity search is not available on this server.')}
+    return timed_render(request, 'recruitment/partials/candidate_similar.html', context)
+
+def _attachments_card(request, candidate):
+    context = {
+        'obj': candidate,
+        'attachments': CandidateAttachment.objects.filter(candidate=candidate)
+        .select_related('blob').order_by('-created_at'),
+        'kind_choices': ATTACHMENT_KIND,
+        'max_size': attachments.max_size(),
+    }
+    return timed_render(request, 'recruitment/partials/candidate_attachments.html', context)
+
+
+def _upload_state(upload):
+    return {
+        'id': str(upload.pk),
+        'url': reverse('recruitment:attachment_upload_chunk', args=[upload.pk]),
+        'offset': upload.received,
+        'size': upload.size,
+        'chunk_size': attachments.chunk_size(),
+    }
+
+@instrumented
+@login_required
+def candidate_attachments(request, pk):
+    hub_id = request.session.get('hub_id')
+    return _attachments_card(request, get_object_or_404(Candidate.objects.for_hub(hub_id), pk=pk))
+
+@instrumented
+@login_required
+@require_POST
+def candidate_attachment_upload(request, pk):
+    """Start a chunked upload; the response names the URL and chunk size to send it with."""
+    hub_id = request.session.get('hub_id')
+    obj = get_object_or_404(Candidate.objects.for_hub(hub_id), pk=pk)
+    try:
+        upload = attachments.start_upload(
+            obj, request.POST.get('filename', ''), int(request.POST.get('size', '')),
+            request.POST.get('content_type', ''), request.POST.get('kind', 'resume'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(_upload_state(upload), status=201)
+
+@instrumented
+@login_required
+def attachment_upload_chunk(request, upload_id):
+    """
+    GET: the offset to resume the upload from. POST: the raw chunk for the
+    offset in the ``Upload-Offset`` header; a wrong offset answers 409 with
+    the right one. The chunk that completes the upload also creates the
+    attachment.
+    """
+    hub_id = request.session.get('hub_id')
+    upload = get_object_or_404(AttachmentUpload.objects.filter(hub_id=hub_id), pk=upload_id)
+    if request.method != 'POST':
+        return JsonResponse(_upload_state(upload))
+    try:
+        # The body is read straight from the request stream, never buffered whole.
+        attachments.write_chunk(
+            upload, int(request.headers.get('Upload-Offset', '')), request,
+            int(request.headers.get('Content-Length') or 0),
+        )
+    except attachments.OffsetMismatch as e:
+        return JsonResponse({**_upload_state(upload), 'offset': e.offset}, status=409)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if upload.received < upload.size:
+        return JsonResponse(_upload_state(upload))
+    try:
+        attachment = attachments.finish_upload(upload)
+    except attachments.UploadError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+    return JsonResponse({**_upload_state(upload), 'attachment': {
+        'id': str(attachment.pk),
+        'filename': attachment.filename,
+        'url': reverse('recruitment:candidate_attachment_download', args=[attachment.pk]),
+    }}, status=201)
+
+@instrumented
+@login_required
+def candidate_attachment_download(request, pk):
+    hub_id = request.session.get('hub_id')
+    attachment = get_object_or_404(
+        CandidateAttachment.objects.filter(hub_id=hub_id, candidate__is_deleted=False).select_related('blob'), pk=pk,
+    )
+    return attachments.download_response(request, attachment)
+
+@instrumented
+@login_required
+@require_POST
+def candidate_attachment_delete(request, pk):
+    hub_id = request.session.get('hub_id')
+    attachment = get_object_or_404(CandidateAttachment.objects.filter(hub_id=hub_id), pk=pk)
+    attachment.is_deleted = True
+    attachment.deleted_at = timezone.now()
+    attachment.save(update_fields=['is_deleted', 'deleted_at', 'updated_at'])
+    return _attachments_card(request, attachment.candidate)
+
+@instrumented
 @login_required
 @require_POST
 def candidate_delete(request, pk):
     hub_id = request.session.get('hub_id')
-    obj = get_object_or_404(Candidate, pk=pk, hub_id=hub_id, is_deleted=False)
+    obj = get_object_or_404(Candidate.objects.for_hub(hub_id), pk=pk)
     obj.is_deleted = True
     obj.deleted_at = timezone.now()
     obj.save(update_fields=['is_deleted', 'deleted_at', 'updated_at'])
-    return _render_candidates_list(request, hub_id)
+    return _candidate_updates(request, removed=[obj.pk])
 
+@instrumented
 @login_required
 @require_POST
 def candidates_bulk_action(request):
     hub_id = request.session.get('hub_id')
     ids = [i.strip() for i in request.POST.get('ids', '').split(',') if i.strip()]
     action = request.POST.get('action', '')
-    qs = Candidate.objects.filter(hub_id=hub_id, is_deleted=False, id__in=ids)
+    qs = Candidate.objects.for_hub(hub_id).filter(id__in=ids)
+    if action in CANDIDATE_STAGE_ACTIONS:
+        return _candidates_stage_action(request, hub_id, qs, action)
+    removed = []
     if action == 'delete':
-        qs.update(is_deleted=True, deleted_at=timezone.now())
-    return _render_candidates_list(request, hub_id)
+        with transaction.atomic():
+            removed = list(qs.values_list('id', flat=True))
+            Candidate.objects.filter(id__in=removed).soft_delete()
+        invalidate_pipeline_summary(hub_id)
+    return _candidate_updates(request, removed=removed)
+
 
+def _candidates_stage_action(request, hub_id, qs, action):
+    """Move the selection along the pipeline and swap in only the changed rows."""
+    try:
+        changed = pipeline.move_candidates(qs, action, request.POST.get('stage'))
+    except ValueError:
+        return HttpResponse(status=400)
+    if changed:
+        invalidate_pipeline_summary(hub_id)
+    return _candidate_updates(request, rows=_candidate_rows(hub_id, changed) if changed else [])
 
+
+@instrumented
 @login_required
 @permission_required('recruitment.manage_settings')
 @with_module_nav('recruitment', 'settings')
 @htmx_view('recruitment/pages/settings.html', 'recruitment/partials/settings_content.html')
 def settings_view(request):
-    return {}
+    buffer = get_sink(RingBufferSink)
+    return {
+        'dashboard_cache': cache_stats(),
+        'instrumentation': buffer.summary(request.session.get('hub_id')) if buffer else None,
+    }
+
+
+@instrumented
+def metrics(request):
+    """PrometheusSink histograms, for scrapers holding RECRUITMENT_METRICS_TOKEN."""
+    token = getattr(settings, 'RECRUITMENT_METRICS_TOKEN', '')
+    sink = get_sink(PrometheusSink)
+    if not token or sink is None or not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}',
+    ):
+        raise Http404
+    return HttpResponse(sink.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 